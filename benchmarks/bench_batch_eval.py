@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Batched Ichimoku Evaluation Benchmark
+=====================================
+Times one scan of N symbols × 100 bars two ways: `check_signals` on a pandas
+DataFrame per symbol (what the scanner does per symbol), and a single
+`evaluate_batch()` pass over the (symbols × bars) matrix. Both must return
+the same signal lists.
+
+Usage:
+    python benchmarks/bench_batch_eval.py [--symbols 500] [--bars 100] [--repeat 5]
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bot_templates"))
+
+from bench_kline_parsing import make_klines
+from ichimoku_core import parse_candles, check_signals
+from ichimoku_batch import evaluate_batch
+
+def make_universe(symbols, bars):
+    return {f"SYM{i:04d}USDT": parse_candles(make_klines(bars, seed=i)) for i in range(symbols)}
+
+def per_symbol(universe, log):
+    return {symbol: check_signals(candles.frame(), log) for symbol, candles in universe.items()}
+
+def batched(universe):
+    return evaluate_batch(universe).latest()
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+def run(symbols=500, bars=100, repeat=5):
+    quiet = logging.getLogger("bench.batch")
+    quiet.disabled = True
+    universe = make_universe(symbols, bars)
+    assert per_symbol(universe, quiet) == batched(universe), "batched signals differ from check_signals"
+    return {
+        "per_symbol_pandas": best_of(lambda: per_symbol(universe, quiet), repeat),
+        "batched_numpy": best_of(lambda: batched(universe), repeat),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--bars", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    r = run(args.symbols, args.bars, args.repeat)
+    print(f"{args.symbols} symbols × {args.bars} bars")
+    print(f"  per-symbol pandas: {r['per_symbol_pandas'] * 1000:>9.2f} ms")
+    print(f"  batched NumPy:     {r['batched_numpy'] * 1000:>9.2f} ms "
+          f"({r['per_symbol_pandas'] / r['batched_numpy']:.0f}x)")
+
+if __name__ == '__main__':
+    main()
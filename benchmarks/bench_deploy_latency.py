@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Hot-Deploy Latency Benchmark
+============================
+What `ichimoku_scanner_demo.py --watch` does after /confirm: a config JSON
+lands in the requests folder (temp file + rename, like `RegistrationStore`),
+the deployer validates it and the scanner runs the new symbol's first signal
+evaluation in its existing process. Measures write -> first evaluation for
+inotify and for the polling fallback, the removal latency, and checks that
+the thread count stays flat while users are added.
+
+Exits non-zero when the median deploy latency is over budget.
+
+Usage:
+    python benchmarks/bench_deploy_latency.py [--users 50] [--budget-ms 1000]
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import logging
+import tempfile
+import argparse
+import threading
+import statistics
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "bot_templates"))
+
+from bench_startup import StubMarketData
+from kline_cache import KlineCache
+from bot_deployer import Deployer
+from ichimoku_scanner_demo import HotDeploy
+
+DEPLOY_BUDGET_MS = 1000
+
+def make_config(i):
+    return {
+        "username": f"user{i}", "email": f"user{i}@example.com", "api_key": "x", "api_secret": "x",
+        "strategy": "ICHIMOKU", "coin": f"C{i:03d}", "amount_usdt": 100, "user_id": f"user{i}",
+        "demo_mode": True,
+    }
+
+def write_config(requests_dir, config):
+    path = os.path.join(requests_dir, f"{config['user_id']}.json")
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(config, f)
+    os.replace(f"{path}.tmp", path)
+    return path
+
+def wait_for(check, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while not check():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("deployment not seen in time")
+        time.sleep(0.0005)
+    return time.perf_counter()
+
+def run(users, use_inotify, poll_interval):
+    slots = {}
+    cache = KlineCache(StubMarketData())
+    with tempfile.TemporaryDirectory() as requests_dir, ThreadPoolExecutor(8) as pool:
+        deploy = HotDeploy(cache, slots, pool, "1h")
+        deployer = Deployer(requests_dir, deploy.add, deploy.remove, poll_interval, use_inotify).start()
+        threads = None
+        added, removed = [], []
+        for i in range(users):
+            config = make_config(i)
+            started = time.perf_counter()
+            path = write_config(requests_dir, config)
+            symbol = f"{config['coin']}USDT"
+            added.append(wait_for(lambda: symbol in slots) - started)
+            if threads is None:  # after the first deployment has started the pool threads it needs
+                threads = threading.active_count()
+            if i % 5 == 4:  # every fifth user cancels again
+                started = time.perf_counter()
+                os.remove(path)
+                removed.append(wait_for(lambda: symbol not in slots) - started)
+        grown = threading.active_count() - threads
+        errors = sum(slot.errors for slot in slots.values())
+        watcher = type(deployer.watcher).__name__
+        deployer.stop()
+    return watcher, added, removed, grown, len(slots), errors
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--poll-interval", type=float, default=0.25)
+    parser.add_argument("--budget-ms", type=float, default=DEPLOY_BUDGET_MS)
+    args = parser.parse_args(argv)
+    logging.disable(logging.INFO)  # no per-symbol log lines in the timings
+
+    failed = False
+    for use_inotify in (True, False):
+        with contextlib.redirect_stdout(io.StringIO()):
+            watcher, added, removed, grown, live, errors = run(args.users, use_inotify, args.poll_interval)
+        median = statistics.median(added) * 1000
+        failed |= median > args.budget_ms or errors > 0
+        print(f"{watcher:15s} write -> first evaluation: median {median:7.1f} ms, max {max(added) * 1000:7.1f} ms"
+              f" | removal median {statistics.median(removed) * 1000:6.1f} ms"
+              f" | {live} symbols live, {errors} scan errors, thread growth {grown:+d}")
+    if failed:
+        print(f"❌ Deploy latency over {args.budget_ms:g} ms (or scan errors)")
+        return 1
+    print("✅ Within budget")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Kline Parsing Micro-Benchmark
+=============================
+Compares the original `get_klines()` DataFrame parse (12 object columns, then
+four `astype(float)` calls) with the lean NumPy path in `ichimoku_core`, on
+Binance-shaped responses of 100, 1000 and 1500 rows.
+
+Usage:
+    python benchmarks/bench_kline_parsing.py [--repeat 200]
+"""
+
+import os
+import sys
+import timeit
+import argparse
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bot_templates"))
+
+import pandas as pd
+from ichimoku_core import KLINE_COLUMNS, parse_candles, parse_klines
+
+SIZES = (100, 1000, 1500)
+
+def make_klines(count, seed=0, step_ms=3_600_000):
+    """Rows shaped exactly like `client.get_klines()`: ints for times, strings for prices."""
+    rng = random.Random(seed)
+    price = 30000.0
+    rows = []
+    start = 1_700_000_000_000 - count * step_ms
+    for i in range(count):
+        o = price
+        price = max(1.0, price + rng.gauss(0, 50))
+        h = max(o, price) + rng.random() * 20
+        l = min(o, price) - rng.random() * 20
+        t = start + i * step_ms
+        rows.append([
+            t, f"{o:.8f}", f"{h:.8f}", f"{l:.8f}", f"{price:.8f}", f"{rng.random() * 100:.8f}",
+            t + step_ms - 1, f"{rng.random() * 1e6:.8f}", rng.randint(100, 5000),
+            f"{rng.random() * 50:.8f}", f"{rng.random() * 5e5:.8f}", "0",
+        ])
+    return rows
+
+def legacy_parse(klines):
+    """The pre-refactor body of get_klines(), kept here as the baseline."""
+    df = pd.DataFrame(klines, columns=KLINE_COLUMNS)
+    df['open'] = df['open'].astype(float)
+    df['high'] = df['high'].astype(float)
+    df['low'] = df['low'].astype(float)
+    df['close'] = df['close'].astype(float)
+    return df
+
+def bench(fn, rows, repeat):
+    return min(timeit.repeat(lambda: fn(rows), number=repeat, repeat=5)) / repeat
+
+def run(repeat=200):
+    results = {}
+    for size in SIZES:
+        rows = make_klines(size)
+        # Same numbers either way
+        assert (legacy_parse(rows)['close'].to_numpy() == parse_candles(rows).close).all()
+        results[size] = {
+            "legacy_dataframe": bench(legacy_parse, rows, repeat),
+            "lean_arrays": bench(parse_candles, rows, repeat),
+            "lean_dataframe": bench(parse_klines, rows, repeat),
+        }
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat)
+    print(f"{'rows':>6} {'legacy df':>12} {'lean arrays':>12} {'lean df':>12} {'speed-up':>9}")
+    for size, r in results.items():
+        print(f"{size:>6} {r['legacy_dataframe'] * 1e6:>10.1f}us {r['lean_arrays'] * 1e6:>10.1f}us "
+              f"{r['lean_dataframe'] * 1e6:>10.1f}us {r['legacy_dataframe'] / r['lean_arrays']:>8.1f}x")
+
+if __name__ == '__main__':
+    main()
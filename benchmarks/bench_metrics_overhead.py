@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Metrics & Profiler Overhead Check
+=================================
+Cost of the built-in instrumentation (`runtime_metrics.py`) on the signal loop:
+
+- one `metrics.timer()` block (the scanner runs five per symbol per cycle),
+- a full scanner cycle over the recorded fixtures with the profiler off and
+  while it samples every 5 ms.
+
+Usage:
+    python benchmarks/bench_metrics_overhead.py [--symbols 100] [--repeat 5]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import argparse
+import statistics
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "bot_templates"))
+
+from bench_pipeline import load_fixtures, expand, main_iteration
+from runtime_metrics import Metrics, SamplingProfiler
+
+TIMERS_PER_SYMBOL = 5  # fetch, parse, indicators, signals + record_cycle
+
+def timer_cost(count=100_000):
+    registry = Metrics()
+    started = time.perf_counter()
+    for _ in range(count):
+        with registry.timer("bench"):
+            pass
+    return (time.perf_counter() - started) / count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    per_timer = timer_cost()
+    fixtures, source = load_fixtures()
+    with tempfile.TemporaryDirectory() as tmp:
+        cycle = main_iteration(expand(fixtures, args.symbols), tmp)
+        cycle()  # imports and first-call costs out of the way
+        off = statistics.median(timed_runs(cycle, args.repeat))
+        profiler = SamplingProfiler(tmp)
+        profiler.start()
+        on = statistics.median(timed_runs(cycle, args.repeat))
+        profiler.stop()
+
+    per_symbol = off / args.symbols
+    print(f"metrics.timer() block:            {per_timer * 1e6:7.2f} us "
+          f"({TIMERS_PER_SYMBOL * per_timer / per_symbol:.2%} of a {per_symbol * 1000:.2f} ms symbol check)")
+    print(f"scanner cycle, {args.symbols} symbols ({source}): {off * 1000:8.1f} ms profiler off | "
+          f"{on * 1000:8.1f} ms profiler on ({on / off - 1:+.1%}, {profiler.samples} samples)")
+    return 0
+
+def timed_runs(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return times
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Signal Pipeline Benchmark Suite
+===============================
+Times every stage of the signal hot path on its own, at 1, 100 and 1000
+symbols, against recorded kline fixtures served by an in-process stand-in for
+the Binance REST API (no network, no API keys):
+
+- `parse`:          `parse_klines()`, the kline parsing in `get_klines()`
+- `ichimoku`:       `calculate_ichimoku()`
+- `signals`:        `check_signals()` (Ichimoku lines + the five checks)
+- `log_events`:     one structured `EventLog` record per symbol, written out
+- `log_human`:      the classic emoji log lines, to a log file
+- `main_iteration`: one full scanner cycle (fetch, parse, evaluate, log) for
+                    every symbol; at 1 symbol also the demo script's `run()`
+- `reg_flow`:       the Telegram registration handler, thousands of chats
+                    registering at once (stand-in Update/Context objects)
+
+Results go to `benchmarks/results/pipeline-<commit>.json`; `--compare` checks
+them against an earlier run and exits non-zero on a regression.
+
+Fixtures are get_klines-shaped JSON files (`<SYMBOL>_<interval>.json`) in
+`benchmarks/fixtures/` (or `--fixtures DIR`). The committed ones were recorded
+from `mock_binance_server.py`; `--record` replaces them with klines from
+Binance (or any `--rest-url`). `--synthetic`, or a folder without fixtures,
+uses deterministic generated candles instead. The source is noted in the results.
+
+The reg_flow stage always runs: without python-telegram-bot, its imports are
+replaced by stand-ins (listed in the results).
+
+Usage:
+    python benchmarks/bench_pipeline.py [--scales 1,100,1000] [--chats 2000] [--repeat 3]
+    python benchmarks/bench_pipeline.py --record BTCUSDT,ETHUSDT --interval 1h [--rest-url URL]
+    python benchmarks/bench_pipeline.py --compare benchmarks/results/pipeline-abc1234.json
+"""
+
+import os
+import io
+import sys
+import json
+import glob
+import time
+import types
+import asyncio
+import logging
+import platform
+import tempfile
+import argparse
+import statistics
+import contextlib
+import importlib
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BOT_DIR = os.path.join(HERE, "..", "bot_templates")
+TELEGRAM_DIR = os.path.join(HERE, "..", "telegram_bot")
+FIXTURE_DIR = os.path.join(HERE, "fixtures")
+RESULTS_DIR = os.path.join(HERE, "results")
+sys.path.insert(0, BOT_DIR)
+
+from bench_kline_parsing import make_klines
+from ichimoku_core import parse_klines, calculate_ichimoku, check_signals, signal_values, evaluate_values
+from kline_cache import KlineCache, interval_ms
+from signal_events import EventLog, NULL_LOG
+
+SCALES = (1, 100, 1000)
+KLINE_LIMIT = 100  # what the demo script and the scanner request per cycle
+REGRESSION_TOLERANCE = 0.25  # 25% slower than the baseline counts as a regression
+OPTIONAL_MODULES = ("telegram", "telegram.ext")  # nothing on the signal path needs python-binance any more
+
+
+# === Fixtures and Binance stand-in ===
+def load_fixtures(fixture_dir=FIXTURE_DIR, interval="1h"):
+    """({symbol: rows}, source) from recorded get_klines JSON files; synthetic when there are none."""
+    fixtures = {}
+    if fixture_dir:
+        for path in sorted(glob.glob(os.path.join(fixture_dir, f"*_{interval}.json"))):
+            with open(path) as f:
+                fixtures[os.path.basename(path).split("_")[0]] = json.load(f)
+    if fixtures:
+        return fixtures, "recorded"
+    step = interval_ms(interval)
+    return {f"SYN{i}USDT": make_klines(1000, seed=i, step_ms=step) for i in range(5)}, "synthetic"
+
+def record_fixtures(symbols, interval, limit=1000, fixture_dir=FIXTURE_DIR, base_url=None):
+    from rest_gateway import RestGateway, DEFAULT_BASE_URL
+    gateway = RestGateway(base_url or DEFAULT_BASE_URL)
+    os.makedirs(fixture_dir, exist_ok=True)
+    try:
+        for symbol in symbols:
+            rows = gateway.get_klines(symbol=symbol, interval=interval, limit=limit)
+            path = os.path.join(fixture_dir, f"{symbol}_{interval}.json")
+            with open(path, "w") as f:
+                json.dump(rows, f, separators=(",", ":"))
+            print(f"💾 {len(rows)} {interval} klines -> {path}")
+    finally:
+        gateway.close()
+
+def expand(fixtures, count):
+    """`count` symbols, cycling through the fixture ones."""
+    names = sorted(fixtures)
+    return {f"{names[i % len(names)][:-4]}{i}USDT": fixtures[names[i % len(names)]] for i in range(count)}
+
+
+class ReplayMarketData:
+    """Answers `get_klines()` / `get_server_time()` from fixtures, shifted so the newest row is the open bar."""
+
+    def __init__(self, rows_by_symbol, interval="1h"):
+        step = interval_ms(interval)
+        now = int(time.time() * 1000)
+        self.rows = {}
+        for symbol, rows in rows_by_symbol.items():
+            shift = now // step * step - rows[-1][0]
+            self.rows[symbol] = [[r[0] + shift] + r[1:6] + [r[6] + shift] + r[7:] for r in rows]
+        self.calls = 0
+
+    def get_klines(self, symbol, interval, limit=500, startTime=None, **_ignored):
+        self.calls += 1
+        rows = self.rows[symbol]
+        if startTime is None:
+            return rows[-limit:]
+        return [r for r in rows if r[0] >= startTime][:limit]
+
+    def get_server_time(self):
+        return {"serverTime": int(time.time() * 1000)}
+
+
+class StandIn:
+    """Any attribute, call or filter expression; enough for what the bots do with these APIs at import."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return StandIn()
+
+    def __call__(self, *args, **kwargs):
+        return StandIn()
+
+    def __and__(self, other):
+        return self
+
+    def __invert__(self):
+        return self
+
+def stand_in_modules(names=OPTIONAL_MODULES):
+    """Put a StandIn module in `sys.modules` for each of `names` that isn't installed; returns those names."""
+    installed = []
+    for name in names:
+        if name in sys.modules:
+            continue
+        try:
+            importlib.import_module(name)
+            continue
+        except ImportError:
+            pass
+        module = types.ModuleType(name)
+        module.__getattr__ = stand_in_attr
+        sys.modules[name] = module
+        parent, _, child = name.rpartition(".")
+        if parent:
+            setattr(sys.modules[parent], child, module)
+        installed.append(name)
+    return installed
+
+def stand_in_attr(attr):
+    """Module-level `__getattr__` of a stand-in module."""
+    if attr.startswith("__"):
+        raise AttributeError(attr)
+    return StandIn()
+
+
+# === Timing ===
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return times
+
+def summary(times, symbols):
+    median = statistics.median(times)
+    return {"median_s": median, "min_s": min(times), "per_symbol_us": median / symbols * 1e6, "runs": len(times)}
+
+def null_logger(path):
+    log = logging.getLogger("bench.human")
+    log.handlers[:] = [logging.FileHandler(path)]
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    return log
+
+# === Pipeline stages ===
+def bench_stages(rows_by_symbol, repeat, tmp):
+    n = len(rows_by_symbol)
+    recent = {s: rows[-KLINE_LIMIT:] for s, rows in rows_by_symbol.items()}
+    frames = {s: parse_klines(rows) for s, rows in recent.items()}
+    values = {s: signal_values(df) for s, df in frames.items()}
+    results = {}
+
+    results["parse"] = timed(lambda: [parse_klines(rows) for rows in recent.values()], repeat)
+    results["ichimoku"] = timed(lambda: [calculate_ichimoku(df) for df in frames.values()], repeat)
+    results["signals"] = timed(lambda: [check_signals(df, NULL_LOG) for df in frames.values()], repeat)
+
+    def log_events():
+        events = EventLog(os.path.join(tmp, "events.jsonl"), max_bytes=None)
+        for symbol, v in values.items():
+            evaluate_values(v, v['close'], 'NONE', events=events, symbol=symbol, interval="1h")
+        events.close()  # waits until every record is on disk
+    results["log_events"] = timed(log_events, repeat)
+
+    human = null_logger(os.path.join(tmp, "signals.log"))
+    results["log_human"] = timed(
+        lambda: [evaluate_values(v, v['close'], 'NONE', log=human) for v in values.values()], repeat)
+    for handler in human.handlers:
+        handler.close()
+
+    results["main_iteration"] = timed(main_iteration(rows_by_symbol, tmp), repeat)
+    if n == 1:
+        results["demo_main"] = timed(lambda: demo_main(rows_by_symbol, tmp), repeat)
+    return {stage: summary(times, n) for stage, times in results.items()}
+
+def main_iteration(rows_by_symbol, tmp):
+    """One scanner cycle over every symbol, cold cache: the stand-in's klines are fetched and parsed."""
+    import ichimoku_scanner_demo as scanner
+    from concurrent.futures import ThreadPoolExecutor
+    market_data = ReplayMarketData(rows_by_symbol)
+    slots = scanner.build_slots(coins=[s[:-4] for s in rows_by_symbol])
+
+    def cycle():
+        cache = KlineCache(market_data)
+        events = EventLog(os.path.join(tmp, "scanner_events.jsonl"), max_bytes=None)
+        with ThreadPoolExecutor(scanner.MAX_WORKERS) as pool:
+            scanner.scan_once(cache, slots, pool, "1h", events)
+        events.close()
+    return cycle
+
+def demo_main(rows_by_symbol, tmp):
+    """The demo script's full `run()` for one symbol, one cycle."""
+    import coin_ichimoku_template_demo as bot
+    symbol = next(iter(rows_by_symbol))
+    config = {"username": "bench", "email": "bench@example.com", "api_key": "x", "api_secret": "x",
+              "strategy": "ICHIMOKU", "coin": symbol[:-4], "amount_usdt": 100}
+    root = logging.getLogger()
+    saved = root.handlers[:]
+    root.handlers[:] = []  # so run() sets up its log file, as in a fresh process
+    try:
+        with tempfile.TemporaryDirectory(dir=tmp) as data_dir, \
+                contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            bot.run(config, market_data=ReplayMarketData(rows_by_symbol), data_dir=data_dir, max_cycles=1)
+    finally:
+        for handler in root.handlers:
+            handler.close()
+        root.handlers[:] = saved
+        root.setLevel(logging.WARNING)
+
+
+# === Telegram registration flow ===
+class FakeMessage:
+    def __init__(self, text, replies):
+        self.text = text
+        self.replies = replies
+
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+        await asyncio.sleep(0)  # a real reply is a network round trip: yield to other chats
+
+
+class FakeChat:
+    def __init__(self, chat_id):
+        self.id = chat_id
+
+
+class FakeUpdate:
+    """The parts of `telegram.Update` the handlers use."""
+
+    def __init__(self, chat_id, text, replies):
+        self.effective_chat = FakeChat(chat_id)
+        self.message = FakeMessage(text, replies)
+
+
+class FakeContext:
+    def __init__(self, bot_data):
+        self.bot_data = bot_data
+
+def registration_messages(i):
+    return [f"user{i}", f"user{i}@example.com", "k" * 64, "s" * 64, "ICHIMOKU", "BTC", "100"]
+
+async def simulate_chats(bot, ctx, chats):
+    latencies = []
+
+    async def chat(i):
+        replies = []
+        cid = 1_000_000 + i
+        await bot.register_cmd(FakeUpdate(cid, "/register", replies), ctx)
+        for text in registration_messages(i):
+            started = time.perf_counter()
+            await bot.reg_flow(FakeUpdate(cid, text, replies), ctx)
+            latencies.append(time.perf_counter() - started)
+        return replies
+
+    started = time.perf_counter()
+    replies = await asyncio.gather(*(chat(i) for i in range(chats)))
+    return time.perf_counter() - started, latencies, sum(len(r) for r in replies)
+
+def bench_reg_flow(chats, tmp):
+    stand_in_modules()  # the handlers only need the imports to succeed
+    sys.path.insert(0, TELEGRAM_DIR)
+    cwd = os.getcwd()
+    os.chdir(tmp)  # the bot creates ./bot_requests on import
+    try:
+        import telegram_bot_demo as bot
+    finally:
+        os.chdir(cwd)
+    from registration_store import RegistrationStore
+    store = RegistrationStore(os.path.join(tmp, "bot_requests"))
+    try:
+        elapsed, latencies, replies = asyncio.run(simulate_chats(bot, FakeContext({"registrations": store}), chats))
+        registrations = store.count()
+    finally:
+        store.close()
+    latencies.sort()
+    return {
+        "chats": chats, "messages": len(latencies), "replies": replies, "total_s": elapsed,
+        "messages_per_s": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "registrations": registrations,
+    }
+
+# === Results ===
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """Print new/old median ratios; returns the regressed (scale, stage) pairs."""
+    regressions = []
+    for scale, stages in results["scales"].items():
+        for stage, new in stages.items():
+            old = baseline.get("scales", {}).get(scale, {}).get(stage)
+            if not old or "median_s" not in old or "median_s" not in new:
+                continue
+            ratio = new["median_s"] / old["median_s"]
+            flag = "❌" if ratio > 1 + tolerance else "✅"
+            print(f"{flag} {scale:>5} symbols  {stage:15s} {old['median_s'] * 1000:10.2f} ms -> "
+                  f"{new['median_s'] * 1000:10.2f} ms  ({ratio:.2f}x)")
+            if ratio > 1 + tolerance:
+                regressions.append((scale, stage))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", default=",".join(map(str, SCALES)), help="Symbol counts, e.g. 1,100,1000")
+    parser.add_argument("--chats", type=int, default=2000, help="Concurrent chats for the reg_flow stage (0 = skip)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--interval", default="1h")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="Folder with <SYMBOL>_<interval>.json klines")
+    parser.add_argument("--synthetic", action="store_true", help="Generated candles instead of the fixtures")
+    parser.add_argument("--record", help="Record fixtures for these symbols, then exit")
+    parser.add_argument("--record-limit", type=int, default=1000, help="Klines per recorded symbol")
+    parser.add_argument("--rest-url", help="REST API to record from (default: Binance)")
+    parser.add_argument("--output", help="Results JSON (default: benchmarks/results/pipeline-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    if args.record:
+        record_fixtures([s.strip().upper() for s in args.record.split(",") if s.strip()], args.interval,
+                        args.record_limit, args.fixtures, args.rest_url)
+        return 0
+
+    stand_ins = stand_in_modules()
+    fixtures, source = load_fixtures(None if args.synthetic else args.fixtures, args.interval)
+    # The console is for results; the log path has its own stages
+    logging.getLogger().addHandler(logging.NullHandler())
+    logging.getLogger().setLevel(logging.WARNING)
+    results = {
+        "commit": git_commit(), "timestamp": time.time(), "python": platform.python_version(),
+        "machine": platform.machine(), "fixtures": {"source": source, "symbols": sorted(fixtures)},
+        "stand_ins": stand_ins,
+        "repeat": args.repeat, "scales": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in [int(s) for s in args.scales.split(",") if s.strip()]:
+            stages = bench_stages(expand(fixtures, scale), args.repeat, tmp)
+            results["scales"][str(scale)] = stages
+            for stage, r in stages.items():
+                print(f"{scale:>5} symbols  {stage:15s} {r['median_s'] * 1000:10.2f} ms  "
+                      f"({r['per_symbol_us']:9.1f} us/symbol)")
+        if args.chats:
+            reg = bench_reg_flow(args.chats, tmp)
+            results["reg_flow"] = reg
+            print(f"reg_flow: {reg['chats']} chats, {reg['messages']} messages in {reg['total_s']:.2f}s "
+                  f"({reg['messages_per_s']:.0f} msg/s) | p50 {reg['p50_ms']:.2f} ms, p99 {reg['p99_ms']:.2f} ms")
+    if stand_ins:
+        print(f"Stand-ins for missing packages: {', '.join(stand_ins)}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"pipeline-{results['commit']}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"📄 Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {baseline.get('commit', '?')} (tolerance {args.tolerance:.0%}):")
+        if compare(results, baseline, args.tolerance):
+            print("❌ Slower than the baseline")
+            return 1
+        print("✅ No regressions")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Registration Lookup Benchmark
+=============================
+/confirm cost with many registrations: the old directory scan (list, sort,
+parse JSON until one matches) against `RegistrationStore.latest_for_chat()`
+(one SQLite index lookup), plus single-save latency with the JSON export.
+
+Usage:
+    python benchmarks/bench_registration_store.py [--registrations 100000] [--scan-files 10000]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "telegram_bot"))
+
+from registration_store import RegistrationStore
+
+def make_config(i):
+    username = f"user{i}"
+    email = f"user{i}@example.com"
+    return {
+        "username": username, "email": email, "api_key": "k" * 64, "api_secret": "s" * 64,
+        "strategy": "ICHIMOKU", "coin": random.choice(["ETH", "BTC", "SOL", "AVAX", "NEAR"]),
+        "amount_usdt": 100.0, "user_id": f"{username}_{email.replace('@', '_at_').replace('.', '_dot_')}",
+        "demo_mode": True,
+    }
+
+def legacy_confirm(data_dir):
+    """The pre-store body of confirm_cmd()."""
+    for fn in sorted(os.listdir(data_dir), reverse=True):
+        if fn.endswith(".json"):
+            try:
+                with open(os.path.join(data_dir, fn)) as f:
+                    user_data = json.load(f)
+                if user_data.get("demo_mode") and user_data.get("user_id"):
+                    return user_data
+            except ValueError:
+                continue
+    return None
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--registrations", type=int, default=100_000)
+    parser.add_argument("--scan-files", type=int, default=10_000, help="JSON files for the legacy scan")
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args(argv)
+    random.seed(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scan_dir = os.path.join(tmp, "scan")
+        os.makedirs(scan_dir)
+        for i in range(args.scan_files):
+            with open(os.path.join(scan_dir, f"{make_config(i)['user_id']}.json"), "w") as f:
+                json.dump(make_config(i), f)
+        legacy = timed(lambda: legacy_confirm(scan_dir), 20)
+
+        store = RegistrationStore(os.path.join(tmp, "store"))
+        started = time.perf_counter()
+        store.save_many((1_000_000 + i, make_config(i)) for i in range(args.registrations))
+        load = time.perf_counter() - started
+        chats = [1_000_000 + random.randrange(args.registrations) for _ in range(args.lookups)]
+        started = time.perf_counter()
+        for chat in chats:
+            assert store.latest_for_chat(chat)["user_id"] == f"user{chat - 1_000_000}_user{chat - 1_000_000}_at_example_dot_com"
+        lookup = (time.perf_counter() - started) / len(chats)
+        save = timed(lambda: store.save(42, make_config(random.randrange(10**9))), 200)
+        store.close()
+
+    print(f"legacy directory scan ({args.scan_files} files):       {legacy * 1000:9.2f} ms per /confirm")
+    print(f"indexed lookup ({args.registrations} registrations):  {lookup * 1e6:9.1f} us per /confirm")
+    print(f"save with atomic JSON export:                 {save * 1000:9.2f} ms (off the event loop)")
+    print(f"bulk load of {args.registrations} rows:                {load:9.2f} s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+REST Gateway Load Check
+=======================
+Fires the same burst of kline requests at `mock_binance_server.py` twice:
+once with a plain `requests.get` per call (no pooling, no limits), once
+through `RestGateway`. Reports throttling (429), bans (418), TCP connections,
+coalesced calls and the latency of fresh vs backfill requests.
+
+Usage:
+    python benchmarks/bench_rest_gateway.py [--requests 400] [--threads 32] [--weight-limit 300] [--window 2]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bot_templates"))
+
+import requests
+from mock_binance_server import start_in_thread
+from rest_gateway import RestGateway, background
+
+SYMBOLS = [f"C{i:02d}USDT" for i in range(20)]
+
+def make_calls(count, seed=0):
+    """(symbol, limit, is_backfill); many calls repeat, like N bots on the same coins."""
+    rng = random.Random(seed)
+    return [(rng.choice(SYMBOLS), 100, rng.random() < 0.5) for _ in range(count)]
+
+def run_naive(url, calls, threads):
+    statuses = {}
+
+    def call(item):
+        symbol, limit, _ = item
+        r = requests.get(f"{url}/api/v3/klines", params={"symbol": symbol, "interval": "1m", "limit": limit})
+        statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(call, calls))
+    return statuses
+
+def run_gateway(url, calls, threads, weight_limit, window):
+    gateway = RestGateway(url, weight_limit=weight_limit, window=window, workers=8, backoff=0.05)
+    latency = {True: [], False: []}
+
+    def call(item):
+        symbol, limit, is_backfill = item
+        started = time.perf_counter()
+        if is_backfill:
+            with background():
+                gateway.get_klines(symbol=symbol, interval="1m", limit=limit)
+        else:
+            gateway.get_klines(symbol=symbol, interval="1m", limit=limit)
+        latency[is_backfill].append(time.perf_counter() - started)
+
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(call, calls))
+    stats = gateway.stats()
+    gateway.close()
+    return stats, latency
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--weight-limit", type=int, default=300)
+    parser.add_argument("--window", type=float, default=2.0, help="Weight window in seconds (Binance: 60)")
+    args = parser.parse_args(argv)
+    calls = make_calls(args.requests)
+    options = dict(weight_limit=args.weight_limit, window=args.window, latency=0.005, ban_after=20, ban_seconds=3)
+
+    server, state, url = start_in_thread(**options)
+    started = time.perf_counter()
+    statuses = run_naive(url, calls, args.threads)
+    print(f"plain requests: {time.perf_counter() - started:.2f}s | statuses {statuses} | "
+          f"connections {state.counts['connections']}")
+    server.shutdown()
+    time.sleep(options["ban_seconds"])
+
+    server, state, url = start_in_thread(**options)
+    started = time.perf_counter()
+    stats, latency = run_gateway(url, calls, args.threads, args.weight_limit, args.window)
+    elapsed = time.perf_counter() - started
+    fresh = sorted(latency[False])
+    backfill = sorted(latency[True])
+    print(f"gateway:        {elapsed:.2f}s | server saw {state.counts['requests']} requests "
+          f"({state.counts['429']} x 429, {state.counts['418']} x 418) | connections {state.counts['connections']}")
+    print(f"                coalesced {stats['coalesced']} | weight waits {stats['weight_waits']} | retries {stats['retries']}")
+    print(f"                median latency fresh {fresh[len(fresh) // 2] * 1000:.0f} ms, "
+          f"backfill {backfill[len(backfill) // 2] * 1000:.0f} ms")
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
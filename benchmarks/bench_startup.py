@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Demo Bot Cold-Start Benchmark
+=============================
+Measures, in fresh interpreters:
+
+- import time of `coin_ichimoku_template_demo.py` (must not pull in pandas,
+  numpy, python-binance or requests), and
+- time to first signal: interpreter start -> `run(config, max_cycles=1)`
+  returns, against an in-process stand-in for the Binance market data API.
+
+Exits non-zero when a median is over its budget, so it can gate changes.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--import-budget-ms 50] [--signal-budget-ms 1500]
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import tempfile
+import argparse
+import statistics
+import contextlib
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BOT_DIR = os.path.join(HERE, "..", "bot_templates")
+sys.path.insert(0, BOT_DIR)
+
+IMPORT_BUDGET_MS = 50
+FIRST_SIGNAL_BUDGET_MS = 1500
+HEAVY_MODULES = ("pandas", "numpy", "binance", "requests")
+
+CONFIG = {
+    "username": "bench", "email": "bench@example.com", "api_key": "x", "api_secret": "x",
+    "strategy": "ICHIMOKU", "coin": "BTC", "amount_usdt": 100,
+}
+
+
+class StubMarketData:
+    """Answers `get_klines()` / `get_server_time()` like the REST API, from memory."""
+
+    def __init__(self, step_ms=3_600_000):
+        from bench_kline_parsing import make_klines
+        now = int(time.time() * 1000)
+        self.rows = make_klines(1000, step_ms=step_ms)
+        shift = now // step_ms * step_ms - self.rows[-1][0]  # newest row = the open bar
+        for row in self.rows:
+            row[0] += shift
+            row[6] += shift
+
+    def get_klines(self, symbol, interval, limit=500, startTime=None, **_ignored):
+        rows = self.rows if startTime is None else [r for r in self.rows if r[0] >= startTime]
+        return rows[-limit:] if startTime is None else rows[:limit]
+
+    def get_server_time(self):
+        return {"serverTime": int(time.time() * 1000)}
+
+# === Child processes ===
+def child_import():
+    started = time.perf_counter()
+    import coin_ichimoku_template_demo  # noqa: F401
+    elapsed = time.perf_counter() - started
+    return {"ms": elapsed * 1000, "heavy": [m for m in HEAVY_MODULES if m in sys.modules]}
+
+def child_first_signal():
+    started = time.perf_counter()
+    import coin_ichimoku_template_demo as bot
+    market_data = StubMarketData()
+    with tempfile.TemporaryDirectory() as data_dir, contextlib.redirect_stdout(io.StringIO()):
+        state = bot.run(CONFIG, market_data=market_data, data_dir=data_dir, max_cycles=1)
+    return {"ms": (time.perf_counter() - started) * 1000, "state": state}
+
+def spawn(mode):
+    # -X importtime is not used: it slows the imports it measures
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([BOT_DIR, HERE]))
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, __file__, "--child", mode], cwd=BOT_DIR, env=env,
+                         capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--signal-budget-ms", type=float, default=FIRST_SIGNAL_BUDGET_MS)
+    parser.add_argument("--child", choices=["import", "first-signal"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        result = child_import() if args.child == "import" else child_first_signal()
+        print(json.dumps(result))
+        return 0
+
+    imports = [spawn("import") for _ in range(args.runs)]
+    signals = [spawn("first-signal") for _ in range(args.runs)]
+    import_ms = statistics.median(r["ms"] for r in imports)
+    signal_ms = statistics.median(r["ms"] for r in signals)
+    process_ms = statistics.median(r["process_ms"] for r in signals)
+    heavy = sorted({m for r in imports for m in r["heavy"]})
+
+    print(f"import coin_ichimoku_template_demo: {import_ms:7.1f} ms (budget {args.import_budget_ms:g} ms)"
+          f" | heavy modules loaded: {', '.join(heavy) or 'none'}")
+    print(f"time to first signal:               {signal_ms:7.1f} ms (budget {args.signal_budget_ms:g} ms)"
+          f" | whole process {process_ms:.0f} ms")
+
+    failed = heavy or import_ms > args.import_budget_ms or signal_ms > args.signal_budget_ms
+    if failed:
+        print("❌ Startup budget exceeded")
+        return 1
+    print("✅ Within budget")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
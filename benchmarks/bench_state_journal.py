@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+State Journal Resume Benchmark
+==============================
+Restart cost with many symbols: resuming every symbol from `StateJournal`
+(one query, buffers decoded) against rebuilding from klines (parse + Ichimoku
+over KLINE_LIMIT bars per symbol, what a restart did before), plus the
+per-scan checkpoint (all symbols in one transaction) and the file size.
+
+Usage:
+    python benchmarks/bench_state_journal.py [--symbols 5000] [--repeat 5]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import argparse
+import statistics
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "bot_templates"))
+
+from bench_pipeline import load_fixtures, expand
+from ichimoku_core import parse_klines, signal_values
+from state_journal import StateJournal, SymbolTracker
+from signal_events import NULL_LOG
+
+KLINE_LIMIT = 100
+INTERVAL = "1h"
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    fixtures, source = load_fixtures(interval=INTERVAL)
+    windows = {symbol: rows[-KLINE_LIMIT:] for symbol, rows in expand(fixtures, args.symbols).items()}
+    trackers = []
+    for symbol, rows in windows.items():
+        tracker = SymbolTracker(symbol, INTERVAL)
+        tracker.update(rows, NULL_LOG)
+        trackers.append(tracker)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.sqlite3")
+        journal = StateJournal(path)
+        checkpoint = timed(lambda: journal.checkpoint(trackers), args.repeat)
+        journal.close()  # folds the WAL back into the file
+        size = os.path.getsize(path)
+
+        def resume():
+            restored = StateJournal(path)
+            entries = restored.load_all(INTERVAL)
+            resumed = [SymbolTracker.from_entry(symbol, INTERVAL, entries.get((symbol, INTERVAL)))
+                       for symbol in windows]
+            restored.close()
+            assert all(t.engine is not None for t in resumed)
+
+        resume_time = timed(resume, args.repeat)
+
+    def rebuild():
+        for rows in windows.values():
+            signal_values(parse_klines(rows))
+
+    rebuild_time = timed(rebuild, max(1, args.repeat // 2))
+
+    print(f"{args.symbols} symbols ({source} klines, {INTERVAL}):")
+    print(f"  checkpoint (one transaction):  {checkpoint * 1000:8.1f} ms")
+    print(f"  journal size:                  {size / 1024:8.0f} KB ({size / args.symbols:.0f} bytes/symbol)")
+    print(f"  resume from journal:           {resume_time * 1000:8.1f} ms")
+    print(f"  rebuild from {KLINE_LIMIT} klines each:   {rebuild_time * 1000:8.1f} ms "
+          f"({rebuild_time / resume_time:.0f}x slower, before any REST calls)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
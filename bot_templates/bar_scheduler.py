@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Bar-Close Scheduler (DEMO)
+==========================
+Replaces the fixed `time.sleep(60*60)` loop: wakes a few seconds after every
+kline boundary (1m/15m/1h/4h/...), so signals are evaluated seconds after a bar
+closes instead of up to an hour later, and never drift.
+
+- One heap-based timer wheel for every interval and every callback.
+- Optional Binance server-time sync (`server_time=client.get_server_time`).
+- Late wake-ups (jitter) and missed boundaries are counted and logged;
+  catch-up is bounded to `max_catchup` runs per callback.
+- A failing callback is retried after `retry_delay` seconds (like the old
+  `time.sleep(60)` error branch), but never past the next boundary.
+"""
+
+import time
+import heapq
+import logging
+import threading
+from kline_cache import interval_ms
+
+WEEK_OFFSET_MS = 4 * 86_400_000  # Binance weeks open on Monday; the epoch was a Thursday
+
+def next_boundary(now_ms, interval):
+    """Open time (ms) of the first `interval` bar starting strictly after `now_ms`."""
+    if interval.endswith("M"):
+        raise ValueError("Monthly intervals are not supported by the bar scheduler")
+    step = interval_ms(interval)
+    offset = WEEK_OFFSET_MS if interval.endswith("w") else 0
+    return ((now_ms - offset) // step + 1) * step + offset
+
+
+class BarScheduler:
+    def __init__(self, delay=3.0, server_time=None, resync_every=3600,
+                 max_catchup=3, retry_delay=60, clock=time.time):
+        """
+        delay:        seconds to wait after each boundary (Binance needs a moment to close the bar)
+        server_time:  optional callable returning {'serverTime': ms}, e.g. client.get_server_time
+        resync_every: seconds between server-time syncs
+        max_catchup:  max extra runs per callback when boundaries were missed
+        retry_delay:  seconds before retrying a callback that raised
+        """
+        self.delay = delay
+        self.server_time = server_time
+        self.resync_every = resync_every
+        self.max_catchup = max_catchup
+        self.retry_delay = retry_delay
+        self.clock = clock
+        self.offset = 0.0
+        self.synced_at = None
+        self.heap = []  # (due_seconds, seq, job)
+        self.seq = 0
+        self.stop_event = threading.Event()
+        self.stats_data = {"ticks": 0, "late": 0, "max_jitter": 0.0, "missed": 0,
+                           "skipped": 0, "errors": 0, "retries": 0}
+
+    # === Clock ===
+    def now(self):
+        return self.clock() + self.offset
+
+    def sync(self):
+        if self.server_time is None:
+            return
+        try:
+            before = self.clock()
+            server_ms = self.server_time()["serverTime"]
+            after = self.clock()
+            self.offset = server_ms / 1000 - (before + after) / 2
+            self.synced_at = after
+        except Exception as e:
+            logging.warning(f"⚠ Server time sync failed, using local clock: {e}")
+
+    # === Jobs ===
+    def _push(self, due, job):
+        self.seq += 1
+        heapq.heappush(self.heap, (due, self.seq, job))
+
+    def add(self, interval, callback, run_now=False):
+        """Call `callback(bar_open_ms)` after every `interval` boundary; returns a job handle."""
+        if self.synced_at is None:
+            self.sync()
+        step = interval_ms(interval) / 1000
+        boundary = next_boundary(int(self.now() * 1000), interval) / 1000
+        job = {"interval": interval, "step": step, "callback": callback,
+               "boundary": boundary, "active": True}
+        if run_now:
+            self._push(self.now(), dict(job, boundary=boundary - step, once=True, parent=job))
+        self._push(boundary + self.delay, job)
+        return job
+
+    def remove(self, job):
+        job["active"] = False  # lazily dropped when it reaches the top of the heap
+
+    # === Loop ===
+    def _run_job(self, job, boundary):
+        try:
+            job["callback"](int(boundary * 1000))
+            return True
+        except Exception as e:
+            self.stats_data["errors"] += 1
+            logging.error(f"Main loop error: {e}")
+            return False
+
+    def _fire(self, due, job, now):
+        jitter = now - due
+        self.stats_data["max_jitter"] = max(self.stats_data["max_jitter"], jitter)
+        if job.get("once"):
+            ok = self._run_job(job, job["boundary"])
+            if not ok and not job.get("retry"):
+                self._retry(job)
+            return
+
+        self.stats_data["ticks"] += 1
+        step = job["step"]
+        boundary = job["boundary"]
+        missed = int((now - self.delay - boundary) // step)  # boundaries passed while late
+        if missed > 0:
+            catchup = min(missed, self.max_catchup)
+            self.stats_data["late"] += 1
+            self.stats_data["missed"] += missed
+            self.stats_data["skipped"] += missed - catchup
+            logging.warning(
+                f"⚠ Scheduler late by {jitter:.1f}s on {job['interval']}: "
+                f"{missed} boundaries missed, catching up {catchup}"
+            )
+            for i in range(missed - catchup, missed):
+                self._run_job(job, boundary + i * step)
+            boundary += missed * step
+        if not self._run_job(job, boundary):
+            self._retry(dict(job, boundary=boundary, parent=job))
+        job["boundary"] = boundary + step
+        self._push(job["boundary"] + self.delay, job)
+
+    def _retry(self, job):
+        due = self.now() + self.retry_delay
+        next_due = job["boundary"] + job["step"] + self.delay
+        if due < next_due:
+            self.stats_data["retries"] += 1
+            self._push(due, dict(job, once=True, retry=True, parent=job.get("parent", job)))
+
+    def run_pending(self):
+        """Fire every job that is due now; returns seconds until the next one (or None)."""
+        if self.server_time is not None and self.synced_at is not None \
+                and self.clock() - self.synced_at > self.resync_every:
+            self.sync()
+        while self.heap:
+            due, _, job = self.heap[0]
+            if not job.get("parent", job)["active"]:
+                heapq.heappop(self.heap)
+                continue
+            now = self.now()
+            if due > now:
+                return due - now
+            heapq.heappop(self.heap)
+            self._fire(due, job, now)
+        return None
+
+    def run(self):
+        while not self.stop_event.is_set():
+            wait = self.run_pending()
+            if wait is None:
+                break
+            self.stop_event.wait(wait)
+
+    def stop(self):
+        self.stop_event.set()
+
+    def stats(self):
+        return dict(self.stats_data, jobs=sum(1 for *_, j in self.heap if j["active"] and not j.get("once")))
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Bot Request Deployer (DEMO)
+===========================
+Watches the folder the Telegram demo writes configs to (`./bot_requests`) and
+hot-adds each new user's coin to an already running scanner, instead of one
+script copy (and one Python interpreter) per user.
+
+- Linux: inotify (through ctypes, no extra package) reports a config as soon as
+  it is fully written or renamed into place. Elsewhere, or when inotify is not
+  available, the folder is polled every `poll_interval` seconds. If the folder
+  is deleted or moved away, it is watched again as soon as it is back.
+- Every config is checked with the same rules as `get_config()`
+  (`missing_fields`); invalid or unreadable files are logged and skipped.
+- Deleting a config removes that user; changing its coin moves the user.
+- Callbacks: `on_add(symbol, user_id, config)` / `on_remove(symbol, user_id)`,
+  called from the deployer's own thread.
+
+Used by `ichimoku_scanner_demo.py --watch`.
+"""
+
+import os
+import json
+import time
+import errno
+import struct
+import select
+import ctypes
+import ctypes.util
+import logging
+import threading
+from ichimoku_core import missing_fields, symbol_for
+
+POLL_INTERVAL = 1.0  # seconds, polling fallback only
+
+# inotify(7) event bits
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+              | IN_ONLYDIR)
+WATCH_GONE = IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED  # the folder itself went away
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+def is_config_name(name):
+    """User configs only: skips temp files (`*.json.tmp`), dotfiles and the SQLite index."""
+    return name.endswith(".json") and not name.startswith(".")
+
+
+# === Watchers ===
+class InotifyWatcher:
+    """Changed file names in one folder, from the kernel (Linux only)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.wd = None  # None while the folder is gone
+        try:
+            self._add_watch()
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def _add_watch(self):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(self.path), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {self.path}")
+        self.wd = wd
+
+    def _watch_again(self, timeout):
+        """The folder was deleted or moved: watch it again once it exists (None = rescan)."""
+        try:
+            self._add_watch()
+        except OSError:
+            time.sleep(timeout)
+            return []
+        logging.info(f"👀 {self.path} is back, watching it again")
+        return None
+
+    def read(self, timeout):
+        """Names changed since the last call ([] on timeout); None = events lost, rescan."""
+        if self.wd is None:
+            return self._watch_again(timeout)
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return []
+            raise
+        names = []
+        pos = 0
+        while pos < len(buf):
+            wd, mask, _, size = EVENT_HEADER.unpack_from(buf, pos)
+            pos += EVENT_HEADER.size
+            name = buf[pos:pos + size].rstrip(b"\0").decode(errors="replace")
+            pos += size
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if wd != self.wd:
+                continue  # left over from a watch that is already gone
+            if mask & WATCH_GONE:
+                if mask & IN_MOVE_SELF:
+                    self.libc.inotify_rm_watch(self.fd, wd)  # it would follow the folder elsewhere
+                self.wd = None
+                logging.warning(f"⚠ {self.path} was deleted or moved, waiting for it to come back")
+                return None
+            if name:
+                names.append(name)
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Same interface as InotifyWatcher, by comparing (mtime, size) snapshots."""
+
+    def __init__(self, path, interval=POLL_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        try:
+            with os.scandir(self.path) as entries:
+                for entry in entries:
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue  # deleted while scanning
+                    snapshot[entry.name] = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            pass
+        return snapshot
+
+    def read(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        old, self.snapshot = self.snapshot, self._scan()
+        return [name for name in old.keys() | self.snapshot.keys() if old.get(name) != self.snapshot.get(name)]
+
+    def close(self):
+        pass
+
+def open_watcher(path, poll_interval=POLL_INTERVAL, use_inotify=True):
+    if use_inotify:
+        try:
+            return InotifyWatcher(path)
+        except (OSError, AttributeError) as e:  # not Linux, or no inotify watches left
+            logging.warning(f"⚠ inotify unavailable ({e}), polling {path} every {poll_interval}s")
+    return PollingWatcher(path, poll_interval)
+
+
+# === Deployer ===
+class Deployer:
+    def __init__(self, requests_dir, on_add, on_remove, poll_interval=POLL_INTERVAL, use_inotify=True):
+        """
+        requests_dir: folder with the per-user config JSONs
+        on_add:       on_add(symbol, user_id, config), for a new (or moved) user
+        on_remove:    on_remove(symbol, user_id), when a config is deleted or becomes invalid
+        """
+        self.requests_dir = requests_dir
+        self.on_add = on_add
+        self.on_remove = on_remove
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.deployed = {}  # file name -> (symbol, user_id)
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.watcher = None
+        self.stats_data = {"added": 0, "removed": 0, "invalid": 0, "rescans": 0}
+
+    def load(self, name):
+        """The validated config in `name`, or None."""
+        path = os.path.join(self.requests_dir, name)
+        try:
+            with open(path) as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.warning(f"⚠ Not deploying unreadable config {path}: {e}")
+            self.stats_data["invalid"] += 1
+            return None
+        missing = missing_fields(config) if isinstance(config, dict) else ["config object"]
+        if missing:
+            logging.warning(f"⚠ Not deploying {path}: missing {', '.join(missing)}")
+            self.stats_data["invalid"] += 1
+            return None
+        return config
+
+    def handle(self, name):
+        """Bring one config file's deployment in line with what is on disk."""
+        if not is_config_name(name):
+            return
+        config = self.load(name)
+        current = (symbol_for(config), config.get("user_id") or config["username"]) if config else None
+        previous = self.deployed.get(name)
+        if current == previous:
+            return
+        if previous is not None:
+            del self.deployed[name]
+            self._call(self.on_remove, *previous)
+            self.stats_data["removed"] += 1
+        if current is not None:
+            self.deployed[name] = current
+            self._call(self.on_add, *current, config)
+            self.stats_data["added"] += 1
+
+    def _call(self, callback, *args):
+        try:
+            callback(*args)
+        except Exception as e:
+            logging.error(f"Deploy callback error for {args[:2]}: {e}")
+
+    def sync(self):
+        """Full rescan: at start-up and whenever the watcher lost events."""
+        try:
+            names = set(os.listdir(self.requests_dir))
+        except FileNotFoundError:
+            names = set()
+        for name in sorted(names | set(self.deployed)):
+            self.handle(name)
+
+    # === Thread ===
+    def start(self):
+        os.makedirs(self.requests_dir, exist_ok=True)
+        # Watch first, then scan: a config written in between is seen twice, never missed
+        self.watcher = open_watcher(self.requests_dir, self.poll_interval, self.use_inotify)
+        self.sync()
+        self.thread = threading.Thread(target=self.run, name="deployer", daemon=True)
+        self.thread.start()
+        logging.info(f"👀 Watching {self.requests_dir} ({type(self.watcher).__name__}), "
+                     f"{len(self.deployed)} configs deployed")
+        return self
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                names = self.watcher.read(timeout=0.5)
+            except OSError as e:
+                logging.error(f"Watcher error on {self.requests_dir}: {e}")
+                names = None
+                self.stop_event.wait(self.poll_interval)
+            if names is None:
+                self.stats_data["rescans"] += 1
+                self.sync()
+                continue
+            for name in dict.fromkeys(names):  # one look per file, in event order
+                self.handle(name)
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        if self.watcher is not None:
+            self.watcher.close()
+
+    def stats(self):
+        return dict(self.stats_data, deployed=len(self.deployed))
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Local Candle Store (DEMO)
+=========================
+Keeps closed klines on disk so the bot, scanner and backtester don't have to
+re-download history on every start.
+
+- One append-only, fixed-width binary file per symbol/interval under
+  `demo_bot_data/candles/` (e.g. `BTCUSDT_1h.bin`), 56 bytes per candle:
+  open_time, open, high, low, close, volume, close_time.
+- Reads are `numpy.memmap` views: a time range is a zero-copy slice, found
+  by binary search on `open_time`.
+- `KlineCache(client, store=...)` warm-starts from the store and only fetches
+  the missing tail; newly closed candles are appended as they arrive.
+- Bulk import of Binance kline archives (CSV or ZIP from data.binance.vision).
+- Missing candles (e.g. after a long outage) are never hidden: `gaps()` lists
+  every hole, and `append()` logs one when a batch does not continue the file.
+
+Usage:
+    python candle_store.py import BTCUSDT 1m BTCUSDT-1m-2024-*.zip
+    python candle_store.py info
+"""
+
+import os
+import io
+import sys
+import glob
+import zipfile
+import logging
+import argparse
+import threading
+import numpy as np
+from kline_cache import interval_ms
+
+CANDLE_DTYPE = np.dtype([
+    ("open_time", "<i8"),
+    ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"), ("volume", "<f8"),
+    ("close_time", "<i8"),
+])
+
+DEFAULT_DIR = os.path.join("demo_bot_data", "candles")
+
+
+def rows_to_records(rows):
+    """REST `get_klines` rows -> structured array (one pass, no DataFrame)."""
+    records = np.empty(len(rows), dtype=CANDLE_DTYPE)
+    if len(rows):
+        columns = list(zip(*rows))
+        for i, name in enumerate(CANDLE_DTYPE.names[:6]):
+            records[name] = columns[i]
+        records["close_time"] = columns[6]
+    return records
+
+def records_to_rows(records):
+    """Structured array -> REST-shaped rows (numbers instead of strings)."""
+    return [
+        [int(r["open_time"]), float(r["open"]), float(r["high"]), float(r["low"]),
+         float(r["close"]), float(r["volume"]), int(r["close_time"]), 0.0, 0, 0.0, 0.0, 0.0]
+        for r in records
+    ]
+
+def find_gaps(open_times, step=None):
+    """
+    [(first missing open_time, next present open_time), ...] wherever two
+    consecutive candles are more than `step` ms apart (default: the smallest
+    spacing in the data, for files whose interval is unknown).
+    """
+    times = np.asarray(open_times, dtype=np.int64)
+    if len(times) < 2:
+        return []
+    diffs = np.diff(times)
+    if step is None:
+        positive = diffs[diffs > 0]
+        if not len(positive):
+            return []
+        step = int(positive.min())
+    return [(int(times[i]) + step, int(times[i + 1])) for i in np.flatnonzero(diffs > step)]
+
+
+class CandleStore:
+    def __init__(self, root=DEFAULT_DIR):
+        self.root = root
+        self.lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, symbol, interval):
+        return os.path.join(self.root, f"{symbol.upper()}_{interval}.bin")
+
+    # === Reading ===
+    def read(self, symbol, interval, start=None, end=None):
+        """
+        Memory-mapped candles with `start <= open_time < end` (ms; None = open).
+        Returns a read-only structured view; no data is copied.
+        """
+        path = self.path(symbol, interval)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        count = size // CANDLE_DTYPE.itemsize
+        if not count:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        data = np.memmap(path, dtype=CANDLE_DTYPE, mode="r", shape=(count,))
+        times = data["open_time"]
+        lo = 0 if start is None else int(np.searchsorted(times, start, "left"))
+        hi = count if end is None else int(np.searchsorted(times, end, "left"))
+        return data[lo:hi]
+
+    def tail(self, symbol, interval, count):
+        data = self.read(symbol, interval)
+        return data[max(0, len(data) - count):]
+
+    def last_open_time(self, symbol, interval):
+        data = self.tail(symbol, interval, 1)
+        return int(data["open_time"][0]) if len(data) else None
+
+    def gaps(self, symbol, interval, start=None, end=None):
+        """Holes in the stored history, as `find_gaps()` pairs."""
+        return find_gaps(self.read(symbol, interval, start, end)["open_time"], interval_ms(interval))
+
+    def columns(self, symbol, interval, start=None, end=None):
+        """Column views in the layout the backtester uses."""
+        data = self.read(symbol, interval, start, end)
+        return {name: data[name] for name in CANDLE_DTYPE.names}
+
+    def symbols(self):
+        out = []
+        for fn in sorted(os.listdir(self.root)):
+            if fn.endswith(".bin"):
+                symbol, interval = fn[:-4].rsplit("_", 1)
+                out.append((symbol, interval, os.path.getsize(os.path.join(self.root, fn)) // CANDLE_DTYPE.itemsize))
+        return out
+
+    # === Writing ===
+    def append(self, symbol, interval, records):
+        """
+        Append closed candles (structured array or REST rows). Candles at or
+        before the last stored open_time are skipped, so callers can hand over
+        overlapping batches. A batch that starts after a hole is still written
+        (the hole is logged and listed by `gaps()`). Returns the number of
+        candles written.
+        """
+        if not isinstance(records, np.ndarray):
+            records = rows_to_records(records)
+        if not len(records):
+            return 0
+        path = self.path(symbol, interval)
+        with self.lock:
+            self._repair(path)
+            last = self.last_open_time(symbol, interval)
+            if last is not None:
+                records = records[records["open_time"] > last]
+            if len(records) > 1 and np.any(np.diff(records["open_time"]) <= 0):
+                records = np.unique(records)  # sorts by open_time first
+            if len(records) and last is not None and int(records["open_time"][0]) != last + interval_ms(interval):
+                logging.warning(f"⚠ {symbol} {interval}: candles missing between {last} and "
+                                f"{int(records['open_time'][0])} in the candle store")
+            if len(records):
+                with open(path, "ab") as f:
+                    f.write(np.ascontiguousarray(records, dtype=CANDLE_DTYPE).tobytes())
+        return len(records)
+
+    def merge(self, symbol, interval, records):
+        """Insert candles anywhere in the history (rewrites the file atomically)."""
+        if not isinstance(records, np.ndarray):
+            records = rows_to_records(records)
+        path = self.path(symbol, interval)
+        tmp = path + ".tmp"
+        # Read, combine and rewrite under one lock: no append() can slip in between
+        with self.lock:
+            self._repair(path)
+            existing = np.array(self.read(symbol, interval))
+            combined = np.concatenate([existing, records.astype(CANDLE_DTYPE)])
+            order = np.argsort(combined["open_time"], kind="stable")
+            combined = combined[order]
+            # Keep the newest copy of duplicated open times
+            keep = np.ones(len(combined), dtype=bool)
+            keep[:-1] = combined["open_time"][1:] != combined["open_time"][:-1]
+            combined = combined[keep]
+            with open(tmp, "wb") as f:
+                f.write(combined.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        return len(combined) - len(existing)
+
+    def _repair(self, path):
+        """Drop a half-written trailing record left by a crash mid-append."""
+        if os.path.exists(path):
+            extra = os.path.getsize(path) % CANDLE_DTYPE.itemsize
+            if extra:
+                with open(path, "r+b") as f:
+                    f.truncate(os.path.getsize(path) - extra)
+
+    # === Bulk import ===
+    def import_archive(self, symbol, interval, path):
+        """Load a Binance kline archive (CSV, or ZIP holding CSVs) into the store."""
+        records = [load_archive_csv(data) for data in archive_members(path)]
+        if not records:
+            return 0
+        records = np.concatenate(records)
+        last = self.last_open_time(symbol, interval)
+        if last is None or records["open_time"].min() > last:
+            return self.append(symbol, interval, records)
+        return self.merge(symbol, interval, records)
+
+
+def archive_members(path):
+    if path.endswith(".zip"):
+        with zipfile.ZipFile(path) as zf:
+            for name in sorted(zf.namelist()):
+                if name.endswith(".csv"):
+                    yield zf.read(name)
+    else:
+        with open(path, "rb") as f:
+            yield f.read()
+
+def load_archive_csv(data):
+    """Binance archive CSV bytes -> structured array (header line optional)."""
+    text = data.decode()
+    if text[:1] and not text[:1].isdigit():
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+    if not text.strip():
+        return np.empty(0, dtype=CANDLE_DTYPE)
+    raw = np.loadtxt(io.StringIO(text), delimiter=",", usecols=range(7), dtype=np.float64, ndmin=2)
+    records = np.empty(len(raw), dtype=CANDLE_DTYPE)
+    times = raw[:, 0].astype(np.int64)
+    close_times = raw[:, 6].astype(np.int64)
+    if len(times) and times[0] > 10**14:  # newer spot archives use microseconds
+        times //= 1000
+        close_times //= 1000
+    records["open_time"] = times
+    for i, name in enumerate(("open", "high", "low", "close", "volume"), start=1):
+        records[name] = raw[:, i]
+    records["close_time"] = close_times
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local candle store (demo)")
+    parser.add_argument("--root", default=DEFAULT_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="Import Binance kline archives (CSV/ZIP)")
+    imp.add_argument("symbol")
+    imp.add_argument("interval")
+    imp.add_argument("files", nargs="+")
+    sub.add_parser("info", help="List stored symbols")
+    args = parser.parse_args(argv)
+
+    store = CandleStore(args.root)
+    if args.command == "import":
+        total = 0
+        for pattern in args.files:
+            for path in sorted(glob.glob(pattern)) or [pattern]:
+                added = store.import_archive(args.symbol.upper(), args.interval, path)
+                total += added
+                print(f"📥 {path}: +{added} candles")
+        print(f"✅ {total} candles added to {store.path(args.symbol, args.interval)}")
+    else:
+        rows = store.symbols()
+        if not rows:
+            print(f"No candles stored in {store.root}")
+        for symbol, interval, count in rows:
+            print(f"{symbol:<12} {interval:<4} {count:>10} candles")
+
+if __name__ == '__main__':
+    sys.exit(main())
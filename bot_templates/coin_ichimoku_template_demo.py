@@ -12,17 +12,20 @@ used by the SaaS bot—without risk, for transparency and trust.
 - Prints/logs when BUY, SELL, or HOLD signals would be triggered according to strategy.
 - NO order execution, NO API trading permissions required!
 - Use for demo/evaluation only.
+- Importing this file has no side effects: call `run(config)` to start a bot
+  from your own code (pandas/numpy are only loaded then).
+- Optional live metrics and an on-demand profiler: set METRICS_PORT
+  (see runtime_metrics.py).
+- The last action and indicator buffers are checkpointed after every check
+  (see state_journal.py): a restart resumes in milliseconds, evaluates only
+  the candles it missed and never repeats a BUY/SELL.
 
 Copyright (c) 2025
 """
 
 import os
-import time
-import logging
 import json
-import pandas as pd
-from datetime import datetime
-from binance.client import Client
+import logging
 
 # === CONFIGURATION ===
 
@@ -43,12 +46,22 @@ user_config = {
 # ----- Option 1: LOAD FROM JSON FILE (Telegram bot method) -----
 CONFIG_FILE = "./bot_requests/demo_demo_at_email_dot_com.json"  # Edit this if not using manual config and include full path for .json file
 
+INTERVAL          = "1h"  # Client.KLINE_INTERVAL_1HOUR
+BAR_CLOSE_DELAY   = 3  # seconds after each candle close before checking signals
+STRUCTURED_LOG    = True  # one JSON record per check (queryable, written in the background)
+HUMAN_LOG         = True  # also show the classic emoji lines on screen / in the .log file
+DATA_DIR          = "demo_bot_data"
+KLINE_LIMIT       = 100
+METRICS_PORT      = None  # e.g. 9108: serve http://127.0.0.1:9108/metrics and the profiler toggle
+STATE_JOURNAL     = True  # checkpoint the last action + indicators every check; resume from them on restart
+
 # === CONFIG LOAD LOGIC ===
 def get_config():
+    from ichimoku_core import REQUIRED_FIELDS
+
     if USE_MANUAL_CONFIG:
         # Check if user_config is filled properly
-        required = ["username", "email", "api_key", "api_secret", "strategy", "coin", "amount_usdt"]
-        for field in required:
+        for field in REQUIRED_FIELDS:
             if not user_config.get(field):
                 print(f"[CONFIG ERROR] Please fill in '{field}' in the manual user_config at the top of the script.")
                 exit(1)
@@ -63,178 +76,161 @@ def get_config():
         with open(CONFIG_FILE) as f:
             loaded = json.load(f)
         # Check for fields
-        required = ["username", "email", "api_key", "api_secret", "strategy", "coin", "amount_usdt"]
-        for field in required:
+        for field in REQUIRED_FIELDS:
             if not loaded.get(field):
                 print(f"[CONFIG ERROR] Field '{field}' is missing in your JSON file {CONFIG_FILE}.")
                 exit(1)
         return loaded
 
-user = get_config()
-
-symbol            = user.get("coin", "BTC").upper() + "USDT"
-interval          = Client.KLINE_INTERVAL_1HOUR
-trade_amount_usdt = float(user.get("amount_usdt", 100))
-api_key           = user.get("api_key")
-api_secret        = user.get("api_secret")
-
-client = Client(api_key, api_secret)
-
-data_dir = "demo_bot_data"
-os.makedirs(data_dir, exist_ok=True)
-botlog_file = os.path.join(data_dir, f"{symbol.lower()}_ichimoku_signals.log")
-
 # === LOGGING ===
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler(botlog_file)
-    ]
-)
-
-logging.warning("*********** DEMO MODE: NO TRADES WILL BE EXECUTED ***********")
-logging.warning("This script will only print/log signals for transparency/testing.")
-logging.warning("If you see a 'BUY' or 'SELL' signal, it's for demonstration purposes only.")
-
-# === Ichimoku Calculation (unchanged) ===
-def calculate_ichimoku(df):
-    high_9 = df['high'].rolling(window=9).max()
-    low_9 = df['low'].rolling(window=9).min()
-    tenkan = (high_9 + low_9) / 2
-
-    high_26 = df['high'].rolling(window=26).max()
-    low_26 = df['low'].rolling(window=26).min()
-    kijun = (high_26 + low_26) / 2
-
-    span_a = ((tenkan + kijun) / 2).shift(26)
-    high_52 = df['high'].rolling(window=52).max()
-    low_52 = df['low'].rolling(window=52).min()
-    span_b = ((high_52 + low_52) / 2).shift(26)
-    chikou = df['close'].shift(-26)
-
-    return tenkan, kijun, span_a, span_b, chikou
-
-# === Get Data ===
-def get_klines():
-    klines = client.get_klines(symbol=symbol, interval=interval, limit=100)
-    df = pd.DataFrame(klines, columns=[
-        'open_time','open','high','low','close','volume',
-        'close_time','qav','num_trades','tbbav','tbqav','ignore'
-    ])
-    df['open'] = df['open'].astype(float)
-    df['high'] = df['high'].astype(float)
-    df['low'] = df['low'].astype(float)
-    df['close'] = df['close'].astype(float)
-    return df
-
-# === Main Signal Logic ===
-def check_signals(df):
-    tenkan, kijun, span_a, span_b, chikou = calculate_ichimoku(df)
-    close = df['close']
-    price = close.iloc[-2]
-    signals = []
-
-    # TK Cross
-    if tenkan.iloc[-2] > kijun.iloc[-2]:
-        signals.append('tk_bullish')
-        logging.info("✔ Tenkan > Kijun (Bullish TK Cross)")
-    elif tenkan.iloc[-2] < kijun.iloc[-2]:
-        signals.append('tk_bearish')
-        logging.info("✔ Tenkan < Kijun (Bearish TK Cross)")
-    else:
-        logging.info("✘ No TK Cross")
-
-    # Kumo Breakout
-    if price > span_a.iloc[-2] and price > span_b.iloc[-2]:
-        signals.append('kumo_bullish')
-        logging.info("✔ Price above Span A and B (Bullish Kumo Breakout)")
-    elif price < span_a.iloc[-2] and price < span_b.iloc[-2]:
-        signals.append('kumo_bearish')
-        logging.info("✔ Price below Span A and B (Bearish Kumo Breakout)")
-    else:
-        logging.info("✘ No Kumo Breakout")
-
-    # Kijun Cross
-    if price > kijun.iloc[-2]:
-        signals.append('kijun_bullish')
-        logging.info("✔ Price > Kijun (Bullish Kijun Cross)")
-    elif price < kijun.iloc[-2]:
-        signals.append('kijun_bearish')
-        logging.info("✔ Price < Kijun (Bearish Kijun Cross)")
-    else:
-        logging.info("✘ No Kijun Cross")
+def setup_logging(botlog_file):
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(message)s",
+        handlers=[
+            logging.StreamHandler(),
+            logging.FileHandler(botlog_file)
+        ]
+    )
+
+    logging.warning("*********** DEMO MODE: NO TRADES WILL BE EXECUTED ***********")
+    logging.warning("This script will only print/log signals for transparency/testing.")
+    logging.warning("If you see a 'BUY' or 'SELL' signal, it's for demonstration purposes only.")
+
+# === Bot ===
+def run(config, market_data=None, data_dir=DATA_DIR, interval=INTERVAL, max_cycles=None,
+        metrics_port=METRICS_PORT):
+    """
+    Run the demo bot for one user config (the dict `get_config()` returns).
+
+    market_data:  anything with `get_klines()` / `get_server_time()`
+                  (default: a pooled, rate-limit-aware `RestGateway`)
+    max_cycles:   stop after this many signal checks (None = run forever)
+    metrics_port: serve /metrics and the profiler toggle on this local port
+
+    Returns the last action ('BUY', 'SELL' or 'NONE').
+    """
+    # Imported here, not at the top, so importing this file stays instant
+    from ichimoku_core import missing_fields, symbol_for, parse_klines, signal_values, latest_price, evaluate_values
+    from kline_cache import KlineCache, interval_ms
+    from candle_store import CandleStore
+    from signal_events import EventLog, load_states
+    from bar_scheduler import BarScheduler
+    from runtime_metrics import metrics, MetricsServer
+    from state_journal import StateJournal, SymbolTracker, DEFAULT_JOURNAL_NAME
+
+    missing = missing_fields(config)
+    if missing:
+        raise ValueError(f"Config is missing: {', '.join(missing)}")
+    symbol = symbol_for(config)
+    if market_data is None:
+        from rest_gateway import RestGateway
+        market_data = RestGateway()  # retries with backoff, stays under the weight limit
+
+    os.makedirs(data_dir, exist_ok=True)
+    # Closed candles are kept on disk, so a restart only fetches the missing tail
+    kline_cache = KlineCache(market_data, store=CandleStore(os.path.join(data_dir, "candles")))
+    botlog_file = os.path.join(data_dir, f"{symbol.lower()}_ichimoku_signals.log")
+    events_file = os.path.join(data_dir, f"{symbol.lower()}_signal_events.jsonl")
+    setup_logging(botlog_file)
+
+    signal_events = None
+    if STRUCTURED_LOG:
+        signal_events = EventLog(events_file, human_log=logging.getLogger("signals") if HUMAN_LOG else None)
 
-    # Chikou Breakout (add logging here)
-    try:
-        if chikou.iloc[-2] > df['close'].iloc[-28]:
-            signals.append('chikou_bullish')
-            logging.info("✔ Chikou > Price 26 periods ago (Bullish Chikou Breakout)")
-        elif chikou.iloc[-2] < df['close'].iloc[-28]:
-            signals.append('chikou_bearish')
-            logging.info("✔ Chikou < Price 26 periods ago (Bearish Chikou Breakout)")
-        else:
-            logging.info("✘ No Chikou Breakout")
-    except IndexError:
-        logging.warning("⚠ Not enough data for Chikou check")
-
-    # Kumo Twist (add logging here)
-    if span_a.iloc[-1] > span_b.iloc[-1] and span_a.iloc[-2] <= span_b.iloc[-2]:
-        signals.append('twist_bullish')
-        logging.info("✔ Bullish Kumo Twist")
-    elif span_a.iloc[-1] < span_b.iloc[-1] and span_a.iloc[-2] >= span_b.iloc[-2]:
-        signals.append('twist_bearish')
-        logging.info("✔ Bearish Kumo Twist")
-    else:
-        logging.info("✘ No Kumo Twist")
-
-    return signals
-
-# === Main Loop ===
-def main():
     print("\n*********** DEMO MODE: NO TRADES WILL BE EXECUTED ***********")
     print("This script ONLY prints/logs signals for transparency/testing.")
     print("If you see a 'BUY' or 'SELL' signal, it is NOT an actual order.\n")
 
     print(f"🚀 Starting Ichimoku DEMO Signal Bot for {symbol}...")
-    print(f"{'Using manual config.' if USE_MANUAL_CONFIG else f'Reading config from: {CONFIG_FILE}'}")
     print(f"Signals will be printed here and also saved in: {botlog_file}\n")
 
     state = 'NONE'  # last action: 'BUY', 'SELL', or 'NONE'
+    journal = tracker = None
+    entry = None
+    if STATE_JOURNAL:
+        journal = StateJournal(os.path.join(data_dir, DEFAULT_JOURNAL_NAME))
+        entry = journal.load(symbol, interval)
+    if entry is None and STRUCTURED_LOG:
+        state = load_states(events_file).get(symbol, 'NONE')  # pick up where the last run stopped
+    if journal is not None:
+        # Resume from the last checkpoint: only candles closed since then are evaluated
+        tracker = SymbolTracker.from_entry(symbol, interval, entry, state)
+        state = tracker.state
+        print(f"State journal: {journal.path} (last action: {state})")
+    if STRUCTURED_LOG:
+        print(f"Structured signal events: {events_file} (last action: {state})\n")
+
+    # Wake BAR_CLOSE_DELAY seconds after every candle close (Binance server time)
+    scheduler = BarScheduler(delay=BAR_CLOSE_DELAY, server_time=market_data.get_server_time)
+    cycles = 0
+    server = None
+    if metrics_port is not None:
+        metrics.add_collector("kline_cache", kline_cache.stats)
+        metrics.add_collector("scheduler", scheduler.stats)
+        if journal is not None:
+            metrics.add_collector("state_journal", journal.stats)
+        server = MetricsServer(metrics_port, profile_dir=data_dir).start()
+
+    def run_cycle(bar_open_ms):
+        nonlocal state
+        if tracker is not None:
+            return run_tracked_cycle(bar_open_ms)
+        with metrics.timer("cycle"):
+            with metrics.timer("fetch"):
+                klines = kline_cache.get_klines(symbol=symbol, interval=interval, limit=KLINE_LIMIT)
+            with metrics.timer("parse"):
+                df = parse_klines(klines)
+            with metrics.timer("indicators"):
+                values = signal_values(df)
+            with metrics.timer("signals"):
+                before = state
+                price, bar_open_time = latest_price(df)
+                state, signals = evaluate_values(values, price, state, events=signal_events, symbol=symbol,
+                                                 interval=interval, bar_open_time=bar_open_time)
+        metrics.record_cycle(symbol, interval, bar_open_time, signals, before, state, interval_ms(interval))
+        end_cycle()
+
+    def run_tracked_cycle(bar_open_ms):
+        nonlocal state
+        with metrics.timer("cycle"):
+            with metrics.timer("fetch"):
+                klines = tracker.fetch(kline_cache, bar_open_ms, KLINE_LIMIT)
+            before = state
+            with metrics.timer("signals"):
+                # Incremental: only the candles closed since the last checkpoint
+                tracker.update(klines, events=signal_events)
+            state = tracker.state
+            with metrics.timer("checkpoint"):
+                journal.save(tracker)
+        metrics.record_cycle(symbol, interval, tracker.last_open_time, tracker.signals, before, state,
+                             interval_ms(interval))
+        end_cycle()
+
+    def end_cycle():
+        nonlocal cycles
+        print("---")
+        cycles += 1
+        if max_cycles is not None and cycles >= max_cycles:
+            scheduler.stop()
+
+    scheduler.add(interval, run_cycle, run_now=True)
+    try:
+        scheduler.run()
+    finally:
+        if signal_events is not None:
+            signal_events.close()
+        if server is not None:
+            server.close()
+        if journal is not None:
+            journal.close()
+    return state
 
-    while True:
-        try:
-            df = get_klines()
-            price = df['close'].iloc[-1]
-            signals = check_signals(df)
-            bullish = sum(1 for s in signals if 'bullish' in s)
-            bearish = sum(1 for s in signals if 'bearish' in s)
-
-            logging.info(f"📈 Current Price: {price:.2f}")
-            logging.info(f"📊 Signals: {signals}")
-            logging.info(f"✔ Bullish: {bullish} | ❌ Bearish: {bearish} | 🕓 Last action: {state}")
-
-            # Demo logic: Print what would happen, but do NOT trade!
-            if state in ['SELL', 'NONE']:
-                if bullish >= 3:
-                    logging.info(f"🚦 DEMO SIGNAL: [BUY] Would trigger BUY at {price:.2f} (if live)")
-                    state = 'BUY'
-                else:
-                    logging.info(f"🤝 DEMO SIGNAL: [HOLD] No buy, not enough bullish signals ({bullish}/3).")
-            elif state == 'BUY':
-                if bearish >= 3:
-                    logging.info(f"🚦 DEMO SIGNAL: [SELL] Would trigger SELL at {price:.2f} (if live)")
-                    state = 'SELL'
-                else:
-                    logging.info(f"🤝 DEMO SIGNAL: [HOLD] No sell, not enough bearish signals ({bearish}/3).")
-
-            print("---")
-            time.sleep(60*60)  # Wait 1 hour (match 1h timeframe)
-        except Exception as e:
-            logging.error(f"Main loop error: {e}")
-            time.sleep(60)
+# === Main Loop ===
+def main():
+    config = get_config()
+    print(f"{'Using manual config.' if USE_MANUAL_CONFIG else f'Reading config from: {CONFIG_FILE}'}")
+    run(config)
 
 if __name__ == '__main__':
     main()
-
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Ichimoku Backtester (DEMO / SIGNAL-ONLY)
+========================================
+Replays the demo strategy over history without re-running `check_signals`
+bar by bar (which would be O(N²)).
+
+- All five Ichimoku lines are computed over the whole history in one pass,
+  using O(N) block-wise rolling max/min (van Herk / Gil-Werman).
+- The ten signal flags (tk/kumo/kijun/chikou/twist, bullish and bearish) are
+  NumPy boolean arrays: `flags[name][i]` is what `check_signals` reports when
+  bar `i` is the last closed bar (`iloc[-2]`) of its window.
+- The 3-of-5 BUY/SELL state machine from `main()` then only visits the bars
+  where 3+ flags agree.
+- `check_parity()` compares the arrays with the live `check_signals` on
+  random windows.
+- History with missing candles is not treated as contiguous: `load_candles()`
+  keeps only the newest unbroken run unless `allow_gaps=True` (`--allow-gaps`).
+
+Usage:
+    python ichimoku_backtest.py btc_1h.json            # saved get_klines() response
+    python ichimoku_backtest.py BTCUSDT-1m-2024-01.zip # Binance kline archive (CSV/ZIP)
+    python ichimoku_backtest.py demo_bot_data/candles/BTCUSDT_1m.bin  # local candle store
+    python ichimoku_backtest.py btc_1h.json --parity 500
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+import numpy as np
+
+SIGNAL_NAMES = [
+    'tk_bullish', 'tk_bearish',
+    'kumo_bullish', 'kumo_bearish',
+    'kijun_bullish', 'kijun_bearish',
+    'chikou_bullish', 'chikou_bearish',
+    'twist_bullish', 'twist_bearish',
+]
+
+# === Rolling Extremes (last axis, O(N)) ===
+def _rolling(x, window, ufunc, fill):
+    x = np.asarray(x, dtype=np.float64)
+    n = x.shape[-1]
+    out = np.full(x.shape, np.nan)
+    if n < window:
+        return out
+    pad = (-n) % window
+    if pad:
+        x = np.concatenate([x, np.full(x.shape[:-1] + (pad,), fill)], axis=-1)
+    blocks = x.reshape(x.shape[:-1] + (-1, window))
+    prefix = ufunc.accumulate(blocks, axis=-1).reshape(x.shape)
+    suffix = ufunc.accumulate(blocks[..., ::-1], axis=-1)[..., ::-1].reshape(x.shape)
+    # Window [i, i + window - 1] spans at most two blocks
+    out[..., window - 1:] = ufunc(suffix[..., :n - window + 1], prefix[..., window - 1:n])
+    return out
+
+def rolling_max(x, window):
+    """Same values as `Series.rolling(window).max()` (NaN until the window is full)."""
+    return _rolling(x, window, np.maximum, -np.inf)
+
+def rolling_min(x, window):
+    return _rolling(x, window, np.minimum, np.inf)
+
+def _shift(x, periods):
+    """`Series.shift(periods)` along the last axis, keeping the length."""
+    out = np.full(x.shape, np.nan)
+    if periods >= 0:
+        out[..., periods:] = x[..., :x.shape[-1] - periods]
+    else:
+        out[..., :periods] = x[..., -periods:]
+    return out
+
+# === Ichimoku Arrays ===
+def ichimoku_lines(high, low, close, tenkan=9, kijun=26, senkou_b=52, displacement=26, extremes=None):
+    """
+    Vectorized `calculate_ichimoku`. Also returns the clouds projected one bar
+    ahead (`span_a_next`, `span_b_next`), needed for the Kumo Twist check.
+
+    `extremes` may hold precomputed {(window, 'max'|'min'): array} to share
+    rolling windows between parameter sets.
+    """
+    extremes = {} if extremes is None else extremes
+
+    def mid(window):
+        if (window, 'max') not in extremes:
+            extremes[(window, 'max')] = rolling_max(high, window)
+            extremes[(window, 'min')] = rolling_min(low, window)
+        return (extremes[(window, 'max')] + extremes[(window, 'min')]) / 2
+
+    close = np.asarray(close, dtype=np.float64)
+    tenkan_line = mid(tenkan)
+    kijun_line = mid(kijun)
+    span_a_raw = (tenkan_line + kijun_line) / 2
+    span_b_raw = mid(senkou_b)
+    return {
+        'tenkan': tenkan_line,
+        'kijun': kijun_line,
+        'span_a': _shift(span_a_raw, displacement),
+        'span_b': _shift(span_b_raw, displacement),
+        'chikou': _shift(close, -displacement),
+        'span_a_next': _shift(span_a_raw, displacement - 1),
+        'span_b_next': _shift(span_b_raw, displacement - 1),
+    }
+
+def signal_flags(high, low, close, lines=None, **windows):
+    """The ten `check_signals` flags for every bar, as boolean arrays."""
+    close = np.asarray(close, dtype=np.float64)
+    lines = lines or ichimoku_lines(high, low, close, **windows)
+    tenkan, kijun = lines['tenkan'], lines['kijun']
+    span_a, span_b = lines['span_a'], lines['span_b']
+    span_a_next, span_b_next = lines['span_a_next'], lines['span_b_next']
+
+    # Live, the Chikou check reads chikou.iloc[-2], i.e. the close 26 bars after
+    # the last closed bar, which is never in the window yet: it never fires.
+    # Kept that way here so backtests match what the bot actually does.
+    never = np.zeros(close.shape, dtype=bool)
+    return {
+        'tk_bullish': tenkan > kijun,
+        'tk_bearish': tenkan < kijun,
+        'kumo_bullish': (close > span_a) & (close > span_b),
+        'kumo_bearish': (close < span_a) & (close < span_b),
+        'kijun_bullish': close > kijun,
+        'kijun_bearish': close < kijun,
+        'chikou_bullish': never,
+        'chikou_bearish': never,
+        'twist_bullish': (span_a_next > span_b_next) & (span_a <= span_b),
+        'twist_bearish': (span_a_next < span_b_next) & (span_a >= span_b),
+    }
+
+def signal_counts(flags):
+    bullish = sum(flags[name].astype(np.int8) for name in SIGNAL_NAMES if 'bullish' in name)
+    bearish = sum(flags[name].astype(np.int8) for name in SIGNAL_NAMES if 'bearish' in name)
+    return bullish, bearish
+
+def signals_at(flags, i):
+    """The `check_signals` list for bar `i`."""
+    return [name for name in SIGNAL_NAMES if flags[name][..., i]]
+
+# === State Machine ===
+def run_state_machine(bullish, bearish, buy_threshold=3, sell_threshold=3, state='NONE'):
+    """
+    The BUY/SELL/NONE logic of `main()`, visiting only bars where a transition
+    is possible. Returns [(bar_index, 'BUY'|'SELL'), ...] and the final state.
+    """
+    can_buy = bullish >= buy_threshold
+    can_sell = bearish >= sell_threshold
+    actions = []
+    for i in np.flatnonzero(can_buy | can_sell):
+        if state in ('SELL', 'NONE'):
+            if can_buy[i]:
+                state = 'BUY'
+                actions.append((int(i), 'BUY'))
+        elif can_sell[i]:
+            state = 'SELL'
+            actions.append((int(i), 'SELL'))
+    return actions, state
+
+# === Backtest ===
+def backtest(candles, buy_threshold=3, sell_threshold=3, fee=0.001, counts=None, **windows):
+    """
+    Long-only demo backtest: BUY opens, SELL closes. The signal on closed bar
+    `i` fills at the open of bar `i + 1`, the price the live bot sees then.
+
+    `counts` may pass precomputed (bullish, bearish) arrays, so several
+    thresholds can be tried on the same flags.
+    """
+    high, low = candles['high'], candles['low']
+    close = np.asarray(candles['close'], dtype=np.float64)
+    opens = np.asarray(candles.get('open', close), dtype=np.float64)
+    n = len(close)
+    if counts is None:
+        counts = signal_counts(signal_flags(high, low, close, **windows))
+    # The last bar is still open when the live bot looks: it can't be the "closed" bar.
+    # Copies, so the caller's `counts` can be reused for the next threshold.
+    bullish, bearish = (np.array(c, copy=True) for c in counts)
+    bullish[-1:] = 0
+    bearish[-1:] = 0
+    actions, state = run_state_machine(bullish, bearish, buy_threshold, sell_threshold)
+
+    bars = np.array([i + 1 for i, _ in actions], dtype=np.int64)
+    is_buy = np.array([action == 'BUY' for _, action in actions], dtype=bool)
+    entries, exits = bars[is_buy], bars[~is_buy]  # SELL only ever follows a BUY
+    closed = entries[:len(exits)]
+    returns = opens[exits] / opens[closed] * (1 - fee) ** 2 - 1
+    trades = [
+        {'entry_bar': int(e), 'entry_price': float(opens[e]),
+         'exit_bar': int(x), 'exit_price': float(opens[x]), 'return': float(r)}
+        for e, x, r in zip(closed, exits, returns)
+    ]
+    open_position = len(entries) > len(exits)
+
+    # Mark-to-market equity on closes: held from the entry open to the exit open
+    delta = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(delta, entries, 1)
+    np.add.at(delta, exits, -1)
+    held = np.cumsum(delta[:n]) > 0
+    held[exits] = True
+    bar_returns = np.zeros(n)
+    bar_returns[1:] = close[1:] / close[:-1] - 1
+    bar_returns[entries] = close[entries] / opens[entries] - 1
+    bar_returns[exits] = opens[exits] / close[exits - 1] - 1
+    factor = 1 + bar_returns * held
+    factor[entries] *= 1 - fee
+    factor[exits] *= 1 - fee
+    equity = np.cumprod(factor)
+    peak = np.maximum.accumulate(equity)
+    drawdown = equity / peak - 1
+
+    return {
+        'bars': n,
+        'trades': trades,
+        'open_position': bool(open_position),
+        'final_state': state,
+        'total_return': float(np.prod(1 + returns) - 1) if len(returns) else 0.0,
+        'win_rate': float((returns > 0).mean()) if len(returns) else 0.0,
+        'max_drawdown': float(drawdown.min()) if n else 0.0,
+        'equity': equity,
+    }
+
+# === Parity with the live check ===
+def check_parity(candles, samples=200, window=100, seed=0):
+    """Compare the arrays with `ichimoku_core.check_signals` on random windows."""
+    import logging
+    import pandas as pd
+    from ichimoku_core import check_signals
+
+    quiet = logging.getLogger("backtest.parity")
+    quiet.disabled = True
+    flags = signal_flags(candles['high'], candles['low'], candles['close'])
+    n = len(candles['close'])
+    rng = np.random.default_rng(seed)
+    mismatches = []
+    for start in rng.integers(0, n - window + 1, size=samples):
+        stop = start + window
+        df = pd.DataFrame({k: candles[k][start:stop] for k in ('high', 'low', 'close')})
+        live = check_signals(df, quiet)
+        vectorized = signals_at(flags, stop - 2)
+        if live != vectorized:
+            mismatches.append((int(stop - 2), live, vectorized))
+    return mismatches
+
+# === Loading ===
+def load_candles(path, allow_gaps=False):
+    """
+    A saved `get_klines()` JSON response, a Binance kline archive (CSV/ZIP),
+    or a candle store `.bin` file (memory-mapped, no copy). If candles are
+    missing, only the newest contiguous run is returned (the rolling windows
+    would otherwise span the hole) unless `allow_gaps` is set.
+    """
+    from candle_store import CANDLE_DTYPE, load_archive_csv, archive_members, find_gaps
+    if path.endswith(".bin"):
+        data = np.memmap(path, dtype=CANDLE_DTYPE, mode="r")
+    elif path.endswith(".json"):
+        from candle_store import rows_to_records
+        with open(path) as f:
+            data = rows_to_records(json.load(f))
+    else:
+        data = np.concatenate([load_archive_csv(raw) for raw in archive_members(path)])
+    gaps = find_gaps(data["open_time"])
+    if gaps and not allow_gaps:
+        start = int(np.searchsorted(data["open_time"], gaps[-1][1], "left"))
+        logging.warning(f"⚠ {path}: {len(gaps)} gap(s) in the history, using the last "
+                        f"{len(data) - start} contiguous candles (skipping {start})")
+        data = data[start:]
+    return {name: data[name] for name in CANDLE_DTYPE.names}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vectorized Ichimoku backtest (demo, signal-only)")
+    parser.add_argument("path", help="Saved get_klines() JSON, Binance kline CSV/ZIP, or candle store .bin")
+    parser.add_argument("--fee", type=float, default=0.001, help="Fee per side (default 0.1%%)")
+    parser.add_argument("--parity", type=int, default=0, metavar="N",
+                        help="Also check N random windows against the live check_signals")
+    parser.add_argument("--allow-gaps", action="store_true",
+                        help="Backtest across missing candles instead of only the newest contiguous run")
+    args = parser.parse_args(argv)
+
+    candles = load_candles(args.path, allow_gaps=args.allow_gaps)
+    started = time.perf_counter()
+    result = backtest(candles, fee=args.fee)
+    elapsed = time.perf_counter() - started
+
+    print(f"📊 {result['bars']} bars backtested in {elapsed * 1000:.1f} ms")
+    print(f"🔁 Trades: {len(result['trades'])} | Open position: {result['open_position']} | Last action: {result['final_state']}")
+    print(f"💰 Total return: {result['total_return'] * 100:.2f}% | Win rate: {result['win_rate'] * 100:.1f}%")
+    print(f"📉 Max drawdown: {result['max_drawdown'] * 100:.2f}%")
+
+    if args.parity:
+        mismatches = check_parity(candles, samples=args.parity)
+        print(f"🧪 Parity with check_signals: {args.parity - len(mismatches)}/{args.parity} windows match")
+        for bar, live, vectorized in mismatches[:5]:
+            print(f"   bar {bar}: live={live} vectorized={vectorized}")
+        if mismatches:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Batched Ichimoku Evaluation (DEMO / SIGNAL-ONLY)
+================================================
+Scores every symbol in one NumPy pass instead of one pandas `check_signals`
+call per symbol (Series allocations, `.iloc` lookups and branching each time).
+
+- `stack_candles()` lines the symbols up in (symbols × bars) high/low/close
+  matrices, right-aligned on the newest bar; shorter histories are NaN padded
+  on the left, which behaves like the missing bars in pandas.
+- `evaluate_batch()` runs the backtester's `ichimoku_lines` / `signal_flags`
+  along the bar axis: all five lines and the ten flags for every symbol at once.
+- `BatchSignals` keeps per-symbol views (`signals()`, `values()`, `step()`) so
+  the state machine and the signal event log work as before.
+- `check_parity()` compares each row with the live `check_signals`.
+
+Usage:
+    python ichimoku_batch.py btc_1h.json eth_1h.json sol_1h.json --parity
+"""
+
+import sys
+import time
+import logging
+import argparse
+import numpy as np
+from ichimoku_core import SIGNAL_THRESHOLD, parse_candles, next_state
+from ichimoku_backtest import SIGNAL_NAMES, ichimoku_lines, signal_flags, signal_counts
+from signal_events import NULL_LOG, make_event, format_event
+
+# === Stacking ===
+def stack_candles(candles_by_symbol, bars=None):
+    """
+    {symbol: Candles (or raw get_klines() rows)} -> symbols, open_time, high,
+    low, close matrices with one row per symbol. `bars` keeps only the newest
+    N columns (default: the longest history).
+    """
+    symbols = list(candles_by_symbol)
+    parsed = [
+        c if hasattr(c, "close") else parse_candles(c)
+        for c in candles_by_symbol.values()
+    ]
+    width = bars or max((len(c) for c in parsed), default=0)
+    open_time = np.full((len(symbols), width), -1, dtype=np.int64)
+    high = np.full((len(symbols), width), np.nan)
+    low = np.full((len(symbols), width), np.nan)
+    close = np.full((len(symbols), width), np.nan)
+    for row, c in enumerate(parsed):
+        n = min(len(c), width)
+        if not n:
+            continue
+        open_time[row, width - n:] = c.open_time[-n:]
+        high[row, width - n:] = c.high[-n:]
+        low[row, width - n:] = c.low[-n:]
+        close[row, width - n:] = c.close[-n:]
+    return symbols, open_time, high, low, close
+
+
+class BatchSignals:
+    """Lines, flags and counts for every symbol; column -2 is the last closed bar."""
+
+    def __init__(self, symbols, open_time, high, low, close, lines, flags):
+        self.symbols = symbols
+        self.index = {symbol: row for row, symbol in enumerate(symbols)}
+        self.open_time = open_time
+        self.high = high
+        self.low = low
+        self.close = close
+        self.lines = lines
+        self.flags = flags
+        self.bullish, self.bearish = signal_counts(flags)
+        self.bars = (~np.isnan(close)).sum(axis=1)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    # === Per-symbol views ===
+    def signals(self, symbol, bar=-2):
+        """The `check_signals` list for one symbol."""
+        row = self.index[symbol]
+        return [name for name in SIGNAL_NAMES if self.flags[name][row, bar]]
+
+    def counts(self, symbol):
+        row = self.index[symbol]
+        return int(self.bullish[row, -2]), int(self.bearish[row, -2])
+
+    def price(self, symbol):
+        return float(self.close[self.index[symbol], -1])
+
+    def bar_open_time(self, symbol):
+        value = int(self.open_time[self.index[symbol], -2])
+        return value if value >= 0 else None
+
+    def values(self, symbol):
+        """Same keys as `ichimoku_core.signal_values()`."""
+        row = self.index[symbol]
+        lines = self.lines
+        return {
+            'close': float(self.close[row, -2]),
+            'tenkan': float(lines['tenkan'][row, -2]),
+            'kijun': float(lines['kijun'][row, -2]),
+            'span_a': float(lines['span_a'][row, -2]),
+            'span_b': float(lines['span_b'][row, -2]),
+            'span_a_next': float(lines['span_a_next'][row, -2]),
+            'span_b_next': float(lines['span_b_next'][row, -2]),
+            'chikou': float(lines['chikou'][row, -2]),
+            'close_26_ago': float(self.close[row, -28]) if self.bars[row] >= 28 else None,
+        }
+
+    def latest(self):
+        """symbol -> signal list for the last closed bar."""
+        return {symbol: self.signals(symbol) for symbol in self.symbols}
+
+    def step(self, symbol, state, log=logging, events=None, interval=None):
+        """
+        `ichimoku_core.evaluate()` for one symbol of the batch: new state and
+        signals, with a structured event or the classic log lines.
+        """
+        signals = self.signals(symbol)
+        bullish, bearish = self.counts(symbol)
+        price = self.price(symbol)
+        new_state = next_state(state, bullish, bearish, price, NULL_LOG)
+        event = make_event(symbol, self.values(symbol), signals, bullish, bearish, state, new_state,
+                           price=price, interval=interval, bar_open_time=self.bar_open_time(symbol))
+        if events is not None:
+            events.emit(event)
+        else:
+            for line in format_event(event, SIGNAL_THRESHOLD):
+                log.info(line)
+        return new_state, signals
+
+
+def evaluate_batch(candles_by_symbol, bars=None, **windows):
+    """All Ichimoku lines and signal flags for every symbol in one pass."""
+    symbols, open_time, high, low, close = stack_candles(candles_by_symbol, bars)
+    lines = ichimoku_lines(high, low, close, **windows)
+    flags = signal_flags(high, low, close, lines=lines)
+    return BatchSignals(symbols, open_time, high, low, close, lines, flags)
+
+# === Parity with the live check ===
+def check_parity(batch):
+    """Symbols whose batch signals differ from `check_signals` on the same candles."""
+    import pandas as pd
+    from ichimoku_core import check_signals
+
+    quiet = logging.getLogger("batch.parity")
+    quiet.disabled = True
+    mismatches = []
+    for symbol in batch.symbols:
+        row = batch.index[symbol]
+        valid = ~np.isnan(batch.close[row])
+        df = pd.DataFrame({
+            'high': batch.high[row, valid],
+            'low': batch.low[row, valid],
+            'close': batch.close[row, valid],
+        })
+        live = check_signals(df, quiet)
+        batched = batch.signals(symbol)
+        if live != batched:
+            mismatches.append((symbol, live, batched))
+    return mismatches
+
+
+def main(argv=None):
+    from ichimoku_backtest import load_candles
+    from ichimoku_sweep import symbol_from_path
+    from ichimoku_core import Candles
+
+    parser = argparse.ArgumentParser(description="Batched Ichimoku signals for many symbols (demo)")
+    parser.add_argument("paths", nargs="+", help="Candle files (get_klines() JSON, Binance CSV/ZIP or candle store .bin), one per symbol")
+    parser.add_argument("--bars", type=int, default=100, help="Newest candles used per symbol (default 100, like the bot)")
+    parser.add_argument("--parity", action="store_true", help="Also compare every symbol with check_signals")
+    args = parser.parse_args(argv)
+
+    candles = {}
+    for path in args.paths:
+        c = load_candles(path)
+        candles[symbol_from_path(path)] = Candles(*(c[name] for name in Candles.__slots__))
+    started = time.perf_counter()
+    batch = evaluate_batch(candles, bars=args.bars)
+    elapsed = time.perf_counter() - started
+
+    print(f"📊 {len(batch)} symbols scored in {elapsed * 1000:.2f} ms")
+    for symbol in batch.symbols:
+        bullish, bearish = batch.counts(symbol)
+        print(f"{symbol:<12} ✔ {bullish} ❌ {bearish}  {batch.signals(symbol)}")
+
+    if args.parity:
+        mismatches = check_parity(batch)
+        print(f"🧪 Parity with check_signals: {len(batch) - len(mismatches)}/{len(batch)} symbols match")
+        for symbol, live, batched in mismatches[:5]:
+            print(f"   {symbol}: live={live} batch={batched}")
+        if mismatches:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Ichimoku Strategy Core (SIGNAL-ONLY)
+====================================
+The exact signal logic used by `coin_ichimoku_template_demo.py`, shared with the
+multi-symbol scanner so every process evaluates the strategy the same way.
+
+- Config field checks (same rules as `get_config()`).
+- Kline parsing, Ichimoku calculation, the 5 signal checks.
+- The 3-of-5 BUY/SELL demo state machine.
+
+Every function takes an optional `log` (a logger or the `logging` module) so
+several symbols can log to their own named logger from one process.
+"""
+
+import logging
+import numpy as np
+from signal_events import NULL_LOG, make_event
+
+REQUIRED_FIELDS = ["username", "email", "api_key", "api_secret", "strategy", "coin", "amount_usdt"]
+
+KLINE_COLUMNS = [
+    'open_time','open','high','low','close','volume',
+    'close_time','qav','num_trades','tbbav','tbqav','ignore'
+]
+
+SIGNAL_THRESHOLD = 3
+
+# === Config Checks ===
+def missing_fields(config):
+    return [field for field in REQUIRED_FIELDS if not config.get(field)]
+
+def symbol_for(config):
+    return config.get("coin", "BTC").upper() + "USDT"
+
+# === Ichimoku Calculation (unchanged) ===
+def calculate_ichimoku(df):
+    high_9 = df['high'].rolling(window=9).max()
+    low_9 = df['low'].rolling(window=9).min()
+    tenkan = (high_9 + low_9) / 2
+
+    high_26 = df['high'].rolling(window=26).max()
+    low_26 = df['low'].rolling(window=26).min()
+    kijun = (high_26 + low_26) / 2
+
+    span_a = ((tenkan + kijun) / 2).shift(26)
+    high_52 = df['high'].rolling(window=52).max()
+    low_52 = df['low'].rolling(window=52).min()
+    span_b = ((high_52 + low_52) / 2).shift(26)
+    chikou = df['close'].shift(-26)
+
+    return tenkan, kijun, span_a, span_b, chikou
+
+# === Parse Data ===
+class Candles:
+    """
+    The numeric kline columns as contiguous NumPy arrays. Only these six
+    columns are converted; the other REST fields are never used.
+    """
+
+    __slots__ = ("open_time", "open", "high", "low", "close", "volume")
+
+    def __init__(self, open_time, open, high, low, close, volume):
+        self.open_time = open_time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    def __len__(self):
+        return len(self.close)
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+    def frame(self):
+        """DataFrame view for code that expects `get_klines()` to return one."""
+        import pandas as pd  # only paid for by callers that want a DataFrame
+        return pd.DataFrame({name: getattr(self, name) for name in self.__slots__}, copy=False)
+
+def parse_candles(klines):
+    # One transpose pass, then NumPy converts each column of strings in C
+    if not klines:
+        empty = np.empty(0)
+        return Candles(np.empty(0, dtype=np.int64), empty, empty, empty, empty, empty)
+    columns = list(zip(*klines))
+    return Candles(
+        np.array(columns[0], dtype=np.int64),
+        *(np.array(columns[i], dtype=np.float64) for i in range(1, 6)),
+    )
+
+def parse_klines(klines):
+    return parse_candles(klines).frame()
+
+# === Main Signal Logic ===
+def signal_values(df):
+    """The indicator values `check_signals` compares, as plain floats."""
+    tenkan, kijun, span_a, span_b, chikou = calculate_ichimoku(df)
+    close = df['close']
+    return {
+        'close': float(close.iloc[-2]),
+        'tenkan': float(tenkan.iloc[-2]),
+        'kijun': float(kijun.iloc[-2]),
+        'span_a': float(span_a.iloc[-2]),
+        'span_b': float(span_b.iloc[-2]),
+        'span_a_next': float(span_a.iloc[-1]),
+        'span_b_next': float(span_b.iloc[-1]),
+        'chikou': float(chikou.iloc[-2]),
+        # None when there is not enough data for the Chikou check
+        'close_26_ago': float(close.iloc[-28]) if len(close) >= 28 else None,
+    }
+
+def signals_from_values(v, log=logging):
+    price = v['close']
+    signals = []
+
+    # TK Cross
+    if v['tenkan'] > v['kijun']:
+        signals.append('tk_bullish')
+        log.info("✔ Tenkan > Kijun (Bullish TK Cross)")
+    elif v['tenkan'] < v['kijun']:
+        signals.append('tk_bearish')
+        log.info("✔ Tenkan < Kijun (Bearish TK Cross)")
+    else:
+        log.info("✘ No TK Cross")
+
+    # Kumo Breakout
+    if price > v['span_a'] and price > v['span_b']:
+        signals.append('kumo_bullish')
+        log.info("✔ Price above Span A and B (Bullish Kumo Breakout)")
+    elif price < v['span_a'] and price < v['span_b']:
+        signals.append('kumo_bearish')
+        log.info("✔ Price below Span A and B (Bearish Kumo Breakout)")
+    else:
+        log.info("✘ No Kumo Breakout")
+
+    # Kijun Cross
+    if price > v['kijun']:
+        signals.append('kijun_bullish')
+        log.info("✔ Price > Kijun (Bullish Kijun Cross)")
+    elif price < v['kijun']:
+        signals.append('kijun_bearish')
+        log.info("✔ Price < Kijun (Bearish Kijun Cross)")
+    else:
+        log.info("✘ No Kijun Cross")
+
+    # Chikou Breakout (add logging here)
+    if v['close_26_ago'] is None:
+        log.warning("⚠ Not enough data for Chikou check")
+    elif v['chikou'] > v['close_26_ago']:
+        signals.append('chikou_bullish')
+        log.info("✔ Chikou > Price 26 periods ago (Bullish Chikou Breakout)")
+    elif v['chikou'] < v['close_26_ago']:
+        signals.append('chikou_bearish')
+        log.info("✔ Chikou < Price 26 periods ago (Bearish Chikou Breakout)")
+    else:
+        log.info("✘ No Chikou Breakout")
+
+    # Kumo Twist (add logging here)
+    if v['span_a_next'] > v['span_b_next'] and v['span_a'] <= v['span_b']:
+        signals.append('twist_bullish')
+        log.info("✔ Bullish Kumo Twist")
+    elif v['span_a_next'] < v['span_b_next'] and v['span_a'] >= v['span_b']:
+        signals.append('twist_bearish')
+        log.info("✔ Bearish Kumo Twist")
+    else:
+        log.info("✘ No Kumo Twist")
+
+    return signals
+
+def check_signals(df, log=logging):
+    return signals_from_values(signal_values(df), log)
+
+def count_signals(signals):
+    bullish = sum(1 for s in signals if 'bullish' in s)
+    bearish = sum(1 for s in signals if 'bearish' in s)
+    return bullish, bearish
+
+# === Demo State Machine ===
+def next_state(state, bullish, bearish, price, log=logging):
+    # Demo logic: Print what would happen, but do NOT trade!
+    if state in ['SELL', 'NONE']:
+        if bullish >= SIGNAL_THRESHOLD:
+            log.info(f"🚦 DEMO SIGNAL: [BUY] Would trigger BUY at {price:.2f} (if live)")
+            state = 'BUY'
+        else:
+            log.info(f"🤝 DEMO SIGNAL: [HOLD] No buy, not enough bullish signals ({bullish}/{SIGNAL_THRESHOLD}).")
+    elif state == 'BUY':
+        if bearish >= SIGNAL_THRESHOLD:
+            log.info(f"🚦 DEMO SIGNAL: [SELL] Would trigger SELL at {price:.2f} (if live)")
+            state = 'SELL'
+        else:
+            log.info(f"🤝 DEMO SIGNAL: [HOLD] No sell, not enough bearish signals ({bearish}/{SIGNAL_THRESHOLD}).")
+    return state
+
+def evaluate(df, state, log=logging, events=None, symbol=None, interval=None):
+    """
+    One full cycle on a fresh kline frame: signals, counts, logs, new state.
+    With an `EventLog`, one structured record replaces the per-check lines.
+    """
+    price, bar_open_time = latest_price(df)
+    return evaluate_values(signal_values(df), price, state, log, events, symbol, interval, bar_open_time)
+
+def latest_price(df):
+    """(current price, open time of the last closed bar) of a kline frame."""
+    price = float(df['close'].iloc[-1])
+    bar_open_time = int(df['open_time'].iloc[-2]) if 'open_time' in df else None
+    return price, bar_open_time
+
+def evaluate_values(values, price, state, log=logging, events=None, symbol=None, interval=None,
+                    bar_open_time=None):
+    """`evaluate()` on indicator values computed elsewhere (e.g. `IncrementalIchimoku.values()`)."""
+    if events is not None:
+        signals = signals_from_values(values, NULL_LOG)
+        bullish, bearish = count_signals(signals)
+        new_state = next_state(state, bullish, bearish, price, NULL_LOG)
+        events.emit(make_event(symbol, values, signals, bullish, bearish, state, new_state,
+                               price=price, interval=interval, bar_open_time=bar_open_time))
+        return new_state, signals
+
+    signals = signals_from_values(values, log)
+    bullish, bearish = count_signals(signals)
+
+    log.info(f"📈 Current Price: {price:.2f}")
+    log.info(f"📊 Signals: {signals}")
+    log.info(f"✔ Bullish: {bullish} | ❌ Bearish: {bearish} | 🕓 Last action: {state}")
+
+    return next_state(state, bullish, bearish, price, log), signals
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Incremental Ichimoku Engine (DEMO)
+==================================
+Stateful, O(1)-per-bar version of `calculate_ichimoku` from
+`coin_ichimoku_template_demo.py`.
+
+- Rolling max/min for the 9/26/52 windows are kept in monotonic deques.
+- The 26-bar cloud displacement and the Chikou look-back use small ring buffers.
+- Every `update()` returns exactly the same tenkan/kijun/span_a/span_b/chikou
+  values that the pandas version gives for the newest row of the same data.
+
+Feed it one kline at a time (oldest first), or seed it with `from_klines()`.
+`to_bytes()` / `from_bytes()` save and restore the whole engine (about 1.4 KB),
+so a restarted bot continues from its last bar (see `state_journal.py`).
+"""
+
+import math
+import struct
+from collections import deque, namedtuple
+
+NAN = float("nan")
+SNAPSHOT_VERSION = 1
+
+IchimokuPoint = namedtuple("IchimokuPoint", "tenkan kijun span_a span_b chikou")
+
+
+class RollingExtreme:
+    """Sliding-window max (or min) over the last `window` values, amortized O(1)."""
+
+    __slots__ = ("window", "is_max", "values", "count")
+
+    def __init__(self, window, is_max=True):
+        self.window = window
+        self.is_max = is_max
+        self.values = deque()  # (index, value), monotonic
+        self.count = 0
+
+    def push(self, value):
+        idx = self.count
+        self.count += 1
+        values = self.values
+        if self.is_max:
+            while values and values[-1][1] <= value:
+                values.pop()
+        else:
+            while values and values[-1][1] >= value:
+                values.pop()
+        values.append((idx, value))
+        while values[0][0] <= idx - self.window:
+            values.popleft()
+        if self.count < self.window:
+            return NAN
+        return values[0][1]
+
+
+class IncrementalIchimoku:
+    """Ichimoku lines for one symbol, updated one closed (or latest) bar at a time."""
+
+    def __init__(self, tenkan=9, kijun=26, senkou_b=52, displacement=26):
+        self.tenkan_window = tenkan
+        self.kijun_window = kijun
+        self.senkou_b_window = senkou_b
+        self.displacement = displacement
+
+        self.high_t = RollingExtreme(tenkan, True)
+        self.low_t = RollingExtreme(tenkan, False)
+        self.high_k = RollingExtreme(kijun, True)
+        self.low_k = RollingExtreme(kijun, False)
+        self.high_b = RollingExtreme(senkou_b, True)
+        self.low_b = RollingExtreme(senkou_b, False)
+
+        # Un-shifted cloud lines; the oldest entry is the value displaced onto the next bar
+        self.span_a_raw = deque(maxlen=displacement)
+        self.span_b_raw = deque(maxlen=displacement)
+        # Closes for the Chikou look-back (price `displacement` bars ago and a little more)
+        self.closes = deque(maxlen=displacement + 2)
+        # Last two points, enough for the Kumo Twist check
+        self.points = deque(maxlen=2)
+        self.bars = 0
+
+    @classmethod
+    def from_klines(cls, highs, lows, closes, **windows):
+        engine = cls(**windows)
+        for h, l, c in zip(highs, lows, closes):
+            engine.update(h, l, c)
+        return engine
+
+    def update(self, high, low, close):
+        high = float(high)
+        low = float(low)
+        close = float(close)
+
+        tenkan = (self.high_t.push(high) + self.low_t.push(low)) / 2
+        kijun = (self.high_k.push(high) + self.low_k.push(low)) / 2
+        mid_b = (self.high_b.push(high) + self.low_b.push(low)) / 2
+
+        if len(self.span_a_raw) == self.displacement:
+            span_a = self.span_a_raw[0]
+            span_b = self.span_b_raw[0]
+        else:
+            span_a = span_b = NAN
+        self.span_a_raw.append((tenkan + kijun) / 2)
+        self.span_b_raw.append(mid_b)
+        self.closes.append(close)
+        self.bars += 1
+
+        # Chikou for this bar is the close `displacement` bars in the future: unknown yet.
+        point = IchimokuPoint(tenkan, kijun, span_a, span_b, NAN)
+        self.points.append(point)
+        return point
+
+    # === Read-only helpers ===
+    @property
+    def last(self):
+        return self.points[-1] if self.points else None
+
+    def next_spans(self):
+        """Span A / Span B already projected onto the bar after the latest one."""
+        if len(self.span_a_raw) < self.displacement:
+            return NAN, NAN
+        return self.span_a_raw[0], self.span_b_raw[0]
+
+    def close_ago(self, n):
+        """Close `n` bars before the latest (0 = latest), NaN if not buffered."""
+        if n >= len(self.closes) or n >= self.bars:
+            return NAN
+        return self.closes[-1 - n]
+
+    def values(self):
+        """
+        The indicator values `check_signals` compares, with the latest update as
+        the last closed bar (same keys as `ichimoku_core.signal_values()`).
+        """
+        last = self.last
+        span_a_next, span_b_next = self.next_spans()
+        close_ago = self.close_ago(self.displacement)
+        return {
+            'close': self.close_ago(0),
+            'tenkan': last.tenkan,
+            'kijun': last.kijun,
+            'span_a': last.span_a,
+            'span_b': last.span_b,
+            'span_a_next': span_a_next,
+            'span_b_next': span_b_next,
+            'chikou': last.chikou,
+            'close_26_ago': None if math.isnan(close_ago) else close_ago,
+        }
+
+    def is_ready(self):
+        last = self.last
+        return last is not None and not math.isnan(last.span_b)
+
+    # === Snapshot (state journal) ===
+    def _extremes(self):
+        return (self.high_t, self.low_t, self.high_k, self.low_k, self.high_b, self.low_b)
+
+    def to_bytes(self):
+        """
+        Every buffer as little-endian float64s: version, windows, bar count, then
+        each rolling window's deque, the cloud/close ring buffers and the last points.
+        """
+        out = [SNAPSHOT_VERSION, self.tenkan_window, self.kijun_window, self.senkou_b_window,
+               self.displacement, self.bars]
+        for extreme in self._extremes():
+            out.append(len(extreme.values))
+            for idx, value in extreme.values:
+                out.append(idx)
+                out.append(value)
+        for buf in (self.span_a_raw, self.span_b_raw, self.closes):
+            out.append(len(buf))
+            out.extend(buf)
+        out.append(len(self.points))
+        for point in self.points:
+            out.extend(point)
+        return struct.pack(f"<{len(out)}d", *out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Engine saved by `to_bytes()`; ValueError if `data` is not one."""
+        if len(data) % 8:
+            raise ValueError("truncated engine snapshot")
+        flat = struct.unpack(f"<{len(data) // 8}d", data)
+        if not flat or flat[0] != SNAPSHOT_VERSION:
+            raise ValueError("unknown engine snapshot version")
+        try:
+            pos = 6
+            tenkan, kijun, senkou_b, displacement, bars = (int(v) for v in flat[1:pos])
+            engine = cls(tenkan, kijun, senkou_b, displacement)
+            engine.bars = bars
+            for extreme in engine._extremes():
+                end = pos + 1 + 2 * int(flat[pos])
+                extreme.values.extend(zip(map(int, flat[pos + 1:end:2]), flat[pos + 2:end:2]))
+                extreme.count = bars  # every window sees every bar
+                pos = end
+            for buf in (engine.span_a_raw, engine.span_b_raw, engine.closes):
+                n = int(flat[pos])
+                buf.extend(flat[pos + 1:pos + 1 + n])
+                pos += 1 + n
+            end = pos + 1 + 5 * int(flat[pos])
+            engine.points.extend(IchimokuPoint._make(flat[i:i + 5]) for i in range(pos + 1, end, 5))
+            pos = end
+        except (IndexError, TypeError) as e:
+            raise ValueError(f"corrupt engine snapshot: {e}")
+        if pos != len(flat):
+            raise ValueError("corrupt engine snapshot: trailing data")
+        return engine
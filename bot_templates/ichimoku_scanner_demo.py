@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+"""
+Ichimoku Multi-Symbol Scanner DEMO (SIGNAL-ONLY VERSION)
+========================================================
+One process that runs the same signal logic as `coin_ichimoku_template_demo.py`
+for many coins at once, instead of one script copy (and one interpreter) per coin.
+
+- Symbols come from `--coins` (default: the Telegram demo's COIN_CHOICES) or from
+  every config JSON in `--requests-dir` (e.g. `./bot_requests`).
+- Users on the same coin share one symbol slot: work scales with distinct symbols.
+- Klines are fetched concurrently through one shared `RestGateway` (pooled
+  connections, weight limits, retries).
+- Each symbol keeps its own BUY/SELL/NONE state and logs to its own named logger.
+- `--metrics-port` serves live stage timings, errors and bar staleness
+  (Prometheus format) and an on-demand profiler (see `runtime_metrics.py`).
+- `--watch` hot-adds/removes users while running as their configs appear in or
+  leave `--requests-dir` (see `bot_deployer.py`): one process for every user.
+- Every symbol's last action and indicator buffers are checkpointed once per
+  scan in one file (see `state_journal.py`): a restart resumes in milliseconds
+  and evaluates only the candles missed while down (`--no-journal` to disable).
+- NO order execution, NO API trading permissions required!
+
+Usage:
+    python ichimoku_scanner_demo.py --coins BTC,ETH,SOL
+    python ichimoku_scanner_demo.py --requests-dir ./bot_requests --workers 16
+    python ichimoku_scanner_demo.py --coins BTC,ETH,SOL,AVAX,NEAR --batch
+    python ichimoku_scanner_demo.py --coins BTC,ETH --timeframes 15m,1h,4h
+    python ichimoku_scanner_demo.py --requests-dir ../bot_requests --watch
+"""
+
+import os
+import sys
+import time
+import json
+import logging
+import asyncio
+import argparse
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ichimoku_core import missing_fields, symbol_for, parse_candles, signal_values, latest_price, evaluate_values
+from ichimoku_batch import evaluate_batch
+from multi_timeframe import MultiTimeframe, BASE_INTERVAL
+from kline_cache import KlineCache, ICHIMOKU_LOOKBACK, interval_ms
+from candle_store import CandleStore
+from signal_events import EventLog, load_states
+from bar_scheduler import BarScheduler
+from rest_gateway import RestGateway, DEFAULT_BASE_URL
+from bot_deployer import Deployer, is_config_name
+from runtime_metrics import metrics, MetricsServer
+from state_journal import StateJournal, SymbolTracker
+
+# === CONFIGURATION ===
+COIN_CHOICES = ["ETH", "BTC", "SOL", "AVAX", "NEAR"]  # same list as telegram_bot_demo.py
+REQUESTS_DIR = "./bot_requests"
+MAX_WORKERS = 8
+KLINE_LIMIT = 100
+BAR_CLOSE_DELAY = 3  # seconds after each candle close before scanning
+interval = "1h"  # Client.KLINE_INTERVAL_1HOUR
+
+data_dir = "demo_bot_data"
+scanner_log_file = os.path.join(data_dir, "scanner_ichimoku_signals.log")
+scanner_events_file = os.path.join(data_dir, "scanner_signal_events.jsonl")
+scanner_state_file = os.path.join(data_dir, "scanner_strategy_state.sqlite3")
+
+
+class SymbolSlot:
+    """Per-symbol scanner state: last action, subscribed users and a named logger."""
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.state = 'NONE'  # last action: 'BUY', 'SELL', or 'NONE'
+        self.users = set()
+        self.signals = []
+        self.errors = 0
+        self.tracker = None  # SymbolTracker when the state journal is on
+        self.lock = threading.Lock()  # one evaluation at a time per symbol
+        self.log = logging.getLogger(f"scanner.{symbol}")
+
+
+# === Symbol Sources ===
+def load_request_configs(requests_dir):
+    configs = []
+    if not os.path.isdir(requests_dir):
+        return configs
+    for fn in sorted(os.listdir(requests_dir)):
+        if not is_config_name(fn):
+            continue
+        path = os.path.join(requests_dir, fn)
+        try:
+            with open(path) as f:
+                loaded = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"⚠ Skipping unreadable config {path}: {e}")
+            continue
+        missing = missing_fields(loaded)
+        if missing:
+            logging.warning(f"⚠ Skipping {path}: missing {', '.join(missing)}")
+            continue
+        configs.append(loaded)
+    return configs
+
+def build_slots(coins=None, configs=None):
+    slots = {}
+    for coin in coins or []:
+        symbol = symbol_for({"coin": coin})
+        slots.setdefault(symbol, SymbolSlot(symbol))
+    for config in configs or []:
+        symbol = symbol_for(config)
+        slot = slots.setdefault(symbol, SymbolSlot(symbol))
+        slot.users.add(config.get("user_id") or config["username"])
+    return slots
+
+def attach_trackers(slots, journal, interval):
+    """Resume every slot from its last checkpoint (one query for all symbols)."""
+    entries = journal.load_all(interval)
+    for symbol, slot in slots.items():
+        slot.tracker = SymbolTracker.from_entry(symbol, interval, entries.get((symbol, interval)), slot.state)
+        slot.state = slot.tracker.state
+    return len(entries)
+
+# === Scanning ===
+def scan_symbol(cache, slot, interval=interval, events=None, journal=None):
+    with slot.lock:
+        if slot.tracker is None:
+            _scan_symbol(cache, slot, interval, events)
+            return
+        _scan_tracked(cache, slot, interval, events)
+        if journal is not None:
+            try:
+                journal.save(slot.tracker)
+            except Exception as e:
+                slot.errors += 1
+                slot.log.error(f"Checkpoint error: {e}")
+
+def _fetch_candles(cache, slot, interval):
+    try:
+        with metrics.timer("fetch"):
+            klines = cache.get_klines(symbol=slot.symbol, interval=interval, limit=KLINE_LIMIT)
+        if len(klines) < ICHIMOKU_LOOKBACK:
+            slot.log.info(f"⏳ Warming up: {len(klines)}/{ICHIMOKU_LOOKBACK} candles")
+            return None
+        with metrics.timer("parse"):
+            return parse_candles(klines)
+    except Exception as e:
+        slot.errors += 1
+        slot.log.error(f"Scan error: {e}")
+        return None
+
+def _scan_symbol(cache, slot, interval, events):
+    candles = _fetch_candles(cache, slot, interval)
+    if candles is None:
+        return
+    try:
+        with metrics.timer("indicators"):
+            df = candles.frame()
+            values = signal_values(df)
+        before = slot.state
+        with metrics.timer("signals"):
+            price, bar_open_time = latest_price(df)
+            slot.state, slot.signals = evaluate_values(values, price, slot.state, slot.log, events, slot.symbol,
+                                                       interval, bar_open_time)
+        metrics.record_cycle(slot.symbol, interval, bar_open_time, slot.signals, before, slot.state, interval_ms(interval))
+    except Exception as e:
+        slot.errors += 1
+        slot.log.error(f"Scan error: {e}")
+
+def _scan_tracked(cache, slot, interval, events):
+    """`_scan_symbol()` on the slot's incremental tracker: only candles closed since its last bar."""
+    tracker = slot.tracker
+    try:
+        with metrics.timer("fetch"):
+            # The streamed bar's own time, so replayed (historical) bars don't look hours behind
+            now_ms = cache.streamed_open_time(slot.symbol, interval) or time.time() * 1000
+            klines = tracker.fetch(cache, now_ms, KLINE_LIMIT)
+        if len(klines) < ICHIMOKU_LOOKBACK:
+            slot.log.info(f"⏳ Warming up: {len(klines)}/{ICHIMOKU_LOOKBACK} candles")
+            return
+        before = slot.state
+        with metrics.timer("signals"):
+            tracker.update(klines, slot.log, events)
+        slot.state, slot.signals = tracker.state, tracker.signals
+        metrics.record_cycle(slot.symbol, interval, tracker.last_open_time, slot.signals, before, slot.state,
+                             interval_ms(interval))
+    except Exception as e:
+        slot.errors += 1
+        slot.log.error(f"Scan error: {e}")
+
+def scan_once(cache, slots, pool, interval=interval, events=None, journal=None):
+    started = time.time()
+    current = list(slots.values())
+    # list() waits for every symbol; scan_symbol never raises
+    with metrics.timer("cycle"):
+        list(pool.map(lambda slot: scan_symbol(cache, slot, interval, events), current))
+        if journal is not None:
+            with metrics.timer("checkpoint"):
+                # The whole scan in one transaction
+                journal.checkpoint([slot.tracker for slot in current if slot.tracker is not None])
+    logging.info(f"🔎 Scanned {len(current)} symbols in {time.time() - started:.2f}s | cache {cache.stats()}")
+
+def scan_batch(cache, slots, pool, interval=interval, events=None):
+    """Fetch concurrently, then score every symbol in one NumPy pass."""
+    started = time.time()
+    current = list(slots.values())  # --watch may add/remove slots meanwhile
+    with metrics.timer("cycle"):
+        fetched = pool.map(lambda slot: (slot, _fetch_candles(cache, slot, interval)), current)
+        candles = {slot.symbol: (slot, c) for slot, c in fetched if c is not None}
+        if candles:
+            with metrics.timer("indicators"):
+                batch = evaluate_batch({symbol: c for symbol, (_, c) in candles.items()}, bars=KLINE_LIMIT)
+            with metrics.timer("signals"):
+                for symbol in batch.symbols:
+                    slot = candles[symbol][0]
+                    with slot.lock:
+                        before = slot.state
+                        slot.state, slot.signals = batch.step(symbol, slot.state, slot.log, events, interval)
+                    metrics.record_cycle(symbol, interval, batch.bar_open_time(symbol), slot.signals,
+                                         before, slot.state, interval_ms(interval))
+    logging.info(f"🔎 Batch-scanned {len(candles)}/{len(current)} symbols in {time.time() - started:.2f}s | cache {cache.stats()}")
+
+# === Multi-Timeframe (one 1m feed per symbol) ===
+def build_timeframes(cache, slots, timeframes, events=None):
+    frames = {}
+    states = load_states(scanner_events_file, by_interval=True)
+    for symbol, slot in slots.items():
+        frame = MultiTimeframe(symbol, timeframes, fetch=cache.get_klines, log=slot.log, events=events)
+        for interval, tf in frame.timeframes.items():
+            tf.state = states.get((symbol, interval), 'NONE')
+        frames[symbol] = frame
+    return frames
+
+def warm_timeframes(cache, frames, pool):
+    """
+    Seed every timeframe once from its native klines and evaluate its newest
+    closed bar (what the first scan does without --timeframes), then keep only
+    the 1m feed.
+    """
+    def warm(frame):
+        frame.warm_up(KLINE_LIMIT)
+        frame.evaluate_latest()
+
+    list(pool.map(warm, frames.values()))
+    for symbol, frame in frames.items():
+        for interval in frame.timeframes:
+            if interval != BASE_INTERVAL:
+                cache.invalidate(symbol, interval)
+
+def feed_timeframes(cache, slot, frame):
+    with slot.lock:
+        try:
+            with metrics.timer("fetch"):
+                rows = cache.get_klines(symbol=slot.symbol, interval=BASE_INTERVAL, limit=KLINE_LIMIT)
+            before = {interval: tf.state for interval, tf in frame.timeframes.items()}
+            with metrics.timer("indicators"):
+                closed = frame.feed(rows[:-1])  # the last row is still open
+            for interval, state, signals in closed:
+                slot.signals = signals
+                tf = frame.timeframes[interval]
+                metrics.record_cycle(slot.symbol, interval, tf.last_open_time, signals, before[interval], state,
+                                     tf.builder.step)
+                before[interval] = state  # several bars of one timeframe can close in one feed
+        except Exception as e:
+            slot.errors += 1
+            slot.log.error(f"Scan error: {e}")
+
+def scan_timeframes(cache, slots, pool, interval=BASE_INTERVAL, events=None, frames=None):
+    """`scan_once()` for --timeframes: feed the new 1m candles to every symbol's timeframes."""
+    started = time.time()
+    pairs = [(slot, frames.get(symbol)) for symbol, slot in list(slots.items())]
+    pairs = [(slot, frame) for slot, frame in pairs if frame is not None]
+    with metrics.timer("cycle"):
+        list(pool.map(lambda pair: feed_timeframes(cache, *pair), pairs))
+    logging.info(f"🔎 Fed {BASE_INTERVAL} candles of {len(pairs)} symbols in {time.time() - started:.2f}s | cache {cache.stats()}")
+
+def run_stream(cache, slots, pool, interval, url=None, offline=False, events=None, frames=None, deploy=None,
+               journal=None):
+    # Imported here so REST-only runs don't need the websockets package
+    from kline_stream import KlineStream, BINANCE_STREAM_URL
+
+    def on_closed(symbol, interval):
+        slot = slots.get(symbol)
+        if slot is None:
+            return  # removed by --watch; its unsubscribe is on the way
+        if frames is not None:
+            pool.submit(feed_timeframes, cache, slot, frames[symbol])
+        else:
+            pool.submit(scan_symbol, cache, slot, interval, events, journal)
+
+    stream = KlineStream(cache, list(slots), interval, on_closed, url=url or BINANCE_STREAM_URL,
+                         max_reconnects=0 if offline else None)
+    if deploy is not None:
+        deploy.stream = stream
+    try:
+        asyncio.run(stream.run())
+    except KeyboardInterrupt:
+        stream.stop()
+    logging.info(f"📡 Stream ended after {stream.messages} messages | cache {cache.stats()}")
+
+# === Hot Deploy (--watch) ===
+class HotDeploy:
+    """Deployer callbacks: add and remove users' symbols while the scanner runs."""
+
+    def __init__(self, cache, slots, pool, interval, events=None, frames=None, timeframes=None,
+                 states=None, pinned=(), journal=None):
+        """
+        frames/timeframes: the --timeframes setup, if any
+        states:            restored {symbol: state} for symbols added later
+        pinned:            --coins symbols, kept even when no user is left
+        journal:           StateJournal: new symbols resume from their last checkpoint
+        """
+        self.cache = cache
+        self.slots = slots
+        self.pool = pool
+        self.interval = interval
+        self.events = events
+        self.frames = frames
+        self.timeframes = timeframes
+        self.states = states or {}
+        self.pinned = set(pinned)
+        self.journal = journal
+        self.pending = {}  # symbol -> slot still running its first evaluation
+        self.stream = None  # set by run_stream()
+        self.lock = threading.Lock()
+
+    def add(self, symbol, user_id, config=None):
+        with self.lock:
+            slot = self.slots.get(symbol) or self.pending.get(symbol)
+            if slot is not None:
+                if user_id not in slot.users:
+                    slot.users.add(user_id)
+                    slot.log.info(f"👤 {user_id} joined ({len(slot.users)} users)")
+                return None
+            slot = SymbolSlot(symbol)
+            slot.state = self.states.get(symbol, 'NONE')
+            slot.users.add(user_id)
+            self.pending[symbol] = slot
+        if self.journal is not None:
+            entry = self.journal.load(symbol, self.interval)
+            slot.tracker = SymbolTracker.from_entry(symbol, self.interval, entry, slot.state)
+            slot.state = slot.tracker.state
+        # First evaluation right away, not at the next bar close
+        return self.pool.submit(self._deploy, slot)
+
+    def _deploy(self, slot):
+        started = time.time()
+        frame = None
+        if self.timeframes:
+            frame = MultiTimeframe(slot.symbol, self.timeframes, fetch=self.cache.get_klines,
+                                   log=slot.log, events=self.events)
+            try:
+                frame.warm_up(KLINE_LIMIT)
+                for interval in frame.timeframes:
+                    if interval != BASE_INTERVAL:
+                        self.cache.invalidate(slot.symbol, interval)
+                frame.evaluate_latest()
+            except Exception as e:
+                slot.errors += 1
+                slot.log.error(f"Warm-up error: {e}")
+        else:
+            scan_symbol(self.cache, slot, self.interval, self.events, self.journal)
+        with self.lock:
+            self.pending.pop(slot.symbol, None)
+            if not slot.users:
+                return  # every user left before the first evaluation finished
+            if frame is not None:
+                self.frames[slot.symbol] = frame  # before the slot, so scans always find it
+            self.slots[slot.symbol] = slot
+        if self.stream is not None:
+            self.stream.subscribe(slot.symbol)
+        slot.log.info(f"🚀 Deployed for {', '.join(sorted(slot.users))}: "
+                      f"first evaluation in {time.time() - started:.2f}s ({len(self.slots)} symbols)")
+
+    def remove(self, symbol, user_id):
+        with self.lock:
+            slot = self.slots.get(symbol) or self.pending.get(symbol)
+            if slot is None or user_id not in slot.users:
+                return
+            slot.users.discard(user_id)
+            if slot.users or symbol in self.pinned:
+                slot.log.info(f"👤 {user_id} left ({len(slot.users)} users)")
+                return
+            self.slots.pop(symbol, None)
+            if self.frames is not None:
+                self.frames.pop(symbol, None)
+        if self.stream is not None:
+            self.stream.unsubscribe(symbol)
+        slot.log.info(f"🛑 Removed: no users left ({len(self.slots)} symbols)")
+
+# === Main Loop ===
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ichimoku multi-symbol scanner (demo, signal-only)")
+    parser.add_argument("--coins", help="Comma-separated coins, e.g. BTC,ETH (default: COIN_CHOICES)")
+    parser.add_argument("--requests-dir", help="Scan every coin found in the config JSONs in this folder")
+    parser.add_argument("--interval", default=interval, help="Kline interval, e.g. 1m, 15m, 1h, 4h")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Max concurrent kline fetches")
+    parser.add_argument("--once", action="store_true", help="Run a single scan and exit")
+    parser.add_argument("--stream", action="store_true", help="Use the Binance kline WebSocket stream instead of polling")
+    parser.add_argument("--stream-url", help="Stream endpoint (implies --stream), e.g. a local kline_replay_server.py")
+    parser.add_argument("--offline", action="store_true", help="No REST calls at all (for replay testing)")
+    parser.add_argument("--timeframes", help="Several timeframes from one 1m feed, e.g. 15m,1h,4h (overrides --interval)")
+    parser.add_argument("--batch", action="store_true", help="Score all symbols in one NumPy pass (polling mode)")
+    parser.add_argument("--rest-url", default=DEFAULT_BASE_URL, help="REST endpoint, e.g. a local mock_binance_server.py")
+    parser.add_argument("--human-log", action="store_true", help="Also log the classic per-check emoji lines")
+    parser.add_argument("--metrics-port", type=int, help="Serve /metrics and the profiler toggle on this local port, e.g. 9108")
+    parser.add_argument("--watch", action="store_true",
+                        help=f"Hot-add/remove users as configs appear in/leave --requests-dir (default {REQUESTS_DIR})")
+    parser.add_argument("--journal", action=argparse.BooleanOptionalAction, default=True,
+                        help=f"Checkpoint state + indicators every scan and resume from {scanner_state_file} "
+                             "(not with --batch / --timeframes)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    os.makedirs(data_dir, exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(name)s | %(message)s",
+        handlers=[
+            logging.StreamHandler(),
+            logging.FileHandler(scanner_log_file)
+        ]
+    )
+
+    if args.watch and not args.requests_dir:
+        args.requests_dir = REQUESTS_DIR
+    configs = load_request_configs(args.requests_dir) if args.requests_dir else []
+    coins = args.coins.split(",") if args.coins else ([] if configs or args.watch else COIN_CHOICES)
+    coins = [c.strip() for c in coins if c.strip()]
+    slots = build_slots(coins, configs)
+    if not slots and not args.watch:
+        print("[CONFIG ERROR] No symbols to scan. Use --coins or --requests-dir.")
+        sys.exit(1)
+
+    # One JSON record per symbol per scan; the emoji lines are optional at this scale
+    events = EventLog(scanner_events_file, human_log=logging.getLogger("scanner") if args.human_log else None)
+    states = load_states(scanner_events_file)
+    for symbol, state in states.items():
+        if symbol in slots:
+            slots[symbol].state = state
+
+    store = CandleStore(os.path.join(data_dir, "candles"))
+    # Klines are public data: no API keys needed
+    cache = KlineCache(None if args.offline else RestGateway(args.rest_url, workers=args.workers), store=store)
+
+    server = None
+    if args.metrics_port is not None:
+        metrics.add_collector("kline_cache", cache.stats)
+        if cache.client is not None:
+            metrics.add_collector("rest_gateway", cache.client.stats)
+        metrics.add_collector("scanner", lambda: {"symbols": len(slots), "events_written": events.written,
+                                                  "errors": sum(slot.errors for slot in list(slots.values()))})
+        server = MetricsServer(args.metrics_port, profile_dir=data_dir).start()
+
+    print("\n*********** DEMO MODE: NO TRADES WILL BE EXECUTED ***********")
+    timeframes = [t.strip() for t in args.timeframes.split(",") if t.strip()] if args.timeframes else []
+    print(f"🚀 Scanning {len(slots)} symbols on {', '.join(timeframes) or args.interval}: {', '.join(sorted(slots))}")
+    print(f"Signals are logged to {scanner_log_file}; signal events are saved in: {scanner_events_file}\n")
+
+    scan = scan_batch if args.batch else scan_once
+    feed_interval = args.interval
+    frames = journal = None
+    if timeframes:
+        # Only 1m candles are fetched/streamed; every timeframe is built from them
+        frames = build_timeframes(cache, slots, timeframes, events)
+        scan = functools.partial(scan_timeframes, frames=frames)
+        feed_interval = BASE_INTERVAL
+    elif args.journal and not args.batch:
+        started = time.time()
+        journal = StateJournal(scanner_state_file)
+        resumed = attach_trackers(slots, journal, feed_interval)
+        print(f"State journal: {scanner_state_file} ({resumed} symbols resumed in "
+              f"{(time.time() - started) * 1000:.0f} ms)\n")
+        scan = functools.partial(scan_once, journal=journal)
+        if server is not None:
+            metrics.add_collector("state_journal", journal.stats)
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            if frames is not None and not args.offline:
+                warm_timeframes(cache, frames, pool)
+            deploy = deployer = None
+            if args.watch:
+                # New users join this process; no interpreter per user
+                deploy = HotDeploy(cache, slots, pool, feed_interval, events, frames, timeframes, states,
+                                   pinned={symbol_for({"coin": coin}) for coin in coins}, journal=journal)
+                deployer = Deployer(args.requests_dir, deploy.add, deploy.remove).start()
+            try:
+                if args.stream or args.stream_url or args.offline:
+                    if not args.offline:
+                        scan(cache, slots, pool, feed_interval, events)  # REST warm start
+                    run_stream(cache, slots, pool, feed_interval, args.stream_url, args.offline, events, frames, deploy,
+                               journal)
+                    return
+                if args.once:
+                    scan(cache, slots, pool, feed_interval, events)
+                    return
+                # One timer for all symbols: wake BAR_CLOSE_DELAY seconds after every candle close
+                scheduler = BarScheduler(delay=BAR_CLOSE_DELAY, server_time=cache.client.get_server_time)
+                if server is not None:
+                    metrics.add_collector("scheduler", scheduler.stats)
+                scheduler.add(feed_interval, lambda bar_open_ms: scan(cache, slots, pool, feed_interval, events), run_now=True)
+                scheduler.run()
+            finally:
+                if deployer is not None:
+                    deployer.stop()  # before the pool shuts down: no new deployments
+    finally:
+        events.close()  # writes whatever is still queued
+        if journal is not None:
+            journal.close()
+        if server is not None:
+            server.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Ichimoku Parameter Sweep (DEMO / OFFLINE)
+=========================================
+Backtests every combination of Ichimoku windows and signal thresholds
+(tenkan, kijun, senkou_b, displacement, buy threshold, sell threshold) on one or
+more symbols, fanned out over a process pool.
+
+- Each task loads one symbol once and keeps a cache of rolling max/min per
+  window, shared by every parameter set in the task.
+- Flags are computed once per window set; all thresholds reuse them.
+- Results are written to a columnar file (Parquet when `pyarrow` is installed,
+  otherwise NumPy `.npz`) and the best rows are printed.
+
+Usage:
+    python ichimoku_sweep.py btc_1h.json eth_1h.json --tenkan 7,9,12 --kijun 22,26,30 \\
+        --senkou-b 44,52 --displacement 22,26 --buy 2,3,4 --sell 2,3,4 --workers 8
+"""
+
+import os
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from ichimoku_backtest import load_candles, signal_flags, signal_counts, backtest
+
+RESULT_COLUMNS = [
+    ("symbol", "U20"),
+    ("tenkan", np.int32), ("kijun", np.int32), ("senkou_b", np.int32), ("displacement", np.int32),
+    ("buy_threshold", np.int32), ("sell_threshold", np.int32),
+    ("trades", np.int32), ("total_return", np.float64), ("win_rate", np.float64),
+    ("max_drawdown", np.float64),
+]
+
+def symbol_from_path(path):
+    return os.path.basename(path).split(".")[0].split("_")[0].split("-")[0].upper()
+
+def sweep_task(path, window_sets, thresholds, fee):
+    """One worker task: one symbol, a chunk of window sets, every threshold pair."""
+    candles = load_candles(path)
+    symbol = symbol_from_path(path)
+    extremes = {}  # (window, 'max'|'min') -> array, shared across window sets
+    rows = []
+    for tenkan, kijun, senkou_b, displacement in window_sets:
+        flags = signal_flags(candles['high'], candles['low'], candles['close'],
+                             tenkan=tenkan, kijun=kijun, senkou_b=senkou_b,
+                             displacement=displacement, extremes=extremes)
+        counts = signal_counts(flags)
+        for buy, sell in thresholds:
+            result = backtest(candles, buy, sell, fee, counts=counts)
+            rows.append((symbol, tenkan, kijun, senkou_b, displacement, buy, sell,
+                         len(result['trades']), result['total_return'],
+                         result['win_rate'], result['max_drawdown']))
+    return rows
+
+def build_tasks(paths, window_sets, thresholds, fee, workers):
+    # Chunks keep the same senkou_b/kijun windows together so their extremes are reused
+    window_sets = sorted(window_sets, key=lambda w: (w[2], w[1], w[0], w[3]))
+    chunks = max(1, -(-workers * 2 // max(1, len(paths))))
+    size = max(1, -(-len(window_sets) // chunks))
+    return [
+        (path, window_sets[i:i + size], thresholds, fee)
+        for path in paths
+        for i in range(0, len(window_sets), size)
+    ]
+
+def run_sweep(paths, window_sets, thresholds, fee=0.001, workers=None):
+    workers = workers or os.cpu_count() or 1
+    tasks = build_tasks(paths, window_sets, thresholds, fee, workers)
+    rows = []
+    if workers == 1:
+        for task in tasks:
+            rows.extend(sweep_task(*task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(sweep_task, *zip(*tasks)):
+                rows.extend(result)
+    return np.array(rows, dtype=RESULT_COLUMNS)
+
+# === Output ===
+def write_results(results, path):
+    """Parquet if pyarrow is available (or asked for), otherwise NumPy .npz columns."""
+    if path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.table({name: results[name] for name, _ in RESULT_COLUMNS})
+        pq.write_table(table, path)
+    else:
+        np.savez(path, **{name: results[name] for name, _ in RESULT_COLUMNS})
+    return path
+
+def default_output(data_dir="demo_bot_data"):
+    try:
+        import pyarrow  # noqa: F401
+        ext = "parquet"
+    except ImportError:
+        ext = "npz"
+    return os.path.join(data_dir, f"ichimoku_sweep.{ext}")
+
+def int_list(text):
+    return [int(v) for v in text.split(",") if v.strip()]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ichimoku parameter sweep (demo, offline)")
+    parser.add_argument("paths", nargs="+", help="Candle files (get_klines() JSON, Binance CSV/ZIP or candle store .bin), one per symbol")
+    parser.add_argument("--tenkan", type=int_list, default=[9])
+    parser.add_argument("--kijun", type=int_list, default=[26])
+    parser.add_argument("--senkou-b", type=int_list, default=[52])
+    parser.add_argument("--displacement", type=int_list, default=[26])
+    parser.add_argument("--buy", type=int_list, default=[3], help="Bullish signals needed to BUY")
+    parser.add_argument("--sell", type=int_list, default=[3], help="Bearish signals needed to SELL")
+    parser.add_argument("--fee", type=float, default=0.001)
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: all cores)")
+    parser.add_argument("-o", "--output", help="Result file (.parquet or .npz)")
+    parser.add_argument("--top", type=int, default=10, help="Rows to print, ranked by total return")
+    args = parser.parse_args(argv)
+
+    window_sets = list(itertools.product(args.tenkan, args.kijun, args.senkou_b, args.displacement))
+    thresholds = list(itertools.product(args.buy, args.sell))
+    started = time.perf_counter()
+    results = run_sweep(args.paths, window_sets, thresholds, args.fee, args.workers)
+    elapsed = time.perf_counter() - started
+
+    output = args.output or default_output()
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    write_results(results, output)
+    print(f"🧮 {len(results)} backtests in {elapsed:.2f}s -> {output}")
+
+    ranked = results[np.argsort(-results['total_return'], kind="stable")][:args.top]
+    print("symbol      tenkan kijun senkou_b disp buy sell trades   return   win%   maxDD")
+    for r in ranked:
+        print(f"{r['symbol']:<11} {r['tenkan']:>6} {r['kijun']:>5} {r['senkou_b']:>8} {r['displacement']:>4} "
+              f"{r['buy_threshold']:>3} {r['sell_threshold']:>4} {r['trades']:>6} "
+              f"{r['total_return'] * 100:>7.2f}% {r['win_rate'] * 100:>5.1f} {r['max_drawdown'] * 100:>6.2f}%")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Shared Kline Cache (DEMO)
+=========================
+One in-memory copy of the klines for each (symbol, interval), shared by every
+consumer in the process, so 200 users on BTC cost one Binance request per bar.
+
+- Drop-in for `client.get_klines(symbol=..., interval=..., limit=...)`.
+- Until the newest (still-open) bar closes, requests are served from memory.
+- After a close, only the bars since the last fetch are requested (`startTime`).
+- Rows older than the Ichimoku look-back (52 + 26 bars, or the largest `limit`
+  asked for) are evicted.
+- Concurrent requests for the same key wait for one fetch instead of duplicating it.
+- With a `CandleStore`, a cold key warm-starts from disk (only the missing tail
+  is fetched) and every closed bar is appended to the store.
+- `stats()` exposes hit / miss / refresh / warm-start counters.
+"""
+
+import time
+import threading
+
+ICHIMOKU_LOOKBACK = 52 + 26  # Span B window + cloud displacement
+
+_UNIT_MS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
+def interval_ms(interval):
+    """Length of a Binance kline interval string ('1m', '4h', '1d', ...) in ms."""
+    unit = interval[-1]
+    if unit == "M":  # calendar month; only used as an upper bound here
+        return int(interval[:-1]) * 31 * 86_400_000
+    return int(interval[:-1]) * _UNIT_MS[unit]
+
+
+class _Entry:
+    __slots__ = ("rows", "retain", "fetched_at", "streamed", "lock")
+
+    def __init__(self, retain):
+        self.rows = []
+        self.retain = retain
+        self.fetched_at = 0.0
+        self.streamed = False  # kept current by push(); no REST refresh needed
+        self.lock = threading.Lock()
+
+
+class KlineCache:
+    def __init__(self, client, retain=ICHIMOKU_LOOKBACK, max_age=None, clock=time.time, store=None):
+        """
+        client:  anything with `get_klines(symbol=, interval=, limit=, startTime=)`
+        retain:  minimum number of bars kept per key
+        max_age: optional seconds after which the open bar is re-fetched even if
+                 it has not closed (None = refresh only on bar close)
+        clock:   seconds since the epoch; swap in Binance server time if needed
+        store:   optional CandleStore for warm starts and persisting closed bars
+        """
+        self.client = client
+        self.retain = retain
+        self.max_age = max_age
+        self.clock = clock
+        self.store = store
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.warm_starts = 0
+
+    def _entry(self, key, limit):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = _Entry(max(self.retain, limit))
+            elif limit > entry.retain:
+                entry.retain = limit
+                if not entry.streamed:
+                    entry.rows = []  # need a deeper history than cached: refetch
+            return entry
+
+    def _is_fresh(self, entry, now):
+        if not entry.rows:
+            return False
+        if entry.streamed:
+            return True
+        if now * 1000 > entry.rows[-1][6]:  # close_time of the open bar has passed
+            return False
+        return self.max_age is None or now - entry.fetched_at <= self.max_age
+
+    def get_klines(self, symbol, interval, limit=100, **_ignored):
+        key = (symbol, interval)
+        entry = self._entry(key, limit)
+        with entry.lock:
+            now = self.clock()
+            if self._is_fresh(entry, now):
+                with self.lock:
+                    self.hits += 1
+            else:
+                self._fetch(entry, symbol, interval, now)
+            return entry.rows[-limit:]
+
+    def _fetch(self, entry, symbol, interval, now):
+        rows = entry.rows
+        missing = entry.retain
+        if rows:
+            last_open = rows[-1][0]
+            missing = int((now * 1000 - last_open) // interval_ms(interval)) + 1
+        if missing < entry.retain:
+            # Re-fetch from the previously open bar: it has closed (or aged) since
+            new = self.client.get_klines(
+                symbol=symbol, interval=interval, limit=missing + 1, startTime=last_open
+            )
+            keep = [r for r in rows if r[0] < last_open]
+            rows = keep + list(new)
+            with self.lock:
+                self.refreshes += 1
+        else:
+            rows = self._warm_start(symbol, interval, entry.retain, now) if self.store else None
+            if rows is None:
+                rows = list(self.client.get_klines(symbol=symbol, interval=interval, limit=entry.retain))
+                with self.lock:
+                    self.misses += 1
+        entry.rows = rows[-entry.retain:]
+        entry.fetched_at = now
+        if self.store is not None:
+            self.store.append(symbol, interval, entry.rows[:-1])  # the last bar is still open
+
+    def _warm_start(self, symbol, interval, retain, now):
+        """Stored history + only the bars after it, or None if the store can't help."""
+        from candle_store import records_to_rows, find_gaps
+        stored = self.store.tail(symbol, interval, retain)
+        if not len(stored):
+            return None
+        step = interval_ms(interval)
+        if find_gaps(stored["open_time"], step):
+            return None  # the stored tail has holes: the indicators need contiguous bars
+        next_open = int(stored["open_time"][-1]) + step
+        missing = int((now * 1000 - next_open) // step) + 1
+        if missing >= retain:
+            return None  # the gap is longer than what we keep anyway
+        new = self.client.get_klines(symbol=symbol, interval=interval, limit=missing + 1, startTime=next_open)
+        with self.lock:
+            self.warm_starts += 1
+        return records_to_rows(stored) + list(new)
+
+    def push(self, symbol, interval, row):
+        """
+        Merge one streamed kline row (REST row layout) into the cached copy and
+        keep the key fresh without REST refreshes. Returns False if the row
+        leaves a gap, in which case the key is dropped and the next
+        `get_klines()` backfills over REST.
+        """
+        entry = self._entry((symbol, interval), 0)
+        with entry.lock:
+            rows = entry.rows
+            if rows and row[0] == rows[-1][0]:
+                rows[-1] = row
+            elif rows and row[0] == rows[-1][0] + interval_ms(interval):
+                if self.store is not None:
+                    self.store.append(symbol, interval, rows[-1:])  # previous bar has closed
+                rows.append(row)
+                if len(rows) > entry.retain:
+                    del rows[:len(rows) - entry.retain]
+            elif not rows:
+                entry.rows = [row]
+            elif row[0] > rows[-1][0]:
+                entry.rows = []
+                entry.streamed = False
+                return False
+            entry.streamed = True
+            entry.fetched_at = self.clock()
+            return True
+
+    def streamed_open_time(self, symbol, interval):
+        """Open time of the newest bar of a key kept current by `push()`, else None."""
+        with self.lock:
+            entry = self.entries.get((symbol, interval))
+        if entry is None or not entry.streamed or not entry.rows:
+            return None
+        return entry.rows[-1][0]
+
+    def invalidate(self, symbol=None, interval=None):
+        with self.lock:
+            for key in list(self.entries):
+                if (symbol is None or key[0] == symbol) and (interval is None or key[1] == interval):
+                    del self.entries[key]
+
+    def stats(self):
+        with self.lock:
+            return {
+                "keys": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "warm_starts": self.warm_starts,
+            }
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Kline Replay Stream Server (DEMO / OFFLINE TESTING)
+===================================================
+A local stand-in for Binance's combined kline WebSocket stream. It replays a
+JSON Lines file of `{"stream": ..., "data": {...}}` messages, so the whole
+streaming path (`kline_stream.py` + scanner) can be tested without network.
+
+Build a replay file from a saved `client.get_klines()` response:
+    python kline_replay_server.py --build btc_1h.json --symbol BTCUSDT --interval 1h -o replay.jsonl
+
+Serve it, then point the scanner at it:
+    python kline_replay_server.py replay.jsonl --port 8765 --delay 0.05
+    python ichimoku_scanner_demo.py --coins BTC --stream-url ws://127.0.0.1:8765/stream --offline
+"""
+
+import sys
+import json
+import asyncio
+import argparse
+import logging
+from urllib.parse import urlparse, parse_qs
+import websockets
+from kline_stream import stream_name
+
+def kline_event(row, symbol, interval, closed=True):
+    """REST kline row -> combined-stream kline message."""
+    return {
+        "stream": stream_name(symbol, interval),
+        "data": {
+            "e": "kline", "E": row[6] + 1, "s": symbol,
+            "k": {
+                "t": row[0], "T": row[6], "s": symbol, "i": interval,
+                "o": row[1], "h": row[2], "l": row[3], "c": row[4], "v": row[5],
+                "n": row[8], "x": closed, "q": row[7], "V": row[9], "Q": row[10], "B": row[11],
+            },
+        },
+    }
+
+def build_replay(rows, symbol, interval, path):
+    with open(path, "w") as f:
+        for row in rows:
+            f.write(json.dumps(kline_event(row, symbol, interval)) + "\n")
+    return len(rows)
+
+def load_replay(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def requested_streams(path):
+    query = parse_qs(urlparse(path).query)
+    streams = query.get("streams", [""])[0]
+    return {s for s in streams.split("/") if s}
+
+
+class ReplayServer:
+    def __init__(self, messages, delay=0.0, hold=False):
+        self.messages = messages
+        self.delay = delay
+        self.hold = hold  # keep the socket open after the last message
+        self.sent = 0
+
+    async def handler(self, ws, path=None):
+        if path is None:  # websockets >= 13 passes only the connection
+            path = getattr(ws, "path", None) or ws.request.path
+        wanted = requested_streams(path)
+        for message in self.messages:
+            if wanted and message.get("stream") not in wanted:
+                continue
+            await ws.send(json.dumps(message))
+            self.sent += 1
+            if self.delay:
+                await asyncio.sleep(self.delay)
+        if self.hold:
+            await ws.wait_closed()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        async with websockets.serve(self.handler, host, port):
+            logging.info(f"▶ Replaying {len(self.messages)} kline messages on ws://{host}:{port}/stream")
+            await asyncio.Future()  # run until cancelled
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local kline stream replay server (offline testing)")
+    parser.add_argument("replay", nargs="?", help="JSON Lines replay file to serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds between messages")
+    parser.add_argument("--hold", action="store_true", help="Keep connections open after the replay ends")
+    parser.add_argument("--build", metavar="KLINES_JSON", help="Convert a saved get_klines() response into a replay file")
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--interval", default="1h")
+    parser.add_argument("-o", "--output", default="replay.jsonl")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(message)s")
+    if args.build:
+        with open(args.build) as f:
+            rows = json.load(f)
+        count = build_replay(rows, args.symbol.upper(), args.interval, args.output)
+        print(f"Wrote {count} kline messages to {args.output}")
+        return
+    if not args.replay:
+        parser.print_usage()
+        sys.exit(1)
+    server = ReplayServer(load_replay(args.replay), args.delay, args.hold)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Kline Streaming Mode (DEMO)
+===========================
+Optional replacement for REST polling: one multiplexed Binance WebSocket
+connection carries the kline stream of every tracked symbol.
+
+- Every update is merged into the shared `KlineCache`, so `get_klines()` stays
+  a cache hit and no REST weight is spent on polling.
+- When a candle closes, a provisional next bar (seeded at the close price) is
+  added, the same shape a REST call returns right after a close, and
+  `on_closed(symbol, interval)` is called straight away.
+- On reconnect (or a gap in the stream) the cache is backfilled over REST and
+  any bar that closed while disconnected is still reported.
+- `subscribe()` / `unsubscribe()` add or drop symbols on the live connection
+  (Binance SUBSCRIBE/UNSUBSCRIBE messages), e.g. for `bot_deployer.py`.
+
+For offline runs, point `url` at `kline_replay_server.py`.
+"""
+
+import json
+import asyncio
+import logging
+import websockets
+from kline_cache import interval_ms
+from rest_gateway import background
+
+BINANCE_STREAM_URL = "wss://stream.binance.com:9443/stream"
+MAX_RECONNECT_DELAY = 60
+
+def stream_name(symbol, interval):
+    return f"{symbol.lower()}@kline_{interval}"
+
+def stream_url(symbols, interval, base=BINANCE_STREAM_URL):
+    if not symbols:
+        return base  # streams are added later with SUBSCRIBE
+    return f"{base}?streams=" + "/".join(stream_name(s, interval) for s in symbols)
+
+def kline_row(k):
+    """WebSocket kline payload -> REST `get_klines` row layout."""
+    return [k["t"], k["o"], k["h"], k["l"], k["c"], k["v"],
+            k["T"], k["q"], k["n"], k["V"], k["Q"], k["B"]]
+
+def provisional_row(closed, interval):
+    """The just-opened bar as REST would return it a moment after `closed` closed."""
+    open_time = closed[0] + interval_ms(interval)
+    close = closed[4]
+    return [open_time, close, close, close, close, "0",
+            open_time + interval_ms(interval) - 1, "0", 0, "0", "0", "0"]
+
+
+class KlineStream:
+    def __init__(self, cache, symbols, interval, on_closed, url=BINANCE_STREAM_URL, max_reconnects=None):
+        self.cache = cache
+        self.symbols = [s.upper() for s in symbols]
+        self.interval = interval
+        self.on_closed = on_closed
+        self.url = url
+        self.max_reconnects = max_reconnects  # None = reconnect forever
+        self.last_closed = {}  # symbol -> open_time of the last bar reported closed
+        self.connects = 0
+        self.messages = 0
+        self.stopped = False
+        self.loop = None
+        self.ws = None  # the live connection, for subscribe()/unsubscribe()
+        self.request_id = 0
+
+    def _report(self, symbol, open_time):
+        if open_time <= self.last_closed.get(symbol, -1):
+            return
+        self.last_closed[symbol] = open_time
+        try:
+            self.on_closed(symbol, self.interval)
+        except Exception as e:
+            logging.error(f"Stream callback error for {symbol}: {e}")
+
+    def backfill(self):
+        """REST refresh for every symbol; reports bars that closed while we were away."""
+        for symbol in list(self.symbols):
+            try:
+                self.cache.invalidate(symbol, self.interval)
+                with background():
+                    rows = self.cache.get_klines(symbol=symbol, interval=self.interval)
+            except Exception as e:
+                logging.error(f"Backfill error for {symbol}: {e}")
+                continue
+            if len(rows) >= 2 and symbol in self.last_closed:
+                self._report(symbol, rows[-2][0])
+
+    async def handle(self, message):
+        self.messages += 1
+        data = json.loads(message)
+        k = data.get("data", data).get("k")
+        if not k:
+            return
+        symbol = k["s"]
+        row = kline_row(k)
+        if not self.cache.push(symbol, self.interval, row):
+            # Gap in the stream: REST backfill, off the event loop
+            try:
+                with background():
+                    await asyncio.to_thread(self.cache.get_klines, symbol=symbol, interval=self.interval)
+            except Exception as e:
+                logging.error(f"Backfill error for {symbol}: {e}")
+                return
+        elif k["x"]:
+            self.cache.push(symbol, self.interval, provisional_row(row, self.interval))
+        if k["x"]:
+            self._report(symbol, row[0])
+
+    async def run(self):
+        delay = 1
+        self.loop = asyncio.get_running_loop()
+        while not self.stopped:
+            try:
+                url = stream_url(self.symbols, self.interval, self.url)  # symbols may have changed
+                async with websockets.connect(url, ping_interval=20) as ws:
+                    self.ws = ws
+                    self.connects += 1
+                    logging.info(f"📡 Kline stream connected ({len(self.symbols)} symbols, {self.interval})")
+                    if self.connects > 1:
+                        await asyncio.to_thread(self.backfill)
+                    delay = 1
+                    async for message in ws:
+                        await self.handle(message)
+            except (OSError, websockets.WebSocketException) as e:
+                logging.warning(f"⚠ Kline stream disconnected: {e}")
+            self.ws = None
+            if self.stopped or (self.max_reconnects is not None and self.connects > self.max_reconnects):
+                break
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    # === Live symbol changes (thread-safe) ===
+    def subscribe(self, symbol):
+        """Add a symbol to the running connection; it is also in the URL of every reconnect."""
+        symbol = symbol.upper()
+        if symbol not in self.symbols:
+            self.symbols.append(symbol)
+            self._send("SUBSCRIBE", symbol)
+
+    def unsubscribe(self, symbol):
+        symbol = symbol.upper()
+        if symbol in self.symbols:
+            self.symbols.remove(symbol)
+            self.last_closed.pop(symbol, None)
+            self._send("UNSUBSCRIBE", symbol)
+
+    def _send(self, method, symbol):
+        ws, loop = self.ws, self.loop
+        if ws is None or loop is None:
+            return  # not connected: the next connect uses the new symbol list
+        self.request_id += 1
+        message = json.dumps({"method": method, "params": [stream_name(symbol, self.interval)], "id": self.request_id})
+        asyncio.run_coroutine_threadsafe(ws.send(message), loop)
+
+    def stop(self):
+        self.stopped = True
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Mock Binance REST Server (DEMO / TESTING)
+=========================================
+A local stand-in for `api.binance.com` to test `rest_gateway.py` (or any
+client) without touching the real API.
+
+- GET /api/v3/time and GET /api/v3/klines (deterministic candles per symbol).
+  Like on Binance, 3m...1d candles are built from the same symbol's 1m
+  candles, so `multi_timeframe.py --rest-url` can check parity offline.
+- Counts request weight per window and sends `X-MBX-USED-WEIGHT-1M`.
+- Over the limit: 429 with `Retry-After`; keep hammering while throttled
+  and you get a 418 "IP ban", like the real thing.
+- Optional random 5xx responses and latency.
+- Keep-alive (HTTP/1.1); counts TCP connections so pooling is visible.
+
+Usage:
+    python mock_binance_server.py --port 8900 --weight-limit 1200 --window 60 --error-rate 0.05
+    python ichimoku_scanner_demo.py --coins BTC,ETH --once --rest-url http://127.0.0.1:8900
+"""
+
+import json
+import time
+import random
+import zlib
+import argparse
+import functools
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from kline_cache import interval_ms
+from rest_gateway import kline_weight, WEIGHT_HEADER
+
+BASE_TIME_MS = 1_600_000_000_000
+BASE_INTERVAL = "1m"
+BASE_MS = 60_000
+
+
+def mock_kline(symbol, interval, open_time, now_ms=None):
+    """
+    Same candle every time for the same symbol/interval/open time. Minute to
+    day intervals are aggregated from the 1m candles (the bar still open at
+    `now_ms` only from the minutes so far); weeks and months are independent.
+    """
+    if interval == BASE_INTERVAL or interval[-1] not in "mhd":
+        return _independent_kline(symbol, interval, open_time)
+    end = open_time + interval_ms(interval)
+    if now_ms is not None and now_ms < end:
+        return _aggregate(symbol, interval, open_time, now_ms // BASE_MS * BASE_MS + BASE_MS)
+    return _closed_aggregate(symbol, interval, open_time)
+
+@functools.lru_cache(maxsize=100_000)
+def _closed_aggregate(symbol, interval, open_time):
+    return _aggregate(symbol, interval, open_time, open_time + interval_ms(interval))
+
+def _aggregate(symbol, interval, open_time, end):
+    minutes = [_independent_kline(symbol, BASE_INTERVAL, t) for t in range(open_time, end, BASE_MS)]
+    column = lambda i: [float(m[i]) for m in minutes]
+    volume, quote, taker_base, taker_quote = (sum(column(i)) for i in (5, 7, 9, 10))
+    return [open_time, minutes[0][1], f"{max(column(2)):.8f}", f"{min(column(3)):.8f}", minutes[-1][4],
+            f"{volume:.8f}", open_time + interval_ms(interval) - 1, f"{quote:.8f}",
+            sum(m[8] for m in minutes), f"{taker_base:.8f}", f"{taker_quote:.8f}", "0"]
+
+def _independent_kline(symbol, interval, open_time):
+    step = interval_ms(interval)
+    rng = random.Random(zlib.crc32(f"{symbol}|{interval}|{open_time}".encode()))
+    base = 100 + zlib.crc32(symbol.encode()) % 900
+    o = base * (1 + 0.05 * rng.uniform(-1, 1))
+    c = o * (1 + 0.01 * rng.uniform(-1, 1))
+    h = max(o, c) * (1 + 0.005 * rng.random())
+    l = min(o, c) * (1 - 0.005 * rng.random())
+    v = rng.uniform(1, 1000)
+    return [open_time, f"{o:.8f}", f"{h:.8f}", f"{l:.8f}", f"{c:.8f}", f"{v:.8f}",
+            open_time + step - 1, f"{v * c:.8f}", rng.randint(10, 5000),
+            f"{v / 2:.8f}", f"{v * c / 2:.8f}", "0"]
+
+
+class MockState:
+    def __init__(self, weight_limit=1200, window=60.0, error_rate=0.0, latency=0.0,
+                 ban_after=10, ban_seconds=30, clock=time.time):
+        self.weight_limit = weight_limit
+        self.window = window
+        self.error_rate = error_rate
+        self.latency = latency
+        self.ban_after = ban_after      # requests sent while throttled before a 418
+        self.ban_seconds = ban_seconds
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.window_start = 0.0
+        self.used = 0
+        self.strikes = 0
+        self.banned_until = 0.0
+        self.counts = {"requests": 0, "ok": 0, "429": 0, "418": 0, "5xx": 0, "connections": 0}
+
+    def admit(self, weight):
+        """-> (status, used_weight, retry_after)"""
+        with self.lock:
+            now = self.clock()
+            self.counts["requests"] += 1
+            start = now // self.window * self.window
+            if start != self.window_start:
+                self.window_start, self.used, self.strikes = start, 0, 0
+            if now < self.banned_until:
+                self.counts["418"] += 1
+                return 418, self.used, int(self.banned_until - now) + 1
+            retry_after = int(self.window_start + self.window - now) + 1
+            if self.used + weight > self.weight_limit:
+                self.strikes += 1
+                if self.strikes > self.ban_after:
+                    self.banned_until = now + self.ban_seconds
+                    self.counts["418"] += 1
+                    return 418, self.used, self.ban_seconds
+                self.counts["429"] += 1
+                return 429, self.used, retry_after
+            self.used += weight
+            if self.error_rate and random.random() < self.error_rate:
+                self.counts["5xx"] += 1
+                return 503, self.used, None
+            self.counts["ok"] += 1
+            return 200, self.used, None
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    state = None  # set by make_server()
+
+    def setup(self):
+        super().setup()
+        with self.state.lock:
+            self.state.counts["connections"] += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, used=None, retry_after=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if used is not None:
+            self.send_header(WEIGHT_HEADER, str(used))
+        if retry_after is not None:
+            self.send_header("Retry-After", str(retry_after))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path == "/api/v3/time":
+            weight = 1
+        elif url.path == "/api/v3/klines":
+            if "symbol" not in query or "interval" not in query:
+                self._send(400, {"code": -1102, "msg": "Mandatory parameter 'symbol'/'interval' was not sent."})
+                return
+            weight = kline_weight(int(query.get("limit", 500)))
+        else:
+            self._send(404, {"code": -1, "msg": "Unknown path"})
+            return
+
+        state = self.state
+        if state.latency:
+            time.sleep(state.latency)
+        status, used, retry_after = state.admit(weight)
+        if status == 429:
+            self._send(429, {"code": -1003, "msg": "Too many requests."}, used, retry_after)
+        elif status == 418:
+            self._send(418, {"code": -1003, "msg": "Way too many requests; IP banned."}, used, retry_after)
+        elif status >= 500:
+            self._send(status, {"code": -1001, "msg": "Internal error."}, used)
+        elif url.path == "/api/v3/time":
+            self._send(200, {"serverTime": int(state.clock() * 1000)}, used)
+        else:
+            self._send(200, self._klines(query), used)
+
+    def _klines(self, query):
+        symbol, interval = query["symbol"], query["interval"]
+        limit = min(int(query.get("limit", 500)), 1000)
+        step = interval_ms(interval)
+        now_ms = int(self.state.clock() * 1000)
+        last = now_ms // step * step  # the bar still open
+        if "startTime" in query:
+            first = max(BASE_TIME_MS, -(-int(query["startTime"]) // step) * step)
+        else:
+            first = last - (limit - 1) * step
+        end = min(last, int(query["endTime"])) if "endTime" in query else last
+        return [mock_kline(symbol, interval, t, now_ms) for t in range(first, end + 1, step)][:limit]
+
+
+def make_server(port=0, host="127.0.0.1", **options):
+    state = MockState(**options)
+    handler = type("BoundMockHandler", (MockHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server, state
+
+def start_in_thread(port=0, **options):
+    """Serve in a daemon thread; returns (server, state, base_url)."""
+    server, state = make_server(port, **options)
+    threading.Thread(target=server.serve_forever, name="mock-binance", daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, state, f"http://{host}:{port}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mock Binance REST server (weight headers, 429/418, 5xx)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--weight-limit", type=int, default=1200)
+    parser.add_argument("--window", type=float, default=60.0, help="Weight window in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    args = parser.parse_args(argv)
+
+    server, state = make_server(args.port, args.host, weight_limit=args.weight_limit, window=args.window,
+                                error_rate=args.error_rate, latency=args.latency)
+    print(f"🧪 Mock Binance REST on http://{args.host}:{args.port} (weight {args.weight_limit}/{args.window:g}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"📊 {state.counts}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Multi-Timeframe Ichimoku from one 1m Feed (DEMO / SIGNAL-ONLY)
+===============================================================
+Runs the strategy on several timeframes per symbol (e.g. 15m, 1h, 4h) while
+only fetching or streaming the 1-minute candles.
+
+- `BarBuilder` rolls closed 1m candles into higher-timeframe OHLCV bars as
+  they close, aligned like Binance (weeks open on Monday).
+- Each timeframe keeps its own `IncrementalIchimoku` and BUY/SELL/NONE state,
+  a few hundred floats instead of a 100-row DataFrame per timeframe.
+- Each timeframe is seeded once from its native klines (REST or the candle
+  store); after that only 1m candles are needed. A bar that was only partly
+  seen (start-up, feed gap) is taken from the native klines instead.
+- `check_native()` compares resampled bars with Binance's own klines.
+
+Usage:
+    python ichimoku_scanner_demo.py --coins BTC,ETH --timeframes 15m,1h,4h
+    python multi_timeframe.py BTCUSDT --intervals 15m,1h,4h --hours 48   # parity check
+    python multi_timeframe.py BTCUSDT --rest-url http://127.0.0.1:8900      # ... offline, mock server
+"""
+
+import sys
+import math
+import logging
+import argparse
+from kline_cache import interval_ms
+from bar_scheduler import WEEK_OFFSET_MS
+from ichimoku_incremental import IncrementalIchimoku
+from ichimoku_core import evaluate_values
+from rest_gateway import background, DEFAULT_BASE_URL
+
+BASE_INTERVAL = "1m"
+SUM_FIELDS = (5, 7, 8, 9, 10)  # volume, quote volume, trades, taker base/quote volume
+
+def bar_open(open_time, interval):
+    """Open time of the `interval` bar containing `open_time` (ms)."""
+    step = interval_ms(interval)
+    offset = WEEK_OFFSET_MS if interval.endswith("w") else 0
+    return (open_time - offset) // step * step + offset
+
+def _numbers(row):
+    return [int(row[0]), float(row[1]), float(row[2]), float(row[3]), float(row[4]), float(row[5]),
+            int(row[6]), float(row[7]), int(row[8]), float(row[9]), float(row[10]), 0.0]
+
+
+class BarBuilder:
+    """Rolls closed base candles (REST row layout) into one higher interval."""
+
+    def __init__(self, interval, base=BASE_INTERVAL):
+        if interval.endswith("M"):
+            raise ValueError("Monthly intervals can't be built from fixed-length candles")
+        self.interval = interval
+        self.step = interval_ms(interval)
+        self.base_ms = interval_ms(base)
+        self.bar = None        # the bar being built, REST row layout (numbers)
+        self.complete = False  # True if the bar has every base candle so far
+        self.next_open = None  # base open_time expected next
+
+    def add(self, row):
+        """
+        Feed one closed base candle. Returns [(bar_row, complete), ...] for the
+        bars this candle closed (usually none, one at a bar boundary).
+        """
+        row = _numbers(row)
+        start = bar_open(row[0], self.interval)
+        done = []
+        if self.bar is not None and start != self.bar[0]:
+            done.append((self.bar, False))  # the rest of the old bar never came
+            self.bar = None
+        if self.bar is None:
+            self.bar = [start] + row[1:6] + [start + self.step - 1] + row[7:11] + [0.0]
+            self.complete = row[0] == start
+        else:
+            bar = self.bar
+            bar[2] = max(bar[2], row[2])
+            bar[3] = min(bar[3], row[3])
+            bar[4] = row[4]
+            for i in SUM_FIELDS:
+                bar[i] += row[i]
+            self.complete = self.complete and row[0] == self.next_open
+        self.next_open = row[0] + self.base_ms
+        if self.next_open >= self.bar[0] + self.step:
+            done.append((self.bar, self.complete))
+            self.bar = None
+        return done
+
+
+def resample(rows, interval, base=BASE_INTERVAL):
+    """Whole list of closed base rows -> the complete `interval` bars in it."""
+    builder = BarBuilder(interval, base)
+    out = []
+    for row in rows:
+        out.extend(bar for bar, complete in builder.add(row) if complete)
+    return out
+
+
+class Timeframe:
+    """Ichimoku engine and demo state for one symbol on one timeframe."""
+
+    def __init__(self, interval, base=BASE_INTERVAL):
+        self.interval = interval
+        self.builder = BarBuilder(interval, base)
+        self.engine = IncrementalIchimoku()
+        self.state = 'NONE'  # last action: 'BUY', 'SELL', or 'NONE'
+        self.signals = []
+        self.last_open_time = None  # newest closed bar fed to the engine
+
+    def seed(self, rows):
+        """Feed closed native klines (oldest first); already-seen bars are skipped."""
+        for row in rows:
+            if self.last_open_time is None or row[0] > self.last_open_time:
+                self.engine.update(row[2], row[3], row[4])
+                self.last_open_time = int(row[0])
+
+
+class MultiTimeframe:
+    def __init__(self, symbol, intervals, fetch=None, base=BASE_INTERVAL, log=logging, events=None):
+        """
+        fetch:  optional `get_klines(symbol=, interval=, limit=)` (e.g. a KlineCache)
+                for seeding and for bars the 1m feed only partly covered
+        events: optional EventLog; otherwise the classic lines go to `log`
+        """
+        self.symbol = symbol
+        self.base = base
+        self.fetch = fetch
+        self.log = log
+        self.events = events
+        self.timeframes = {interval: Timeframe(interval, base) for interval in intervals}
+        self.last_base = None  # open_time of the newest base candle fed
+        self.native_fetches = 0
+
+    def _native(self, interval, limit):
+        if self.fetch is None:
+            return []
+        self.native_fetches += 1
+        rows = self.fetch(symbol=self.symbol, interval=interval, limit=limit)
+        return rows[:-1]  # the newest row is the bar still open
+
+    def warm_up(self, limit=100):
+        """Seed every timeframe from its native klines (one call each, at start-up)."""
+        with background():
+            for interval, tf in self.timeframes.items():
+                tf.seed(self._native(interval, limit))
+
+    def evaluate_latest(self):
+        """Evaluate every seeded timeframe's newest closed bar now (symbols added at run time)."""
+        results = []
+        for interval, tf in self.timeframes.items():
+            if tf.engine.is_ready():
+                values = tf.engine.values()
+                tf.state, tf.signals = evaluate_values(
+                    values, values['close'], tf.state, self.log, self.events,
+                    self.symbol, tf.interval, tf.last_open_time)
+                results.append((interval, tf.state, tf.signals))
+        return results
+
+    def feed(self, rows):
+        """
+        Feed closed base candles (oldest first; candles already fed are skipped).
+        Returns [(interval, state, signals), ...] for every timeframe bar that closed.
+        """
+        results = []
+        for row in rows:
+            if self.last_base is not None and row[0] <= self.last_base:
+                continue
+            self.last_base = int(row[0])
+            for interval, tf in self.timeframes.items():
+                for bar, complete in tf.builder.add(row):
+                    if self._close_bar(tf, bar, complete):
+                        results.append((interval, tf.state, tf.signals))
+        return results
+
+    def _close_bar(self, tf, bar, complete):
+        if tf.last_open_time is not None and bar[0] <= tf.last_open_time:
+            return False  # already seeded from the native klines
+        step = tf.builder.step
+        gap = tf.last_open_time is not None and bar[0] > tf.last_open_time + step
+        if not complete or gap:
+            # Missing 1m candles: take this bar (and anything before it) from Binance
+            if gap:
+                tf.engine = IncrementalIchimoku()
+                tf.last_open_time = None
+            tf.seed(row for row in self._native(tf.interval, 100) if row[0] <= bar[0])
+            if tf.last_open_time != bar[0]:
+                self.log.warning(f"⚠ {self.symbol} {tf.interval}: skipped incomplete bar {bar[0]}")
+                return False
+        else:
+            tf.seed([bar])
+        if not tf.engine.is_ready():
+            return False
+        values = tf.engine.values()
+        tf.state, tf.signals = evaluate_values(
+            values, values['close'], tf.state, self.log, self.events,
+            self.symbol, tf.interval, tf.last_open_time)
+        return True
+
+# === Parity with native klines ===
+def fetch_range(client, symbol, interval, start, end, limit=1000):
+    """Closed klines with `start <= open_time < end`, paging through REST."""
+    rows = []
+    while start < end:
+        page = client.get_klines(symbol=symbol, interval=interval, limit=limit, startTime=start)
+        page = [row for row in page if row[0] < end]
+        if not page:
+            break
+        rows.extend(page)
+        start = page[-1][0] + interval_ms(interval)
+    return rows
+
+def _same(a, b):
+    return math.isclose(float(a), float(b), rel_tol=1e-9, abs_tol=1e-9)
+
+def check_native(client, symbol, intervals, hours=24, now_ms=None):
+    """
+    Resample `hours` of 1m klines and compare every complete bar with the
+    native kline of the same open time. Returns [(interval, open_time, field), ...].
+    """
+    now_ms = now_ms or client.get_server_time()["serverTime"]
+    end = bar_open(now_ms, BASE_INTERVAL)
+    start = bar_open(end - hours * 3_600_000, max(intervals, key=interval_ms))
+    base = fetch_range(client, symbol, BASE_INTERVAL, start, end)
+    fields = ["open_time", "open", "high", "low", "close", "volume", "close_time",
+              "qav", "num_trades", "tbbav", "tbqav"]
+    mismatches = []
+    compared = 0
+    for interval in intervals:
+        native = {row[0]: row for row in fetch_range(client, symbol, interval, start, end)}
+        for bar in resample(base, interval):
+            row = native.get(bar[0])
+            if row is None:
+                mismatches.append((interval, bar[0], "missing"))
+                continue
+            compared += 1
+            for i, name in enumerate(fields):
+                if not _same(bar[i], row[i]):
+                    mismatches.append((interval, bar[0], name))
+    return compared, mismatches
+
+
+def main(argv=None):
+    from rest_gateway import RestGateway
+
+    parser = argparse.ArgumentParser(description="Check 1m-resampled bars against native Binance klines")
+    parser.add_argument("symbol", help="e.g. BTCUSDT")
+    parser.add_argument("--intervals", default="15m,1h,4h")
+    parser.add_argument("--hours", type=int, default=24, help="History to compare (default 24h)")
+    parser.add_argument("--rest-url", default=DEFAULT_BASE_URL, help="REST endpoint, e.g. a local mock_binance_server.py")
+    args = parser.parse_args(argv)
+
+    intervals = [i.strip() for i in args.intervals.split(",") if i.strip()]
+    gateway = RestGateway(args.rest_url)  # public klines: no API keys
+    try:
+        compared, mismatches = check_native(gateway, args.symbol.upper(), intervals, args.hours)
+    finally:
+        gateway.close()
+    print(f"🧪 {compared} resampled bars compared with native klines, {len(mismatches)} mismatches")
+    for interval, open_time, field in mismatches[:10]:
+        print(f"   {interval} bar {open_time}: {field}")
+    if mismatches or not compared:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Binance REST Gateway (DEMO)
+===========================
+One shared, rate-limit-aware way to call the public Binance REST API, instead
+of every bot hitting it on its own and sleeping 60s after any error.
+
+- Keep-alive connection pool (`requests.Session`, one pool per gateway).
+- Weight bucket fed by the `X-MBX-USED-WEIGHT-1M` response header: requests
+  wait for weight instead of running into 429s.
+- Identical calls already in flight are coalesced into one HTTP request.
+- 429/418 pause the whole gateway (honouring `Retry-After`); 429/418/5xx and
+  network errors are retried with jittered exponential backoff.
+- Priority queue: fresh-bar fetches go before backfill (`with background():`).
+- Drop-in for the two `Client` calls the bots use: `get_klines()` and
+  `get_server_time()`.
+
+Test it against `mock_binance_server.py` (weight headers, 429/418, 5xx).
+"""
+
+import math
+import time
+import queue
+import random
+import logging
+import itertools
+import threading
+import contextlib
+import contextvars
+import email.utils
+from datetime import timezone
+from concurrent.futures import Future
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_BASE_URL = "https://api.binance.com"
+WEIGHT_HEADER = "X-MBX-USED-WEIGHT-1M"
+WEIGHT_LIMIT = 6000  # spot REST request weight per minute and IP
+
+PRIORITY_FRESH = 0
+PRIORITY_BACKFILL = 10
+
+_priority = contextvars.ContextVar("rest_priority", default=PRIORITY_FRESH)
+
+@contextlib.contextmanager
+def background():
+    """Calls made inside this block queue behind fresh-bar fetches."""
+    token = _priority.set(PRIORITY_BACKFILL)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def retry_after_seconds(value, now):
+    """Seconds to wait from a `Retry-After` header (seconds or an HTTP date), None if unreadable."""
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = when.timestamp() - now
+    if not math.isfinite(seconds):
+        return None
+    return max(0.0, seconds)
+
+def kline_weight(limit):
+    """Request weight of GET /api/v3/klines for a given `limit`."""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+class GatewayError(Exception):
+    def __init__(self, status, message):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+
+
+class WeightBucket:
+    """Request weight left in the current 1-minute window, shared by all callers."""
+
+    def __init__(self, limit=WEIGHT_LIMIT, window=60.0, headroom=0.9, clock=time.time):
+        """
+        headroom: fraction of the limit we allow ourselves (other tools may share the IP)
+        """
+        self.capacity = max(1, int(limit * headroom))
+        self.window = window
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.window_start = 0.0
+        self.used = 0
+        self.paused_until = 0.0
+
+    def _roll(self, now):
+        start = now // self.window * self.window
+        if start != self.window_start:
+            self.window_start = start
+            self.used = 0
+
+    def try_acquire(self, weight):
+        """Reserve `weight`; returns 0 on success, otherwise seconds to wait."""
+        with self.lock:
+            now = self.clock()
+            self._roll(now)
+            if now < self.paused_until:
+                return self.paused_until - now
+            if self.used + weight <= self.capacity or self.used == 0:
+                self.used += weight
+                return 0.0
+            return self.window_start + self.window - now
+
+    def update(self, used):
+        """Server-reported weight for this window (includes other clients on the IP)."""
+        with self.lock:
+            self._roll(self.clock())
+            self.used = max(self.used, used)
+
+    def pause(self, seconds):
+        with self.lock:
+            self.paused_until = max(self.paused_until, self.clock() + seconds)
+
+
+class RestGateway:
+    def __init__(self, base_url=DEFAULT_BASE_URL, weight_limit=WEIGHT_LIMIT, window=60.0, workers=4,
+                 max_retries=5, backoff=0.5, max_backoff=30.0, timeout=10, clock=time.time, sleep=time.sleep):
+        """
+        workers:     concurrent HTTP requests (and pooled connections)
+        max_retries: retries after a 429/418/5xx/network error
+        backoff:     base delay for jittered exponential backoff (seconds)
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.clock = clock
+        self.sleep = sleep
+        self.bucket = WeightBucket(weight_limit, window, clock=clock)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.queue = queue.PriorityQueue()
+        self.seq = itertools.count()
+        self.inflight = {}  # request key -> Future
+        self.lock = threading.Lock()
+        self.stats_data = {"requests": 0, "coalesced": 0, "retries": 0, "throttled": 0,
+                           "banned": 0, "server_errors": 0, "weight_waits": 0, "waited": 0.0}
+        self.threads = [
+            threading.Thread(target=self._worker, name=f"rest-gateway-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    # === Public API ===
+    def submit(self, path, params=None, weight=1, priority=None):
+        """Queue a GET request; returns a Future with the decoded JSON."""
+        params = params or {}
+        key = (path, tuple(sorted(params.items())))
+        with self.lock:
+            future = self.inflight.get(key)
+            if future is not None:
+                self.stats_data["coalesced"] += 1
+                return future
+            future = Future()
+            self.inflight[key] = future
+        priority = _priority.get() if priority is None else priority
+        self.queue.put((priority, next(self.seq), key, path, params, weight, future))
+        return future
+
+    def get(self, path, params=None, weight=1, priority=None):
+        return self.submit(path, params, weight, priority).result()
+
+    def get_klines(self, symbol, interval, limit=500, startTime=None, endTime=None, **_ignored):
+        params = {"symbol": symbol, "interval": interval, "limit": limit}
+        if startTime is not None:
+            params["startTime"] = int(startTime)
+        if endTime is not None:
+            params["endTime"] = int(endTime)
+        return self.get("/api/v3/klines", params, weight=kline_weight(limit))
+
+    def get_server_time(self):
+        return self.get("/api/v3/time", weight=1, priority=PRIORITY_FRESH)
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.stats_data)
+        stats["used_weight"] = self.bucket.used
+        stats["queued"] = self.queue.qsize()
+        return stats
+
+    def close(self):
+        for _ in self.threads:
+            self.queue.put((float("inf"), next(self.seq), None, None, None, 0, None))
+        for thread in self.threads:
+            thread.join()
+        self.session.close()
+
+    # === Workers ===
+    def _worker(self):
+        while True:
+            _, _, key, path, params, weight, future = self.queue.get()
+            if future is None:
+                return
+            try:
+                result = self._call(path, params, weight)
+            except Exception as e:
+                with self.lock:
+                    self.inflight.pop(key, None)
+                future.set_exception(e)
+            else:
+                with self.lock:
+                    self.inflight.pop(key, None)
+                future.set_result(result)
+
+    def _wait_for_weight(self, weight):
+        while True:
+            wait = self.bucket.try_acquire(weight)
+            if wait <= 0:
+                return
+            with self.lock:
+                self.stats_data["weight_waits"] += 1
+                self.stats_data["waited"] += wait
+            self.sleep(min(wait, 1.0))
+
+    def _backoff_delay(self, attempt):
+        # "Full jitter": spreads retries from many workers instead of bursting together
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _call(self, path, params, weight):
+        error = None
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_weight(weight)
+            with self.lock:
+                self.stats_data["requests"] += 1
+            delay = self._backoff_delay(attempt)
+            try:
+                response = self.session.get(self.base_url + path, params=params, timeout=self.timeout)
+            except requests.RequestException as e:
+                error = e
+            else:
+                used = response.headers.get(WEIGHT_HEADER)
+                if used is not None:
+                    self.bucket.update(int(used))
+                status = response.status_code
+                if status < 400:
+                    return response.json()
+                error = GatewayError(status, response.text[:200])
+                if status in (429, 418):
+                    retry_after = response.headers.get("Retry-After")
+                    if retry_after is not None:
+                        seconds = retry_after_seconds(retry_after, self.clock())
+                        if seconds is not None:
+                            delay = seconds  # otherwise keep the computed backoff
+                    self.bucket.pause(delay)  # everybody backs off, not just this call
+                    with self.lock:
+                        self.stats_data["banned" if status == 418 else "throttled"] += 1
+                elif status >= 500:
+                    with self.lock:
+                        self.stats_data["server_errors"] += 1
+                else:
+                    raise error  # 4xx: retrying won't help
+            if attempt == self.max_retries:
+                break
+            with self.lock:
+                self.stats_data["retries"] += 1
+            logging.warning(f"⚠ REST {path} failed ({error}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            self.sleep(delay)
+        raise error
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Runtime Metrics & Profiler (DEMO)
+=================================
+Built-in instrumentation for the signal loop, so a bot that falls behind can
+be inspected while it runs instead of guessed at from log lines.
+
+- `metrics` (module-level registry): stage timings (fetch, parse, indicators,
+  signals, cycle), cycles, signals per cycle, BUY/SELL actions and errors per
+  stage, plus the last closed bar per symbol. Recording is a dict update under
+  a lock (about a microsecond); nothing is sent anywhere.
+- `MetricsServer`: local HTTP endpoint in the Prometheus text format
+  (`GET /metrics`). Bar staleness (seconds since the newest evaluated bar
+  closed) is computed at scrape time, so a stuck loop shows up as a growing number.
+- `SamplingProfiler`: on-demand stack sampler, toggled with
+  `GET /profile/start` / `GET /profile/stop` (or SIGUSR2) without a restart.
+  It writes collapsed stacks (`*.folded`) for flamegraph.pl, speedscope or
+  inferno. While it is off no sampler thread exists, so it costs nothing.
+
+Usage:
+    curl -s 127.0.0.1:9108/metrics
+    curl -s 127.0.0.1:9108/profile/start; sleep 30; curl -s 127.0.0.1:9108/profile/stop
+    flamegraph.pl demo_bot_data/profile-*.folded > profile.svg
+"""
+
+import os
+import sys
+import time
+import bisect
+import signal
+import logging
+import threading
+from collections import Counter
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+DEFAULT_PORT = 9108
+PREFIX = "ichimoku_"
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+SAMPLE_INTERVAL = 0.005  # seconds between profiler samples
+MIN_SAMPLE_INTERVAL = 0.001  # faster sampling would slow the bot down more than it tells
+
+HELP = {
+    "stage_seconds": ("histogram", "Time spent per pipeline stage"),
+    "cycles_total": ("counter", "Signal checks per symbol"),
+    "signals": ("gauge", "Signals found in the last check"),
+    "actions_total": ("counter", "Demo BUY/SELL actions"),
+    "errors_total": ("counter", "Exceptions per stage"),
+    "last_bar_open_time_seconds": ("gauge", "Open time of the newest evaluated closed bar"),
+    "bar_staleness_seconds": ("gauge", "Seconds since the newest evaluated bar closed"),
+}
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+def _number(value):
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class _Timer:
+    __slots__ = ("metrics", "key", "stage", "started")
+
+    def __init__(self, metrics, key, stage):
+        self.metrics = metrics
+        self.key = key
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics._observe(self.key, time.perf_counter() - self.started)
+        if exc_type is not None:
+            self.metrics.inc("errors_total", stage=self.stage)
+        return False
+
+
+class Metrics:
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.counters = {}    # (name, labels) -> value
+        self.gauges = {}
+        self.histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+        self.bars = {}        # symbol/interval labels -> close time of the newest evaluated bar (seconds)
+        self.collectors = {}  # prefix -> fn returning {name: number}
+        self.timer_keys = {}  # stage -> histogram key, so a timer costs no label sorting
+
+    # === Recording ===
+    def inc(self, name, value=1, **labels):
+        key = (name, _labels(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self.lock:
+            self.gauges[(name, _labels(labels))] = value
+
+    def observe(self, name, seconds, **labels):
+        self._observe((name, _labels(labels)), seconds)
+
+    def _observe(self, key, seconds):
+        with self.lock:
+            h = self.histograms.get(key)
+            if h is None:
+                h = self.histograms[key] = [0] * (len(BUCKETS) + 2)
+            h[bisect.bisect_left(BUCKETS, seconds)] += 1
+            h[-2] += seconds
+            h[-1] += 1
+
+    def timer(self, stage, **labels):
+        """`with metrics.timer("fetch"):` -> stage_seconds, and errors_total when it raises."""
+        if labels:
+            return _Timer(self, ("stage_seconds", _labels(dict(labels, stage=stage))), stage)
+        key = self.timer_keys.get(stage)
+        if key is None:
+            key = self.timer_keys[stage] = ("stage_seconds", (("stage", stage),))
+        return _Timer(self, key, stage)
+
+    def record_cycle(self, symbol, interval, bar_open_ms, signals, state_before, state_after, bar_ms=None):
+        """One finished signal check: counts, actions and the bar it evaluated (for staleness)."""
+        self.inc("cycles_total", symbol=symbol, interval=interval)
+        self.set("signals", len(signals), symbol=symbol, interval=interval)
+        if state_after != state_before:
+            self.inc("actions_total", symbol=symbol, interval=interval, action=state_after)
+        if bar_open_ms is not None:
+            self.set("last_bar_open_time_seconds", bar_open_ms / 1000, symbol=symbol, interval=interval)
+            if bar_ms is not None:
+                with self.lock:
+                    self.bars[_labels({"symbol": symbol, "interval": interval})] = (bar_open_ms + bar_ms) / 1000
+
+    def add_collector(self, prefix, fn):
+        """`fn()` -> {name: number}, read at scrape time (e.g. `cache.stats`); replaces `prefix`."""
+        self.collectors[prefix] = fn
+
+    # === Exposition ===
+    def render(self):
+        lines = []
+        with self.lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            histograms = {k: list(v) for k, v in self.histograms.items()}
+            bars = dict(self.bars)
+        now = self.clock()
+        for labels, closed_at in bars.items():
+            gauges[("bar_staleness_seconds", labels)] = max(0.0, now - closed_at)
+
+        for kind, series in (("counter", counters), ("gauge", gauges)):
+            for name in sorted({n for n, _ in series}):
+                lines.append(f"# HELP {PREFIX}{name} {HELP.get(name, (kind, name))[1]}")
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+                for (n, labels), value in sorted(series.items()):
+                    if n == name:
+                        lines.append(f"{PREFIX}{name}{_format_labels(labels)} {_number(value)}")
+        for name in sorted({n for n, _ in histograms}):
+            lines.append(f"# HELP {PREFIX}{name} {HELP.get(name, ('histogram', name))[1]}")
+            lines.append(f"# TYPE {PREFIX}{name} histogram")
+            for (n, labels), h in sorted(histograms.items()):
+                if n != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(BUCKETS, h):
+                    cumulative += count
+                    lines.append(f"{PREFIX}{name}_bucket{_format_labels(labels, [('le', _number(bound))])} {cumulative}")
+                lines.append(f"{PREFIX}{name}_sum{_format_labels(labels)} {_number(h[-2])}")
+                lines.append(f"{PREFIX}{name}_count{_format_labels(labels)} {h[-1]}")
+        for prefix, fn in list(self.collectors.items()):
+            try:
+                values = fn()
+            except Exception as e:
+                logging.warning(f"⚠ Metrics collector {prefix} failed: {e}")
+                continue
+            for key, value in sorted(values.items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"# TYPE {PREFIX}{prefix}_{key} gauge")
+                    lines.append(f"{PREFIX}{prefix}_{key} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()  # the process-wide registry
+
+
+# === Sampling profiler ===
+class SamplingProfiler:
+    """Samples every thread's stack every `interval` seconds while running."""
+
+    def __init__(self, out_dir=".", interval=SAMPLE_INTERVAL):
+        self.out_dir = out_dir
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stop_event = None
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+
+    @property
+    def running(self):
+        return self.thread is not None
+
+    def start(self, interval=None):
+        with self.lock:
+            if self.thread is not None:
+                return False
+            if interval:
+                self.interval = interval
+            self.stacks = Counter()
+            self.samples = 0
+            self.started_at = time.time()
+            self.stop_event = threading.Event()
+            self.thread = threading.Thread(target=self._run, args=(self.stop_event,), name="sampling-profiler", daemon=True)
+            self.thread.start()
+        logging.info(f"🔬 Profiler started (every {self.interval * 1000:.0f} ms)")
+        return True
+
+    def _run(self, stop_event):
+        own = threading.get_ident()
+        while not stop_event.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        """Stop sampling and write the collapsed stacks; returns the file path (None if not running)."""
+        with self.lock:
+            if self.thread is None:
+                return None
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+        os.makedirs(self.out_dir, exist_ok=True)
+        path = os.path.join(self.out_dir, f"profile-{time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started_at))}.folded")
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        logging.info(f"🔬 Profiler stopped: {self.samples} samples over "
+                     f"{time.time() - self.started_at:.1f}s -> {path}")
+        return path
+
+    def toggle(self):
+        return self.stop() if self.running else self.start()
+
+
+# === HTTP endpoint ===
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "IchimokuMetrics/1.0"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        server = self.server
+        if url.path == "/metrics":
+            self._reply(200, server.metrics.render(), "text/plain; version=0.0.4")
+        elif url.path == "/profile/start":
+            interval = parse_qs(url.query).get("interval", [None])[0]
+            if interval:
+                try:
+                    interval = float(interval)
+                except ValueError:
+                    interval = None
+                if interval is None or not MIN_SAMPLE_INTERVAL <= interval <= 60:
+                    self._reply(400, f"interval must be seconds between {MIN_SAMPLE_INTERVAL} and 60\n")
+                    return
+            started = server.profiler.start(interval)
+            self._reply(200 if started else 409, "profiler started\n" if started else "profiler already running\n")
+        elif url.path == "/profile/stop":
+            path = server.profiler.stop()
+            self._reply(200 if path else 409, f"{path}\n" if path else "profiler not running\n")
+        elif url.path == "/profile":
+            self._reply(200, f"running={server.profiler.running} samples={server.profiler.samples}\n")
+        else:
+            self._reply(404, "not found\n")
+
+    def _reply(self, status, body, content_type="text/plain"):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # scrapes every few seconds would flood the bot's log
+
+
+class MetricsServer:
+    def __init__(self, port=DEFAULT_PORT, host="127.0.0.1", registry=None, profile_dir="."):
+        """
+        host:        127.0.0.1 by default: the endpoint has no authentication
+        profile_dir: where `/profile/stop` writes its `.folded` files
+        """
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.metrics = registry or metrics
+        self.httpd.profiler = self.profiler = SamplingProfiler(profile_dir)
+        self.url = f"http://{host}:{self.httpd.server_address[1]}"
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-server", daemon=True)
+        self.thread.start()
+        if hasattr(signal, "SIGUSR2") and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR2, lambda signum, frame: threading.Thread(target=self.profiler.toggle).start())
+        logging.info(f"📊 Metrics on {self.url}/metrics (profiler: {self.url}/profile/start, /profile/stop or SIGUSR2)")
+        return self
+
+    def close(self):
+        self.profiler.stop()
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Structured Signal Event Log (DEMO)
+==================================
+One JSON record per symbol per evaluation instead of 8-10 formatted log lines:
+timestamp, symbol, every indicator value, the signal flags, bullish/bearish
+counts and the state transition.
+
+- `EventLog.emit()` only puts the record on a queue; a background thread
+  writes batches to JSON Lines (`demo_bot_data/signal_events.jsonl`).
+- Size and time based rotation (`.1`, `.2`, ... backups).
+- The familiar emoji lines are an optional formatter (`format_event`), run
+  on the writer thread when a `human_log` logger is given.
+- `load_states()` rebuilds the last BUY/SELL/NONE state per symbol from the
+  log, so a restart doesn't forget it. The writer keeps a small state index
+  next to the log (`.states`), so only events written after it are re-read.
+- A record that cannot be encoded or written is logged and skipped; the
+  writer thread keeps going.
+"""
+
+import os
+import json
+import math
+import time
+import queue
+import logging
+import threading
+
+DEFAULT_EVENT_FILE = os.path.join("demo_bot_data", "signal_events.jsonl")
+INDEX_INTERVAL = 5.0  # seconds between state index saves
+
+
+class NullLog:
+    """Stand-in logger that drops the per-check lines in structured mode."""
+
+    def info(self, *args, **kwargs):
+        pass
+
+    warning = error = debug = info
+
+NULL_LOG = NullLog()
+
+
+def _clean(value):
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+def make_event(symbol, values, signals, bullish, bearish, state_before, state_after,
+               price=None, interval=None, bar_open_time=None):
+    if state_after != state_before:
+        action = state_after
+    else:
+        action = 'HOLD'
+    return {
+        "ts": round(time.time(), 3),
+        "symbol": symbol,
+        "interval": interval,
+        "bar_open_time": bar_open_time,
+        "price": _clean(price),
+        **{k: _clean(v) for k, v in values.items()},
+        "signals": signals,
+        "bullish": bullish,
+        "bearish": bearish,
+        "state_before": state_before,
+        "state_after": state_after,
+        "action": action,
+    }
+
+def format_event(event, threshold=3):
+    """The classic human-readable lines for one event."""
+    signals = set(event["signals"])
+    checks = [
+        ("tk", "✔ Tenkan > Kijun (Bullish TK Cross)", "✔ Tenkan < Kijun (Bearish TK Cross)", "✘ No TK Cross"),
+        ("kumo", "✔ Price above Span A and B (Bullish Kumo Breakout)",
+         "✔ Price below Span A and B (Bearish Kumo Breakout)", "✘ No Kumo Breakout"),
+        ("kijun", "✔ Price > Kijun (Bullish Kijun Cross)", "✔ Price < Kijun (Bearish Kijun Cross)", "✘ No Kijun Cross"),
+        ("chikou", "✔ Chikou > Price 26 periods ago (Bullish Chikou Breakout)",
+         "✔ Chikou < Price 26 periods ago (Bearish Chikou Breakout)", "✘ No Chikou Breakout"),
+        ("twist", "✔ Bullish Kumo Twist", "✔ Bearish Kumo Twist", "✘ No Kumo Twist"),
+    ]
+    lines = []
+    for name, bullish_line, bearish_line, none_line in checks:
+        if f"{name}_bullish" in signals:
+            lines.append(bullish_line)
+        elif f"{name}_bearish" in signals:
+            lines.append(bearish_line)
+        elif name == "chikou" and event.get("close_26_ago") is None:
+            lines.append("⚠ Not enough data for Chikou check")
+        else:
+            lines.append(none_line)
+
+    price = event["price"] or 0.0
+    lines.append(f"📈 Current Price: {price:.2f}")
+    lines.append(f"📊 Signals: {event['signals']}")
+    lines.append(f"✔ Bullish: {event['bullish']} | ❌ Bearish: {event['bearish']} | 🕓 Last action: {event['state_before']}")
+    if event["action"] in ("BUY", "SELL"):
+        lines.append(f"🚦 DEMO SIGNAL: [{event['action']}] Would trigger {event['action']} at {price:.2f} (if live)")
+    elif event["state_before"] == 'BUY':
+        lines.append(f"🤝 DEMO SIGNAL: [HOLD] No sell, not enough bearish signals ({event['bearish']}/{threshold}).")
+    else:
+        lines.append(f"🤝 DEMO SIGNAL: [HOLD] No buy, not enough bullish signals ({event['bullish']}/{threshold}).")
+    return lines
+
+
+class EventLog:
+    def __init__(self, path=DEFAULT_EVENT_FILE, max_bytes=50 * 1024 * 1024, rotate_every=None,
+                 backup_count=5, batch_size=500, flush_interval=1.0, human_log=None):
+        """
+        max_bytes:      rotate when the file grows past this (None = never)
+        rotate_every:   also rotate after this many seconds (None = never)
+        batch_size:     max events per write
+        flush_interval: max seconds an event waits in the queue
+        human_log:      optional logger that gets the classic emoji lines
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotate_every = rotate_every
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.human_log = human_log
+        self.queue = queue.SimpleQueue()
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.states = read_states(path, backup_count)  # (symbol, interval) -> last state, for the index
+        self.index_saved_at = 0.0
+        self.file = open(path, "a", encoding="utf-8")
+        self.opened_at = time.time()
+        self.thread = threading.Thread(target=self._writer, name="signal-event-log", daemon=True)
+        self.thread.start()
+
+    def emit(self, event):
+        self.queue.put(event)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        self._save_index()
+        self.file.close()
+
+    # === Writer thread ===
+    def _writer(self):
+        running = True
+        while running:
+            batch = []
+            try:
+                batch.append(self.queue.get(timeout=self.flush_interval))
+                while len(batch) < self.batch_size:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+            if None in batch:
+                running = False
+                batch = [e for e in batch if e is not None]
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception:
+                    self.dropped += len(batch)
+                    logging.exception(f"⚠ Signal event writer error ({len(batch)} events)")
+
+    def _write(self, batch):
+        lines = []
+        events = []
+        for event in batch:
+            try:
+                lines.append(json.dumps(event, ensure_ascii=False) + "\n")
+                events.append(event)
+            except (TypeError, ValueError):
+                self.dropped += 1
+                logging.exception(f"⚠ Dropping a signal event that cannot be encoded ({event.get('symbol')})")
+        try:
+            self.file.write("".join(lines))
+            self.file.flush()
+        except OSError:
+            self.dropped += len(events)
+            logging.exception(f"⚠ Could not write {len(events)} signal events to {self.path}")
+            return
+        self.written += len(events)
+        self.batches += 1
+        for event in events:
+            if event.get("symbol"):
+                key = (event["symbol"], event.get("interval"))
+                self.states.pop(key, None)  # keep the most recent last
+                self.states[key] = event.get("state_after", 'NONE')
+            if self.human_log is not None:
+                try:
+                    log = self.human_log.getChild(event["symbol"]) if event.get("symbol") else self.human_log
+                    for line in format_event(event):
+                        log.info(line)
+                except Exception:
+                    logging.exception("⚠ Could not format a signal event")
+        self._maybe_rotate()
+        if time.time() - self.index_saved_at >= INDEX_INTERVAL:
+            self._save_index()
+
+    def _save_index(self):
+        """States so far + how far into the current file they go (see `read_states()`)."""
+        try:
+            self.file.flush()
+            st = os.fstat(self.file.fileno())
+            tmp = f"{index_path(self.path)}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"inode": st.st_ino, "offset": st.st_size,
+                           "states": [[symbol, interval, state] for (symbol, interval), state in self.states.items()]}, f)
+            os.replace(tmp, index_path(self.path))
+            self.index_saved_at = time.time()
+        except OSError:
+            logging.exception(f"⚠ Could not save the signal state index for {self.path}")
+
+    def _maybe_rotate(self):
+        too_big = self.max_bytes is not None and self.file.tell() >= self.max_bytes
+        too_old = self.rotate_every is not None and time.time() - self.opened_at >= self.rotate_every
+        if not (too_big or too_old):
+            return
+        self.file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.opened_at = time.time()
+
+
+def log_files(path=DEFAULT_EVENT_FILE, backup_count=5):
+    """Event files oldest first."""
+    files = [f"{path}.{i}" for i in range(backup_count, 0, -1)] + [path]
+    return [f for f in files if os.path.exists(f)]
+
+def index_path(path=DEFAULT_EVENT_FILE):
+    return f"{path}.states"
+
+def read_states(path=DEFAULT_EVENT_FILE, backup_count=5):
+    """
+    (symbol, interval) -> last `state_after`, most recently written last.
+    Starts from the state index when it matches the current file and only
+    parses the events after it; otherwise reads every file.
+    """
+    states = {}
+    files = log_files(path, backup_count)
+    offset = 0
+    try:
+        with open(index_path(path), encoding="utf-8") as f:
+            index = json.load(f)
+        st = os.stat(path)
+        if index["inode"] == st.st_ino and index["offset"] <= st.st_size:
+            for symbol, interval, state in index["states"]:
+                states[(symbol, interval)] = state
+            files = [path]
+            offset = index["offset"]
+    except (OSError, ValueError, KeyError, TypeError):
+        states = {}  # no usable index: full scan
+    for fn in files:
+        with open(fn, "rb") as f:
+            if fn == path:
+                f.seek(offset)
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # torn last line after a crash
+                if isinstance(event, dict) and event.get("symbol"):
+                    key = (event["symbol"], event.get("interval"))
+                    states.pop(key, None)
+                    states[key] = event.get("state_after", 'NONE')
+    return states
+
+def load_states(path=DEFAULT_EVENT_FILE, backup_count=5, by_interval=False):
+    """
+    symbol -> last `state_after` recorded in the event log (and its backups);
+    keyed by (symbol, interval) with `by_interval=True`.
+    """
+    states = read_states(path, backup_count)
+    if by_interval:
+        return states
+    return {symbol: state for (symbol, _), state in states.items()}  # latest interval wins
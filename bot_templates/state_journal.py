@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Strategy State Journal (DEMO)
+=============================
+Crash-safe BUY/SELL/NONE state for every symbol, so a restarted bot carries on
+where it stopped instead of starting from NONE (and printing a duplicate BUY)
+or re-reading its whole signal history.
+
+- One SQLite file (WAL mode) with one row per (symbol, interval): last action,
+  open time of the last processed bar and the incremental Ichimoku buffers
+  (`IncrementalIchimoku.to_bytes()`, about 1.4 KB).
+- `checkpoint()` writes a whole cycle in one transaction: after a crash the
+  file holds the previous cycle or this one, never a mix.
+- `load_all()` restores thousands of symbols with one query.
+- `SymbolTracker` feeds the engine only the closed bars it has not seen yet:
+  after a restart just the bars missed while down are evaluated, in order.
+  The latest closed bar gets the current price, as in `latest_price()`; bars
+  caught up on after a restart get their own close, the price right after
+  they closed.
+"""
+
+import os
+import time
+import logging
+import sqlite3
+import threading
+from collections import namedtuple
+
+from ichimoku_core import evaluate_values
+from ichimoku_incremental import IncrementalIchimoku
+from kline_cache import interval_ms
+
+DEFAULT_JOURNAL_NAME = "strategy_state.sqlite3"
+MAX_KLINES = 1000  # most bars one REST call returns
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS symbol_state (
+    symbol         TEXT NOT NULL,
+    interval       TEXT NOT NULL,
+    state          TEXT NOT NULL,
+    last_open_time INTEGER,
+    engine         BLOB,
+    updated_at     REAL NOT NULL,
+    PRIMARY KEY (symbol, interval)
+);
+"""
+
+JournalEntry = namedtuple("JournalEntry", "state last_open_time engine")
+
+
+def decode_engine(blob):
+    """IncrementalIchimoku from a stored blob, or None (rebuilt from klines) if unusable."""
+    if blob is None:
+        return None
+    try:
+        return IncrementalIchimoku.from_bytes(bytes(blob))
+    except ValueError as e:
+        logging.warning(f"⚠ Discarding saved indicator buffers: {e}")
+        return None
+
+
+class StateJournal:
+    def __init__(self, path):
+        """path: SQLite file, e.g. <data_dir>/strategy_state.sqlite3"""
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")  # survives process crashes; safe with WAL
+        self.db.executescript(SCHEMA)
+        self.checkpoints = 0
+
+    # === Writes ===
+    def checkpoint(self, trackers):
+        """Save every tracker (see `SymbolTracker`) in one transaction."""
+        now = time.time()
+        rows = [
+            (t.symbol, t.interval, t.state, t.last_open_time,
+             t.engine.to_bytes() if t.engine is not None else None, now)
+            for t in trackers
+        ]
+        if not rows:
+            return 0
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO symbol_state "
+                    "(symbol, interval, state, last_open_time, engine, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+            self.checkpoints += 1
+        return len(rows)
+
+    def save(self, tracker):
+        return self.checkpoint([tracker])
+
+    # === Reads ===
+    def load(self, symbol, interval):
+        """JournalEntry for one symbol/interval, or None if it was never saved."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT state, last_open_time, engine FROM symbol_state WHERE symbol = ? AND interval = ?",
+                (symbol, interval),
+            ).fetchone()
+        if row is None:
+            return None
+        return JournalEntry(row[0], row[1], decode_engine(row[2]))
+
+    def load_all(self, interval=None):
+        """{(symbol, interval): JournalEntry} for every saved symbol (or only one interval)."""
+        with self.lock:
+            if interval is None:
+                rows = self.db.execute(
+                    "SELECT symbol, interval, state, last_open_time, engine FROM symbol_state").fetchall()
+            else:
+                rows = self.db.execute(
+                    "SELECT symbol, interval, state, last_open_time, engine FROM symbol_state WHERE interval = ?",
+                    (interval,)).fetchall()
+        return {(symbol, iv): JournalEntry(state, last_open_time, decode_engine(blob))
+                for symbol, iv, state, last_open_time, blob in rows}
+
+    def count(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM symbol_state").fetchone()[0]
+
+    def stats(self):
+        return {"symbols": self.count(), "checkpoints": self.checkpoints}
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+class SymbolTracker:
+    """One symbol's last action and incremental Ichimoku, advanced one closed bar at a time."""
+
+    def __init__(self, symbol, interval, state='NONE', engine=None, last_open_time=None):
+        self.symbol = symbol
+        self.interval = interval
+        self.state = state
+        self.engine = engine
+        self.last_open_time = last_open_time
+        self.signals = []
+
+    @classmethod
+    def from_entry(cls, symbol, interval, entry, state='NONE'):
+        """Tracker resumed from a JournalEntry; `state` is used when there is none."""
+        if entry is None:
+            return cls(symbol, interval, state)
+        return cls(symbol, interval, entry.state, entry.engine, entry.last_open_time)
+
+    def fetch_limit(self, now_ms, minimum=100):
+        """Klines to request so every bar closed since the last checkpoint is included."""
+        if self.last_open_time is None:
+            return minimum
+        behind = int((now_ms - self.last_open_time) // interval_ms(self.interval)) + 2
+        return min(max(minimum, behind), MAX_KLINES)
+
+    def fetch(self, cache, now_ms, minimum=100):
+        """
+        Klines for `update()`; `now_ms` is the open time of the current bar.
+        A catch-up deeper than `minimum` is one direct REST call, so the cache
+        doesn't keep that many bars per symbol after it. Without a REST client
+        (offline replay) the cache is all there is.
+        """
+        limit = self.fetch_limit(now_ms, minimum)
+        if limit > minimum and cache.client is not None:
+            return list(cache.client.get_klines(symbol=self.symbol, interval=self.interval, limit=limit))
+        return cache.get_klines(symbol=self.symbol, interval=self.interval, limit=minimum)
+
+    def update(self, klines, log=logging, events=None):
+        """
+        Evaluate the closed bars of `klines` (REST rows, oldest first, the last
+        one still open) that came after the last processed bar. A fresh tracker,
+        or one further behind than `klines` reaches, is rebuilt from them and only
+        the latest closed bar is evaluated (what a first start does).
+        Returns the number of bars evaluated.
+        """
+        closed = len(klines) - 1
+        first = closed
+        while first > 0 and (self.last_open_time is None or int(klines[first - 1][0]) > self.last_open_time):
+            first -= 1
+        if first == closed:
+            return 0  # nothing closed since the last call
+
+        step = interval_ms(self.interval)
+        resumable = self.engine is not None and self.last_open_time is not None and (
+            int(klines[first - 1][0]) == self.last_open_time if first > 0
+            else int(klines[0][0]) == self.last_open_time + step
+        )
+        if not resumable:
+            if self.engine is not None and self.last_open_time is not None:
+                log.warning(f"⏩ {self.symbol} {self.interval}: more bars missed than fetched, "
+                            f"rebuilding indicators and evaluating the latest bar only")
+            self.engine = IncrementalIchimoku()
+            for row in klines[:closed - 1]:
+                self.engine.update(row[2], row[3], row[4])
+            first = closed - 1
+
+        evaluated = 0
+        for i in range(first, closed):
+            row = klines[i]
+            self.engine.update(row[2], row[3], row[4])
+            self.last_open_time = int(row[0])
+            if not self.engine.is_ready():
+                continue
+            # The current price for the latest closed bar (as `latest_price()`), the bar's own close
+            # for the ones missed while down: what a bot running at that time would have seen
+            price = float(klines[closed][4] if i == closed - 1 else row[4])
+            self.state, self.signals = evaluate_values(self.engine.values(), price, self.state, log, events,
+                                                       self.symbol, self.interval, self.last_open_time)
+            evaluated += 1
+        return evaluated
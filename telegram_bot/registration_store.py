@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Registration Store (DEMO)
+-------------------------
+Indexed storage for the Telegram demo's registrations, so /confirm finds the
+caller's own config with one index lookup instead of listing and parsing every
+JSON file in DATA_DIR.
+
+- SQLite in WAL mode (readers never wait for the writer), one row per
+  registration, indexed by user_id (primary key) and by chat id. The database
+  lives next to data_dir, not in it: that folder holds only config JSONs,
+  which the deployer and the scanner's --requests-dir read.
+- Every save is one transaction; the config JSON the bot scripts read is
+  written next to it atomically (temp file + rename).
+- `asave()` / `alatest_for_chat()` run in a worker thread, so the Telegram
+  event loop never blocks on disk.
+- `import_dir()` indexes config JSONs written before the store existed (or
+  after its file was deleted); the chat id is kept in each config for that.
+"""
+
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS registrations (
+    user_id    TEXT PRIMARY KEY,
+    chat_id    INTEGER,
+    created_at REAL NOT NULL,
+    config     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS registrations_by_chat ON registrations (chat_id, created_at);
+"""
+
+
+def default_db_path(data_dir):
+    """<data_dir>.sqlite3 beside the folder, e.g. ./bot_requests -> ./bot_requests.sqlite3"""
+    return os.path.normpath(data_dir) + ".sqlite3"
+
+
+def write_json_atomic(path, data):
+    """Readers see the old file or the new one, never half of it."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class RegistrationStore:
+    def __init__(self, data_dir, db_path=None, export_json=True):
+        """
+        data_dir:    folder with the per-user config JSONs (the bot scripts read these)
+        db_path:     SQLite file, outside data_dir (default: <data_dir>.sqlite3)
+        export_json: also write <data_dir>/<user_id>.json on every save
+        """
+        self.data_dir = data_dir
+        self.export_json = export_json
+        os.makedirs(data_dir, exist_ok=True)
+        self.db_path = db_path or default_db_path(data_dir)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints; safe with WAL
+        self.db.executescript(SCHEMA)
+
+    def config_path(self, user_id):
+        return os.path.join(self.data_dir, f"{user_id}.json")
+
+    # === Writes ===
+    def save(self, chat_id, config):
+        """Store (or replace) one registration; returns the config file path."""
+        user_id = config["user_id"]
+        if chat_id is not None:
+            config = dict(config, chat_id=chat_id)  # lets import_dir() restore the chat link
+        path = self.config_path(user_id)
+        if self.export_json:
+            write_json_atomic(path, config)
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO registrations (user_id, chat_id, created_at, config) VALUES (?, ?, ?, ?)",
+                (user_id, chat_id, time.time(), json.dumps(config)),
+            )
+        return path
+
+    def save_many(self, items):
+        """Bulk insert [(chat_id, config), ...] in one transaction (no JSON export)."""
+        now = time.time()
+        rows = [(c["user_id"], chat_id, now, json.dumps(c)) for chat_id, c in items]
+        with self.lock:
+            self.db.execute("BEGIN")
+            self.db.executemany(
+                "INSERT OR REPLACE INTO registrations (user_id, chat_id, created_at, config) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self.db.execute("COMMIT")
+        return len(rows)
+
+    def import_dir(self):
+        """
+        Index config JSONs already in data_dir. Returns how many. Configs
+        written before chat ids were recorded are indexed without one, so
+        /confirm can't match them to a chat.
+        """
+        items = []
+        for fn in os.listdir(self.data_dir):
+            if fn.startswith(".") or not fn.endswith(".json"):
+                continue  # dotfiles are internal (temp files, snapshots), not configs
+            try:
+                with open(os.path.join(self.data_dir, fn)) as f:
+                    config = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if isinstance(config, dict) and config.get("user_id"):
+                items.append((config.get("chat_id"), config))
+        with self.lock:
+            known = {row[0] for row in self.db.execute("SELECT user_id FROM registrations")}
+        return self.save_many([(chat_id, config) for chat_id, config in items if config["user_id"] not in known])
+
+    # === Reads (index lookups) ===
+    def latest_for_chat(self, chat_id):
+        """The newest registration made from this chat, or None."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT config FROM registrations WHERE chat_id = ? ORDER BY created_at DESC LIMIT 1",
+                (chat_id,),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get(self, user_id):
+        with self.lock:
+            row = self.db.execute("SELECT config FROM registrations WHERE user_id = ?", (user_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM registrations").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    # === Async wrappers (for the Telegram handlers) ===
+    async def asave(self, chat_id, config):
+        return await asyncio.to_thread(self.save, chat_id, config)
+
+    async def alatest_for_chat(self, chat_id):
+        return await asyncio.to_thread(self.latest_for_chat, chat_id)
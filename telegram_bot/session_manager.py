@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Registration Session Manager (DEMO)
+-----------------------------------
+Replaces the plain `user_sessions` dict, whose entries (API keys included)
+were only removed when the same chat wrote again after expiry.
+
+- Expiry heap: the periodic asyncio sweeper only looks at sessions that are
+  actually due, so a sweep costs O(expired · log n), not O(all sessions).
+- Optional cap: above `max_sessions`, the least recently used session goes.
+- Optional persistence: live sessions are saved (owner-only file, atomic
+  replace) on every sweep and at shutdown, and reloaded on start, so
+  in-progress registrations survive a restart. A `redact` hook decides what
+  is written, so API keys never reach the disk.
+- Evicted sessions have their data wiped, and `counts()` reports
+  live/started/expired/evicted/ended numbers.
+"""
+
+import os
+import json
+import time
+import heapq
+import asyncio
+import logging
+from collections import OrderedDict
+
+DEFAULT_TTL = 300  # seconds, same as the old session_update_expiry()
+
+
+class SessionManager:
+    def __init__(self, ttl=DEFAULT_TTL, max_sessions=None, persist_path=None, clock=time.time, redact=None):
+        """
+        ttl:          default seconds a session lives after its last message
+        max_sessions: optional cap, least recently used sessions are evicted above it
+        persist_path: optional file to keep in-progress sessions across restarts
+                      (keep it out of folders that are scanned for configs)
+        redact:       optional fn(state, data) -> (state, data), the copy that is persisted
+        """
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.persist_path = persist_path
+        self.redact = redact
+        self.clock = clock
+        self.sessions = OrderedDict()  # chat_id -> {'state', 'data', 'expires'}, oldest use first
+        self.heap = []  # (expires, chat_id); stale entries are skipped when popped
+        self.stats_data = {"started": 0, "expired": 0, "evicted": 0, "ended": 0, "restored": 0}
+        if persist_path:
+            self.load()
+
+    def __contains__(self, cid):
+        return cid in self.sessions
+
+    def __len__(self):
+        return len(self.sessions)
+
+    # === Session lifecycle ===
+    def start(self, cid, state, data=None, ttl=None):
+        """New (or restarted) session for a chat; returns it."""
+        self._drop(cid)
+        session = {'state': state, 'data': data if data is not None else {}, 'expires': 0.0}
+        self.sessions[cid] = session
+        self.stats_data["started"] += 1
+        self.touch(cid, ttl)
+        if self.max_sessions is not None:
+            while len(self.sessions) > self.max_sessions:
+                oldest = next(iter(self.sessions))
+                self._drop(oldest)
+                self.stats_data["evicted"] += 1
+        return session
+
+    def get(self, cid):
+        """The live session for a chat, or None (an expired one is removed)."""
+        session = self.sessions.get(cid)
+        if session is None:
+            return None
+        if self.clock() > session['expires']:
+            self._drop(cid)
+            self.stats_data["expired"] += 1
+            return None
+        return session
+
+    def touch(self, cid, ttl=None):
+        """Push the expiry out again (the old session_update_expiry)."""
+        session = self.sessions.get(cid)
+        if session is None:
+            return
+        session['expires'] = self.clock() + (self.ttl if ttl is None else ttl)
+        self.sessions.move_to_end(cid)
+        heapq.heappush(self.heap, (session['expires'], cid))
+
+    def end(self, cid):
+        """Session finished or abandoned on purpose (the old expire_session)."""
+        if self._drop(cid):
+            self.stats_data["ended"] += 1
+
+    def _drop(self, cid):
+        session = self.sessions.pop(cid, None)
+        if session is None:
+            return False
+        session['data'].clear()  # don't keep API keys around in stray references
+        return True
+
+    # === Eviction ===
+    def sweep(self):
+        """Remove every expired session; returns how many went."""
+        now = self.clock()
+        removed = 0
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            expires, cid = heapq.heappop(heap)
+            session = self.sessions.get(cid)
+            if session is not None and session['expires'] == expires:
+                self._drop(cid)
+                removed += 1
+        self.stats_data["expired"] += removed
+        # Touches leave stale heap entries behind; rebuild when they dominate
+        if len(heap) > 4 * len(self.sessions) + 64:
+            self.heap = [(s['expires'], cid) for cid, s in self.sessions.items()]
+            heapq.heapify(self.heap)
+        return removed
+
+    async def sweeper(self, interval=30):
+        """Background task: sweep (and persist) every `interval` seconds."""
+        while True:
+            await asyncio.sleep(interval)
+            removed = self.sweep()
+            if removed:
+                logging.info(f"🧹 Removed {removed} expired registration sessions ({len(self)} live)")
+            if self.persist_path:
+                await asyncio.to_thread(self.save)
+
+    def counts(self):
+        return dict(self.stats_data, live=len(self.sessions))
+
+    # === Persistence ===
+    def save(self):
+        if not self.persist_path:
+            return
+        payload = []
+        for cid, s in list(self.sessions.items()):
+            state, data = self.redact(s['state'], s['data']) if self.redact else (s['state'], s['data'])
+            payload.append([cid, state, data, s['expires']])
+        tmp = f"{self.persist_path}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)  # personal data, owner only
+        with os.fdopen(fd, "w") as f:
+            json.dump(payload, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.persist_path)
+
+    def load(self):
+        if not os.path.exists(self.persist_path):
+            return 0
+        try:
+            with open(self.persist_path) as f:
+                payload = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"⚠ Could not restore sessions from {self.persist_path}: {e}")
+            return 0
+        if not isinstance(payload, list):
+            logging.warning(f"⚠ Ignoring {self.persist_path}: not a session snapshot")
+            return 0
+        now = self.clock()
+        for item in payload:
+            try:
+                cid, state, data, expires = item
+            except (TypeError, ValueError):
+                continue
+            if isinstance(data, dict) and expires > now:
+                self.sessions[cid] = {'state': state, 'data': data, 'expires': expires}
+                heapq.heappush(self.heap, (expires, cid))
+                self.stats_data["restored"] += 1
+        return self.stats_data["restored"]
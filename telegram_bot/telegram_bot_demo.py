@@ -7,23 +7,30 @@ Telegram Trading Bot Registration DEMO
 - Simulates payment: prompts user to send /confirm to "activate" their bot (no real payment or deployment).
 - At payment, explains how payment_checker and bot_deployer work in production.
 - Outputs a config file that can be used for manual bot deployment (see README).
+- Registrations are indexed by chat id and user_id (SQLite, see registration_store.py),
+  so /confirm always finds the caller's own registration.
 - NO actual trading, payment, or SaaS backend is included!
 """
 
 import os
-import time
-import json
-from pathlib import Path
+import asyncio
 from telegram import Update, ReplyKeyboardMarkup, ReplyKeyboardRemove
 from telegram.ext import (
     ApplicationBuilder, CommandHandler, MessageHandler, ContextTypes, filters
 )
+from registration_store import RegistrationStore
+from session_manager import SessionManager
 
 # ====== CONFIGURATION ======
 COIN_CHOICES = ["ETH", "BTC", "SOL", "AVAX", "NEAR"]
 BOT_TOKEN = "PASTE_YOUR_OWN_TELEGRAM_BOT_TOKEN_HERE"  # <-- User must insert their own token here!
 DATA_DIR = "./bot_requests"
 os.makedirs(DATA_DIR, exist_ok=True)
+MAX_SESSIONS = 10_000            # registrations in progress at once; least recently active are dropped
+PERSIST_SESSIONS = False         # keep in-progress registrations across restarts (API keys are not saved)
+SESSIONS_FILE = "./bot_sessions.state"  # outside DATA_DIR: that folder holds only config JSONs
+REGISTRATIONS_DB = "./bot_registrations.sqlite3"  # the /confirm index (plus -wal/-shm), also outside DATA_DIR
+SESSION_SWEEP_INTERVAL = 30      # seconds
 
 FEE_TABLE = (
     "💸 *Demo Fees Table*\n"
@@ -54,30 +61,26 @@ def strategy_explanation():
 
 # Registration states
 STATE_USERNAME, STATE_EMAIL, STATE_APIKEY, STATE_APISECRET, STATE_STRATEGY, STATE_COIN, STATE_AMOUNT = range(7)
-user_sessions = {}  # chat_id: {'state': ..., 'data': ..., 'expires': ...}
+SECRET_FIELDS = ("api_key", "api_secret")
 
-def start_session(cid, state):
-    user_sessions[cid] = {'state': state, 'data': {}, 'expires': time.time() + 300}
+def redact_session(state, data):
+    """Copy of a session for SESSIONS_FILE: no API keys, so a resumed registration asks for them again."""
+    kept = {k: v for k, v in data.items() if k not in SECRET_FIELDS}
+    if isinstance(state, int) and state > STATE_APIKEY:
+        state = STATE_APIKEY
+    return state, kept
 
-def expire_session(cid):
-    if cid in user_sessions:
-        del user_sessions[cid]
-
-def session_expired(cid):
-    if cid not in user_sessions:
-        return True
-    return time.time() > user_sessions[cid]['expires']
-
-def session_update_expiry(cid):
-    if cid in user_sessions:
-        user_sessions[cid]['expires'] = time.time() + 300
+# chat_id -> {'state': ..., 'data': ..., 'expires': ...}; expired sessions are swept in the background
+user_sessions = SessionManager(ttl=300, max_sessions=MAX_SESSIONS,
+                               persist_path=SESSIONS_FILE if PERSIST_SESSIONS else None,
+                               redact=redact_session)
 
 async def start_cmd(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(strategy_explanation(), parse_mode="Markdown")
 
 async def register_cmd(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     cid = update.effective_chat.id
-    start_session(cid, STATE_USERNAME)
+    user_sessions.start(cid, STATE_USERNAME)
     await update.message.reply_text(
         "📝 Enter a username (3-20 letters/numbers/_):\n"
         "_For demo/testing only. You can use any name here._"
@@ -85,16 +88,16 @@ async def register_cmd(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
 
 async def reg_flow(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     cid = update.effective_chat.id
-    if cid not in user_sessions or session_expired(cid):
-        expire_session(cid)
+    session = user_sessions.get(cid)
+    if session is None:
         await update.message.reply_text(
             "⏰ Session expired. Send /register to start again."
         )
         return
 
-    session_update_expiry(cid)
-    step = user_sessions[cid]['state']
-    data = user_sessions[cid]['data']
+    user_sessions.touch(cid)
+    step = session['state']
+    data = session['data']
     text = update.message.text.strip()
 
     if step == STATE_USERNAME:
@@ -102,7 +105,7 @@ async def reg_flow(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text("❌ Invalid username. Try again:")
             return
         data['username'] = text
-        user_sessions[cid]['state'] = STATE_EMAIL
+        session['state'] = STATE_EMAIL
         await update.message.reply_text(
             "📧 Enter your email:\n"
             "_For demo/testing only. Any valid-looking email is OK._"
@@ -112,7 +115,7 @@ async def reg_flow(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text("❌ Invalid email. Try again:")
             return
         data['email'] = text
-        user_sessions[cid]['state'] = STATE_APIKEY
+        session['state'] = STATE_APIKEY
         await update.message.reply_text(
             "🔑 Enter your 64-character Binance API KEY:\n\n"
             "⚠️ *IMPORTANT: This must be a real API key from your Binance account.*\n"
@@ -126,7 +129,7 @@ async def reg_flow(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text("❌ Invalid API key. Try again:")
             return
         data['api_key'] = text
-        user_sessions[cid]['state'] = STATE_APISECRET
+        session['state'] = STATE_APISECRET
         await update.message.reply_text(
             "🔏 Enter your 64-character Binance API SECRET:\n"
             "⚠️ *Must match your API KEY. Needed for demo to fetch prices.*"
@@ -136,7 +139,7 @@ async def reg_flow(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text("❌ Invalid API secret. Try again:")
             return
         data['api_secret'] = text
-        user_sessions[cid]['state'] = STATE_STRATEGY
+        session['state'] = STATE_STRATEGY
         await update.message.reply_text(
             "📈 Choose strategy (send: ICHIMOKU):\n"
             "_For demo, only ICHIMOKU is supported._",
@@ -147,7 +150,7 @@ async def reg_flow(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text("❌ Only ICHIMOKU is available for the demo. Type ICHIMOKU:")
             return
         data['strategy'] = text.upper()
-        user_sessions[cid]['state'] = STATE_COIN
+        session['state'] = STATE_COIN
         await update.message.reply_text(
             f"💱 Choose coin (send: {', '.join(COIN_CHOICES)}):\n"
             "_Any coin is fine for demo mode. Choose your favorite._",
@@ -158,7 +161,7 @@ async def reg_flow(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text(f"❌ Choose one of: {', '.join(COIN_CHOICES)}:")
             return
         data['coin'] = text.upper()
-        user_sessions[cid]['state'] = STATE_AMOUNT
+        session['state'] = STATE_AMOUNT
         await update.message.reply_text(
             "💵 Enter amount in USDT (≥ 50):\n"
             "_For demo/testing only—no real trades are executed, so you can use any value._\n\n"
@@ -191,8 +194,11 @@ async def reg_flow(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
             "user_id": user_id,
             "demo_mode": True,
         }
-        Path(DATA_DIR, f"{user_id}.json").write_text(json.dumps(user_json))
-        expire_session(cid)
+        # Atomic JSON + indexed row, written off the event loop
+        await ctx.bot_data["registrations"].asave(cid, user_json)
+        # The payment step never needs the keys: they are in the config file now, nowhere else
+        payment_data = {k: v for k, v in data.items() if k not in SECRET_FIELDS}
+        user_sessions.end(cid)  # wipes the registration session's copy of the keys
 
         # 👉 Explanation of SaaS logic at the payment step:
         payment_window_message = (
@@ -208,24 +214,14 @@ async def reg_flow(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
             parse_mode="Markdown",
             reply_markup=ReplyKeyboardRemove()
         )
-        user_sessions[cid] = {'state': "PAYMENT", 'data': data, 'expires': time.time() + 600}
+        user_sessions.start(cid, "PAYMENT", data=payment_data, ttl=600)
     else:
         await update.message.reply_text("Invalid step. Use /register to restart.")
 
 async def confirm_cmd(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     cid = update.effective_chat.id
-    # Find last registered user config
-    latest_json = None
-    for fn in sorted(os.listdir(DATA_DIR), reverse=True):
-        if fn.endswith(".json"):
-            user_file = Path(DATA_DIR) / fn
-            try:
-                user_data = json.loads(user_file.read_text())
-                if user_data.get("demo_mode") and user_data.get("user_id"):
-                    latest_json = user_data
-                    break
-            except:
-                continue
+    # This chat's own latest registration: one index lookup, no directory scan
+    latest_json = await ctx.bot_data["registrations"].alatest_for_chat(cid)
     if not latest_json:
         await update.message.reply_text("No registration found. Please /register first.")
         return
@@ -257,12 +253,26 @@ async def text_dispatcher(update: Update, ctx: ContextTypes.DEFAULT_TYPE):
     else:
         await any_message(update, ctx)
 
+async def start_session_sweeper(app):
+    app.bot_data["session_sweeper"] = asyncio.create_task(user_sessions.sweeper(SESSION_SWEEP_INTERVAL))
+
+async def stop_session_sweeper(app):
+    app.bot_data["session_sweeper"].cancel()
+    user_sessions.save()
+    print(f"📊 Sessions: {user_sessions.counts()}")
+
 def main():
     # User must insert their own Bot Token for testing.
     if not BOT_TOKEN or len(BOT_TOKEN) < 40:
         print("Please add your own Telegram bot token at the top of the script before running!")
         return 
-    app = ApplicationBuilder().token(BOT_TOKEN).build()
+    app = (ApplicationBuilder().token(BOT_TOKEN)
+           .post_init(start_session_sweeper).post_shutdown(stop_session_sweeper).build())
+    registrations = RegistrationStore(DATA_DIR, db_path=REGISTRATIONS_DB)
+    imported = registrations.import_dir()  # configs saved before the store existed
+    if imported:
+        print(f"📇 Indexed {imported} existing registrations")
+    app.bot_data["registrations"] = registrations
     app.add_handler(CommandHandler("start", start_cmd))
     app.add_handler(CommandHandler("register", register_cmd))
     app.add_handler(CommandHandler("confirm", confirm_cmd))
@@ -0,0 +1,29 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bot_templates"))
+
+HOUR_MS = 3_600_000
+
+
+def make_rows(count, seed=0, step_ms=HOUR_MS, start=1_700_000_000_000):
+    """Deterministic `get_klines()` rows: ints for times, strings for prices."""
+    rng = np.random.default_rng(seed)
+    closes = 30000 + np.cumsum(rng.normal(0, 60, count))
+    opens = np.concatenate([[30000.0], closes[:-1]])
+    highs = np.maximum(opens, closes) + rng.random(count) * 25
+    lows = np.minimum(opens, closes) - rng.random(count) * 25
+    rows = []
+    for i in range(count):
+        t = start + i * step_ms
+        rows.append([t, f"{opens[i]:.8f}", f"{highs[i]:.8f}", f"{lows[i]:.8f}", f"{closes[i]:.8f}",
+                     "1.0", t + step_ms - 1, "0", 1, "0", "0", "0"])
+    return rows
+
+
+@pytest.fixture
+def rows():
+    return make_rows(600, seed=7)
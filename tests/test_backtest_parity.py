@@ -0,0 +1,27 @@
+from candle_store import rows_to_records, CANDLE_DTYPE
+from ichimoku_backtest import check_parity, backtest, signal_counts, signal_flags
+
+
+def test_vectorized_flags_match_check_signals(rows):
+    records = rows_to_records(rows)
+    candles = {name: records[name] for name in CANDLE_DTYPE.names}
+    mismatches = check_parity(candles, samples=300)
+    assert mismatches == [], mismatches[:3]
+
+
+def test_backtest_runs_on_fixture(rows):
+    records = rows_to_records(rows)
+    result = backtest({name: records[name] for name in CANDLE_DTYPE.names})
+    assert result['bars'] == len(rows)
+    assert result['final_state'] in ('BUY', 'SELL', 'NONE')
+
+
+def test_backtest_leaves_counts_alone(rows):
+    records = rows_to_records(rows)
+    candles = {name: records[name] for name in CANDLE_DTYPE.names}
+    counts = signal_counts(signal_flags(candles['high'], candles['low'], candles['close']))
+    saved = [c.copy() for c in counts]
+    first = backtest(candles, counts=counts)
+    assert all((c == s).all() for c, s in zip(counts, saved))
+    second = backtest(candles, counts=counts)
+    assert second['trades'] == first['trades'] and second['final_state'] == first['final_state']
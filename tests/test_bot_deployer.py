@@ -0,0 +1,50 @@
+import os
+import json
+import time
+import shutil
+
+import pytest
+
+from bot_deployer import Deployer, InotifyWatcher
+
+
+def wait_for(check, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if check():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def write_config(folder, user, coin):
+    config = {"username": user, "email": f"{user}@example.com", "api_key": "k", "api_secret": "s",
+              "strategy": "ICHIMOKU", "coin": coin, "amount_usdt": 100, "user_id": user}
+    with open(os.path.join(folder, f"{user}.json"), "w") as f:
+        json.dump(config, f)
+
+
+@pytest.mark.parametrize("replace", ["delete", "move"])
+def test_watch_survives_folder_replaced(tmp_path, replace):
+    try:
+        InotifyWatcher(str(tmp_path)).close()
+    except (OSError, AttributeError):
+        pytest.skip("inotify not available")
+    folder = str(tmp_path / "bot_requests")
+    added, removed = [], []
+    deployer = Deployer(folder, lambda symbol, user, config: added.append((symbol, user)),
+                        lambda symbol, user: removed.append((symbol, user)), poll_interval=0.05).start()
+    try:
+        write_config(folder, "alice", "BTC")
+        assert wait_for(lambda: ("BTCUSDT", "alice") in added)
+        if replace == "delete":
+            shutil.rmtree(folder)
+        else:
+            os.rename(folder, str(tmp_path / "old_requests"))
+        assert wait_for(lambda: ("BTCUSDT", "alice") in removed)
+        os.makedirs(folder)
+        write_config(folder, "bob", "ETH")
+        assert wait_for(lambda: ("ETHUSDT", "bob") in added)
+        assert isinstance(deployer.watcher, InotifyWatcher) and deployer.watcher.wd is not None
+    finally:
+        deployer.stop()
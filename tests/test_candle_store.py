@@ -0,0 +1,39 @@
+import threading
+
+from candle_store import CandleStore, rows_to_records
+from ichimoku_backtest import load_candles
+from conftest import make_rows, HOUR_MS
+
+
+def test_append_keeps_history_contiguous(tmp_path, rows):
+    store = CandleStore(str(tmp_path))
+    assert store.append("BTCUSDT", "1h", rows[:100]) == 100
+    assert store.append("BTCUSDT", "1h", rows[50:150]) == 50  # overlap skipped
+    assert store.gaps("BTCUSDT", "1h") == []
+
+
+def test_append_after_outage_exposes_the_gap(tmp_path, rows):
+    store = CandleStore(str(tmp_path))
+    store.append("BTCUSDT", "1h", rows[:100])
+    store.append("BTCUSDT", "1h", rows[130:200])
+    assert store.gaps("BTCUSDT", "1h") == [(rows[100][0], rows[130][0])]
+
+    candles = load_candles(store.path("BTCUSDT", "1h"))
+    assert candles["open_time"][0] == rows[130][0]  # only the newest unbroken run
+    assert len(load_candles(store.path("BTCUSDT", "1h"), allow_gaps=True)["open_time"]) == 170
+
+
+def test_merge_fills_the_gap_and_races_with_append(tmp_path, rows):
+    store = CandleStore(str(tmp_path))
+    store.append("BTCUSDT", "1h", rows[:100])
+    store.append("BTCUSDT", "1h", rows[130:200])
+    later = make_rows(50, seed=3, start=rows[-1][0] + HOUR_MS)
+
+    appender = threading.Thread(target=lambda: [store.append("BTCUSDT", "1h", [r]) for r in rows[200:] + later])
+    appender.start()
+    store.merge("BTCUSDT", "1h", rows_to_records(rows[100:130]))
+    appender.join()
+
+    times = store.read("BTCUSDT", "1h")["open_time"]
+    assert len(times) == len(rows) + len(later)
+    assert store.gaps("BTCUSDT", "1h") == []
@@ -0,0 +1,64 @@
+import math
+
+import numpy as np
+import pytest
+
+from ichimoku_core import calculate_ichimoku, parse_klines, signal_values
+from ichimoku_incremental import IncrementalIchimoku
+
+DISPLACEMENT = 26
+
+
+def same(a, b):
+    return (math.isnan(a) and math.isnan(b)) or a == b
+
+
+def test_matches_pandas_bar_by_bar(rows):
+    tenkan, kijun, span_a, span_b, chikou = (s.to_numpy() for s in calculate_ichimoku(parse_klines(rows)))
+    engine = IncrementalIchimoku()
+    for i, row in enumerate(rows):
+        point = engine.update(row[2], row[3], row[4])
+        assert same(point.tenkan, tenkan[i]), i
+        assert same(point.kijun, kijun[i]), i
+        assert same(point.span_a, span_a[i]), i
+        assert same(point.span_b, span_b[i]), i
+        # Chikou is the close 26 bars ahead: NaN for the newest bar, this close for the bar 26 back
+        assert math.isnan(point.chikou)
+        if i >= DISPLACEMENT:
+            assert engine.close_ago(0) == chikou[i - DISPLACEMENT], i
+    assert np.isnan(chikou[-DISPLACEMENT:]).all()
+    assert np.isnan(tenkan[:8]).all() and np.isnan(span_b[:51 + DISPLACEMENT]).all()
+
+
+def test_values_match_signal_values(rows):
+    engine = IncrementalIchimoku()
+    for k, row in enumerate(rows[:-1], start=1):
+        engine.update(row[2], row[3], row[4])
+        if k >= 100 and k % 50 == 0:
+            expected = signal_values(parse_klines(rows[:k + 1]))  # the last row is the open bar
+            got = engine.values()
+            for key, value in expected.items():
+                if key == 'chikou':
+                    continue  # pandas reads a future close here; the engine never can
+                assert (value is None and got[key] is None) or same(got[key], value), (k, key)
+
+
+def test_snapshot_round_trip(rows):
+    engine = IncrementalIchimoku()
+    for row in rows[:300]:
+        engine.update(row[2], row[3], row[4])
+    restored = IncrementalIchimoku.from_bytes(engine.to_bytes())
+    assert restored.to_bytes() == engine.to_bytes()
+    for row in rows[300:]:
+        a = engine.update(row[2], row[3], row[4])
+        b = restored.update(row[2], row[3], row[4])
+        assert all(same(x, y) for x, y in zip(a, b))
+    expected = engine.values()
+    assert all(same(restored.values()[k], v) if isinstance(v, float) else restored.values()[k] == v
+               for k, v in expected.items())
+
+
+@pytest.mark.parametrize("data", [b"", b"123", b"\0" * 16])
+def test_snapshot_rejects_garbage(data):
+    with pytest.raises(ValueError):
+        IncrementalIchimoku.from_bytes(data)
@@ -0,0 +1,30 @@
+import pytest
+
+from mock_binance_server import start_in_thread
+from multi_timeframe import MultiTimeframe, check_native
+from rest_gateway import RestGateway
+from signal_events import NULL_LOG
+
+NOW = 1_700_000_000.0  # fixed mock clock: same candles on every run
+
+
+@pytest.fixture
+def gateway():
+    server, state, url = start_in_thread(clock=lambda: NOW)
+    gateway = RestGateway(url)
+    yield gateway
+    gateway.close()
+    server.shutdown()
+
+
+def test_resampled_bars_match_native_klines(gateway):
+    compared, mismatches = check_native(gateway, "BTCUSDT", ["15m", "1h", "4h"], hours=48)
+    assert compared > 0
+    assert mismatches == []
+
+
+def test_warm_up_then_evaluate_latest_gives_signals(gateway):
+    frame = MultiTimeframe("ETHUSDT", ["15m", "1h"], fetch=gateway.get_klines, log=NULL_LOG)
+    frame.warm_up(100)
+    results = frame.evaluate_latest()
+    assert [interval for interval, _, _ in results] == ["15m", "1h"]
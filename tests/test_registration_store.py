@@ -0,0 +1,34 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "telegram_bot"))
+
+from registration_store import RegistrationStore
+
+
+def test_database_stays_out_of_config_dir(tmp_path):
+    data_dir = tmp_path / "bot_requests"
+    store = RegistrationStore(str(data_dir))
+    store.save(42, {"user_id": "alice_1", "symbol": "BTCUSDT"})
+    assert os.listdir(data_dir) == ["alice_1.json"]
+    assert os.path.dirname(store.db_path) == str(tmp_path)
+    store.close()
+
+
+def test_import_dir_restores_chat_and_skips_non_configs(tmp_path):
+    data_dir = tmp_path / "bot_requests"
+    store = RegistrationStore(str(data_dir))
+    store.save(42, {"user_id": "alice_1", "symbol": "BTCUSDT"})
+    store.close()
+    os.remove(store.db_path)
+    (data_dir / ".sessions.json").write_text(json.dumps([{"user_id": "x"}]))
+    (data_dir / "list.json").write_text(json.dumps([1, 2]))
+    (data_dir / "legacy.json").write_text(json.dumps({"user_id": "bob_2"}))
+
+    restored = RegistrationStore(str(data_dir))
+    assert restored.import_dir() == 2
+    assert restored.latest_for_chat(42)["user_id"] == "alice_1"
+    assert restored.get("bob_2") is not None
+    assert restored.import_dir() == 0
+    restored.close()
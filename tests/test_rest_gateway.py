@@ -0,0 +1,63 @@
+import pytest
+
+from rest_gateway import RestGateway, retry_after_seconds
+
+NOW = 1_700_000_000.0
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("7", 7.0),
+    ("0.5", 0.5),
+    ("-3", 0.0),
+    ("Tue, 14 Nov 2023 22:13:40 GMT", 20.0),  # NOW + 20 s
+    ("not a date", None),
+    ("nan", None),
+])
+def test_retry_after_seconds(value, expected):
+    assert retry_after_seconds(value, NOW) == expected
+
+
+class FakeResponse:
+    def __init__(self, status, headers=None, body=None):
+        self.status_code = status
+        self.headers = headers or {}
+        self.text = ""
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def get(self, url, params=None, timeout=None):
+        return self.responses.pop(0)
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("retry_after, expected", [("Tue, 14 Nov 2023 22:13:30 GMT", 10.0), ("soon", None)])
+def test_http_date_retry_after_is_honoured(retry_after, expected):
+    now = [NOW]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    gateway = RestGateway(workers=1, clock=lambda: now[0], sleep=sleep)
+    gateway.session = FakeSession([
+        FakeResponse(429, {"Retry-After": retry_after}),
+        FakeResponse(200, body={"serverTime": 1}),
+    ])
+    try:
+        assert gateway.get_server_time() == {"serverTime": 1}
+    finally:
+        gateway.close()
+    pause = gateway.bucket.paused_until - NOW
+    if expected is not None:
+        assert pause == expected
+    else:
+        assert 0 <= pause <= gateway.backoff  # the computed backoff for a first retry
+    assert gateway.stats()["throttled"] == 1
@@ -0,0 +1,20 @@
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from runtime_metrics import Metrics, MetricsServer
+
+
+@pytest.mark.parametrize("interval", ["abc", "0", "-1", "nan", "1e9"])
+def test_profile_start_rejects_bad_interval(tmp_path, interval):
+    server = MetricsServer(port=0, registry=Metrics(), profile_dir=str(tmp_path)).start()
+    try:
+        with pytest.raises(HTTPError) as error:
+            urlopen(f"{server.url}/profile/start?interval={interval}", timeout=5)
+        assert error.value.code == 400
+        assert not server.profiler.running
+        with urlopen(f"{server.url}/profile/start?interval=0.01", timeout=5) as reply:
+            assert reply.status == 200
+    finally:
+        server.close()
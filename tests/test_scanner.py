@@ -0,0 +1,65 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import ichimoku_scanner_demo as scanner
+from runtime_metrics import Metrics
+from kline_cache import KlineCache
+from mock_binance_server import start_in_thread
+from rest_gateway import RestGateway
+from signal_events import EventLog
+
+NOW = 1_700_000_000.0
+
+
+def test_timeframes_signal_right_after_warm_up(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    server, _, url = start_in_thread(clock=lambda: NOW)
+    gateway = RestGateway(url)
+    events = EventLog(str(tmp_path / "events.jsonl"))
+    try:
+        cache = KlineCache(gateway, clock=lambda: NOW)
+        slots = scanner.build_slots(coins=["BTC", "ETH"])
+        frames = scanner.build_timeframes(cache, slots, ["15m", "1h"], events)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            scanner.warm_timeframes(cache, frames, pool)
+    finally:
+        events.close()
+        gateway.close()
+        server.shutdown()
+
+    with open(tmp_path / "events.jsonl") as f:
+        seen = {(e["symbol"], e["interval"]) for e in map(json.loads, f)}
+    assert seen == {(s, i) for s in ("BTCUSDT", "ETHUSDT") for i in ("15m", "1h")}
+
+
+class FakeTimeframe:
+    def __init__(self):
+        self.state = 'NONE'
+        self.last_open_time = 0
+        self.builder = type("Builder", (), {"step": 60_000})()
+
+
+class FakeFrame:
+    """Two bars of one timeframe close in a single feed: BUY, then BUY again."""
+
+    def __init__(self):
+        self.timeframes = {"15m": FakeTimeframe()}
+
+    def feed(self, rows):
+        self.timeframes["15m"].state = 'BUY'
+        return [("15m", 'BUY', []), ("15m", 'BUY', [])]
+
+
+class FakeCache:
+    def get_klines(self, symbol, interval, limit):
+        return [[0] * 12] * 3
+
+
+def test_feed_timeframes_counts_state_changes(monkeypatch):
+    registry = Metrics()
+    monkeypatch.setattr(scanner, "metrics", registry)
+    slot = scanner.build_slots(coins=["BTC"])["BTCUSDT"]
+    scanner.feed_timeframes(FakeCache(), slot, FakeFrame())
+    assert slot.errors == 0
+    actions = [line for line in registry.render().splitlines() if line.startswith("ichimoku_actions_total{")]
+    assert len(actions) == 1 and actions[0].endswith(" 1.0")
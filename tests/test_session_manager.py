@@ -0,0 +1,40 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "telegram_bot"))
+
+from registration_store import RegistrationStore
+from session_manager import SessionManager
+
+KEY = "k" * 64
+
+
+def redact(state, data):
+    return min(state, 2), {k: v for k, v in data.items() if k != "api_key"}
+
+
+def test_snapshot_leaves_out_secrets_and_config_dir(tmp_path):
+    data_dir = str(tmp_path / "bot_requests")
+    snapshot = str(tmp_path / "bot_sessions.state")
+    store = RegistrationStore(data_dir)
+    sessions = SessionManager(ttl=300, persist_path=snapshot, clock=lambda: 1000.0, redact=redact)
+    sessions.start(7, 4, data={"username": "alice", "api_key": KEY})
+    sessions.save()
+
+    assert KEY not in open(snapshot).read()
+    assert os.stat(snapshot).st_mode & 0o077 == 0
+    assert store.import_dir() == 0  # nothing in data_dir besides configs
+
+    restored = SessionManager(ttl=300, persist_path=snapshot, clock=lambda: 1000.0)
+    session = restored.get(7)
+    assert session['state'] == 2 and session['data'] == {"username": "alice"}
+    assert sessions.get(7)['data']['api_key'] == KEY  # the live session keeps its keys
+    store.close()
+
+
+def test_load_ignores_foreign_snapshot(tmp_path):
+    snapshot = tmp_path / "bot_sessions.state"
+    snapshot.write_text('{"user_id": "x"}')
+    assert len(SessionManager(persist_path=str(snapshot))) == 0
+    snapshot.write_text('[[1, 0, [], 9e12], "junk"]')
+    assert len(SessionManager(persist_path=str(snapshot))) == 0
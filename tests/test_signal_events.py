@@ -0,0 +1,40 @@
+import os
+import logging
+
+from signal_events import EventLog, load_states, index_path
+
+
+def event(symbol, state, interval="1h"):
+    return {"symbol": symbol, "interval": interval, "state_after": state, "signals": []}
+
+
+def test_writer_survives_a_bad_record(tmp_path, caplog):
+    path = str(tmp_path / "events.jsonl")
+    log = EventLog(path, flush_interval=0.05)
+    with caplog.at_level(logging.ERROR):
+        log.emit(event("BTCUSDT", "BUY"))
+        log.emit({"symbol": "ETHUSDT", "price": object()})  # not JSON-serializable
+        log.emit(event("SOLUSDT", "SELL"))
+        log.close()
+    assert log.written == 2 and log.dropped == 1
+    assert "cannot be encoded" in caplog.text
+    assert load_states(path) == {"BTCUSDT": "BUY", "SOLUSDT": "SELL"}
+
+
+def test_load_states_reads_only_past_the_index(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    log = EventLog(path)
+    for i in range(50):
+        log.emit(event(f"S{i}USDT", "BUY"))
+    log.close()
+    assert os.path.exists(index_path(path))
+
+    # Events after the index was saved (e.g. a crash before the next save)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"symbol": "S3USDT", "interval": "1h", "state_after": "SELL"}\n')
+    states = load_states(path, by_interval=True)
+    assert states[("S3USDT", "1h")] == "SELL"
+    assert states[("S4USDT", "1h")] == "BUY"
+
+    os.remove(index_path(path))  # full scan gives the same answer
+    assert load_states(path, by_interval=True) == states
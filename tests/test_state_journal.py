@@ -0,0 +1,73 @@
+from ichimoku_core import latest_price, parse_klines
+from kline_cache import KlineCache
+from signal_events import NULL_LOG
+from state_journal import StateJournal, SymbolTracker
+
+SYMBOL = "BTCUSDT"
+
+
+class Events:
+    def __init__(self):
+        self.records = []
+
+    def emit(self, event):
+        event.pop("ts")
+        self.records.append(event)
+
+
+def just_opened(row):
+    """A bar as seen right after it opened: every price still at its open."""
+    return row[:2] + [row[1]] * 3 + row[5:]
+
+
+def run(tracker, rows, start, stop, events):
+    """One update per newly closed bar, as a bot that never stops sees them."""
+    for k in range(start, stop):
+        tracker.update(rows[:k] + [just_opened(rows[k])], NULL_LOG, events)
+
+
+def test_restart_replays_the_same_events(tmp_path, rows):
+    uninterrupted = Events()
+    run(SymbolTracker(SYMBOL, "1h"), rows, 100, 400, uninterrupted)
+
+    before, after = Events(), Events()
+    tracker = SymbolTracker(SYMBOL, "1h")
+    run(tracker, rows, 100, 250, before)
+    journal = StateJournal(str(tmp_path / "state.sqlite3"))
+    journal.save(tracker)
+    journal.close()
+
+    journal = StateJournal(str(tmp_path / "state.sqlite3"))
+    resumed = SymbolTracker.from_entry(SYMBOL, "1h", journal.load(SYMBOL, "1h"))
+    journal.close()
+    # Down for 150 bars, back right after a close: one catch-up call
+    assert resumed.update(rows[:399] + [just_opened(rows[399])], NULL_LOG, after) == 150
+    assert before.records + after.records == uninterrupted.records
+
+
+def test_latest_bar_priced_like_latest_price(rows):
+    events = Events()
+    SymbolTracker(SYMBOL, "1h").update(rows[:300], NULL_LOG, events)
+    price, bar_open_time = latest_price(parse_klines(rows[:300]))
+    assert (events.records[-1]["price"], events.records[-1]["bar_open_time"]) == (price, bar_open_time)
+
+
+class FakeClient:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def get_klines(self, symbol, interval, limit, startTime=None):
+        if startTime is not None:
+            return [r for r in self.rows if r[0] >= startTime][:limit]
+        return self.rows[-limit:]
+
+
+def test_catch_up_leaves_cache_depth_alone(rows):
+    now_ms = rows[-1][0] + 60_000
+    cache = KlineCache(FakeClient(rows), clock=lambda: now_ms / 1000)
+    tracker = SymbolTracker(SYMBOL, "1h", last_open_time=rows[-300][0])
+    assert len(tracker.fetch(cache, now_ms)) == 301
+    assert cache.entries == {}
+    tracker.last_open_time = rows[-2][0]
+    assert len(tracker.fetch(cache, now_ms)) == 100
+    assert all(entry.retain == 100 for entry in cache.entries.values())
@@ -0,0 +1,37 @@
+import os
+import sys
+import asyncio
+import importlib
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "benchmarks"))
+sys.path.insert(0, os.path.join(HERE, "..", "telegram_bot"))
+
+from bench_pipeline import FakeContext, FakeUpdate, registration_messages, stand_in_modules
+from registration_store import RegistrationStore
+
+CHAT = 1_000_001
+
+
+def test_payment_session_holds_no_keys(tmp_path, monkeypatch):
+    stand_in_modules()
+    monkeypatch.chdir(tmp_path)  # the bot creates ./bot_requests on import
+    bot = importlib.import_module("telegram_bot_demo")
+    store = RegistrationStore(str(tmp_path / "bot_requests"))
+    ctx = FakeContext({"registrations": store})
+    replies = []
+
+    async def register():
+        await bot.register_cmd(FakeUpdate(CHAT, "/register", replies), ctx)
+        for text in registration_messages(1):
+            await bot.reg_flow(FakeUpdate(CHAT, text, replies), ctx)
+
+    try:
+        asyncio.run(register())
+        session = bot.user_sessions.get(CHAT)
+        assert session['state'] == "PAYMENT"
+        assert not set(bot.SECRET_FIELDS) & set(session['data'])
+        assert store.latest_for_chat(CHAT)["api_key"] == "k" * 64  # the config itself keeps them
+    finally:
+        bot.user_sessions.end(CHAT)
+        store.close()